@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+NEXA INTENT BENCHMARK
+Microbenchmark del despacho de intents: compara la cadena de `if 'x' in query.lower()`
+(un intent detrás de otro, como hacía process_query) con IntentRouter para 1, 10, 50...
+intents sintéticos. Reporta el coste por consulta; con el router debe quedarse plano
+aunque crezca el número de intents.
+
+Uso (desde python_agent/):
+    python bench_intents.py
+    python bench_intents.py --intents 1 10 50 200 --queries 20000
+    python bench_intents.py --json > intents.json
+"""
+
+import argparse
+import json
+import random
+import time
+from typing import Callable, Dict, List, Tuple
+
+from core.intents import IntentRouter
+
+_VERBS = ('busca abre cierra pon quita muestra calcula traduce recuerda envía lee apaga enciende '
+          'agenda reproduce pausa llama escribe borra guarda').split()
+_OBJECTS = ('luz música alarma correo mensaje nota tarea clima noticia foto vídeo archivo '
+            'contacto evento mapa ruta precio receta libro canción').split()
+_FILLER = ('por favor el la de en para con un una sobre mañana hoy ahora todo '
+           'nexa dime quiero necesito ver').split()
+
+
+def synthetic_intents(count: int) -> List[Tuple[str, List[str]]]:
+    """`count` intents con dos frases de activación cada uno ("abre luz", "luz abre")"""
+    intents = []
+    for i in range(count):
+        verb, obj = _VERBS[i % len(_VERBS)], _OBJECTS[(i // len(_VERBS)) % len(_OBJECTS)]
+        suffix = '' if i < len(_VERBS) * len(_OBJECTS) else str(i)
+        intents.append((f"intent_{i}", [f"{verb} {obj}{suffix}", f"{obj}{suffix} {verb}"]))
+    return intents
+
+
+def synthetic_queries(intents: List[Tuple[str, List[str]]], count: int, seed: int = 0,
+                      miss_rate: float = 0.3) -> List[str]:
+    """Consultas de 8-16 palabras; el `miss_rate` no activa ningún intent (caen al default)"""
+    rng = random.Random(seed)
+    queries = []
+    for _ in range(count):
+        words = [rng.choice(_FILLER) for _ in range(rng.randint(6, 14))]
+        if rng.random() >= miss_rate:
+            words.insert(rng.randint(0, len(words)), rng.choice(rng.choice(intents)[1]))
+        queries.append(' '.join(words))
+    return queries
+
+
+# ────────────────────────────────────────────────────────────────────
+# 🧭 DESPACHADORES
+# ────────────────────────────────────────────────────────────────────
+
+def legacy_dispatcher(intents: List[Tuple[str, List[str]]]) -> Callable[[str], str]:
+    """Cadena de comprobaciones por subcadena, una por intent y frase"""
+    chain = [(name, tuple(t.lower() for t in triggers)) for name, triggers in intents]
+
+    def dispatch(query: str) -> str:
+        lowered = query.lower()
+        for name, triggers in chain:
+            if any(trigger in lowered for trigger in triggers):
+                return name
+        return 'default'
+    return dispatch
+
+
+def router_dispatcher(intents: List[Tuple[str, List[str]]]) -> Callable[[str], str]:
+    router = IntentRouter(fillers=('por favor', 'acerca de', 'sobre'))
+    for name, triggers in intents:
+        router.add(name, triggers, lambda match: match.name)
+    return lambda query: router.dispatch(query, lambda q: 'default')
+
+
+def measure(dispatch: Callable[[str], str], queries: List[str], repeat: int) -> float:
+    """Mejor de `repeat` pasadas, en microsegundos por consulta"""
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for query in queries:
+            dispatch(query)
+        best = min(best, time.perf_counter() - started)
+    return best / len(queries) * 1e6
+
+
+def run(counts: List[int], queries: int, repeat: int, seed: int) -> List[Dict]:
+    rows = []
+    for count in counts:
+        intents = synthetic_intents(count)
+        sample = synthetic_queries(intents, queries, seed=seed)
+        legacy, router = legacy_dispatcher(intents), router_dispatcher(intents)
+        # Los dos caminos eligen lo mismo cuando las frases no se solapan entre intents
+        agree = sum(legacy(q) == router(q) for q in sample) / len(sample)
+        rows.append({
+            'intents': count,
+            'legacy_us': round(measure(legacy, sample, repeat), 3),
+            'router_us': round(measure(router, sample, repeat), 3),
+            'agreement': round(agree, 4)
+        })
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Microbenchmark del router de intents")
+    parser.add_argument('--intents', type=int, nargs='+', default=[1, 10, 50, 200])
+    parser.add_argument('--queries', type=int, default=5000, help="Consultas por pasada")
+    parser.add_argument('--repeat', type=int, default=5, help="Pasadas por medición (se toma la mejor)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', action='store_true', help="Salida JSON")
+    args = parser.parse_args()
+
+    rows = run(args.intents, args.queries, args.repeat, args.seed)
+    if args.json:
+        print(json.dumps(rows, indent=2))
+        return
+
+    print(f"{'intents':>8} {'cadena in (µs)':>15} {'router (µs)':>12} {'coincidencia':>13}")
+    for row in rows:
+        print(f"{row['intents']:>8} {row['legacy_us']:>15.2f} {row['router_us']:>12.2f} "
+              f"{row['agreement'] * 100:>12.1f}%")
+
+
+if __name__ == "__main__":
+    main()
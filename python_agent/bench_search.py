@@ -0,0 +1,503 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+NEXA SEARCH BENCHMARK
+Benchmark offline de NexaSearchCore: levanta un servidor HTTP local que imita a cada
+motor (JSON con la misma forma que la API real, latencia aleatoria, errores y cuelgues
+configurables) y lanza buscar() con la concurrencia pedida.
+
+Reporta throughput, latencia p50/p95/p99, tasa de aciertos de cache y el tiempo de CPU
+gastado en deduplicación y fusión de rankings.
+
+Uso (desde python_agent/):
+    python bench_search.py --requests 500 --concurrency 16 --distinct 100
+    python bench_search.py --error-rate 0.1 --timeout-rate 0.05 --json > run.json
+    python bench_search.py --save base.json            # guardar línea base
+    python bench_search.py --compare base.json         # exit 1 si hay regresión
+"""
+
+import argparse
+import hashlib
+import json
+import math
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs, urlsplit
+
+from core.dedup import Deduplicator
+from core.fusion import RankFusion
+from core.health import InstancePool
+from core.search_core import NexaSearchCore
+
+# ────────────────────────────────────────────────────────────────────
+# 🎲 PERFILES DE LOS MOTORES SIMULADOS
+# ────────────────────────────────────────────────────────────────────
+
+class EngineProfile:
+    """
+    Comportamiento de un motor simulado
+
+    Args:
+        latency: ('fixed', s) | ('uniform', min, max) | ('lognormal', mediana, sigma)
+        error_rate: Probabilidad de responder HTTP 500
+        timeout_rate: Probabilidad de colgarse `hang` segundos (más que el timeout del motor)
+        results: Resultados devueltos por consulta
+    """
+
+    def __init__(self, latency=('lognormal', 0.05, 0.5), error_rate: float = 0.0,
+                 timeout_rate: float = 0.0, hang: float = 10.0, results: int = 10):
+        self.latency = tuple(latency)
+        self.error_rate = error_rate
+        self.timeout_rate = timeout_rate
+        self.hang = hang
+        self.results = results
+
+    def delay(self, rng: random.Random) -> float:
+        kind, *args = self.latency
+        if kind == 'fixed':
+            return args[0]
+        if kind == 'uniform':
+            return rng.uniform(args[0], args[1])
+        if kind == 'lognormal':
+            return rng.lognormvariate(math.log(args[0]), args[1])
+        raise ValueError(f"Distribución de latencia desconocida: {kind}")
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'EngineProfile':
+        return cls(**data)
+
+
+# Latencias parecidas a las observadas en producción (mediana, dispersión)
+DEFAULT_PROFILES = {
+    'duckduckgo': {'latency': ('lognormal', 0.04, 0.4), 'results': 8},
+    'searxng': {'latency': ('lognormal', 0.12, 0.6), 'results': 10},
+    'brave': {'latency': ('lognormal', 0.08, 0.4), 'results': 10},
+    'you': {'latency': ('lognormal', 0.10, 0.5), 'results': 10},
+    'google_cse': {'latency': ('lognormal', 0.09, 0.3), 'results': 10},
+    'serpapi': {'latency': ('lognormal', 0.20, 0.5), 'results': 10}
+}
+
+_WORDS = ('nexa agente motor búsqueda red neuronal datos servidor cache índice consulta '
+          'modelo latencia ranking documento texto fuente resultado web ciudad historia').split()
+
+
+def _documents(query: str, engine: str, count: int) -> List[Dict]:
+    """
+    Resultados deterministas por (consulta, motor). Los motores comparten gran parte de
+    los documentos con rankings distintos, y algunas URLs llevan parámetros de tracking,
+    así la deduplicación y la fusión trabajan como con tráfico real.
+    """
+    seed = int.from_bytes(hashlib.blake2b(f"{query}|{engine}".encode(), digest_size=8).digest(), 'big')
+    rng = random.Random(seed)
+    pool = list(range(count * 2))  # Documentos candidatos de la consulta (comunes a todos los motores)
+    rng.shuffle(pool)
+    docs = []
+    slug = hashlib.md5(query.encode()).hexdigest()[:8]
+    for doc in pool[:count]:
+        words = random.Random(f"{query}|{doc}")  # Mismo snippet para el mismo documento
+        snippet = ' '.join(words.choice(_WORDS) for _ in range(24))
+        url = f"https://site{doc % 7}.example/{slug}/{doc}"
+        if rng.random() < 0.3:
+            url += f"?utm_source={engine}"
+        docs.append({'title': f"{query} — documento {doc}", 'url': url, 'snippet': snippet})
+    return docs
+
+
+def _engine_payload(engine: str, query: str, docs: List[Dict]) -> Dict:
+    """JSON con la forma de la API real de cada motor"""
+    if engine == 'duckduckgo':
+        head, rest = (docs[0], docs[1:]) if docs else ({}, [])
+        return {
+            'Heading': head.get('title', ''),
+            'AbstractURL': head.get('url', ''),
+            'AbstractText': head.get('snippet', ''),
+            'RelatedTopics': [{'FirstURL': d['url'], 'Text': d['snippet']} for d in rest]
+        }
+    if engine == 'searxng':
+        return {'results': [{'title': d['title'], 'url': d['url'], 'content': d['snippet']} for d in docs]}
+    if engine == 'brave':
+        return {'web': {'results': [{'title': d['title'], 'url': d['url'], 'description': d['snippet']}
+                                    for d in docs]}}
+    if engine == 'you':
+        return {'web': {'results': docs}}
+    if engine == 'google_cse':
+        return {'items': [{'title': d['title'], 'link': d['url'], 'snippet': d['snippet']} for d in docs]}
+    if engine == 'serpapi':
+        return {'organic_results': [{'title': d['title'], 'link': d['url'], 'snippet': d['snippet']}
+                                    for d in docs]}
+    raise KeyError(engine)
+
+
+# Parámetro que lleva la consulta en cada motor (default: q)
+_QUERY_PARAMS = {'you': 'query'}
+
+
+# ────────────────────────────────────────────────────────────────────
+# 🌐 SERVIDOR SIMULADO
+# ────────────────────────────────────────────────────────────────────
+
+class MockEngineServer:
+    """
+    Servidor HTTP local con una ruta por motor (/duckduckgo, /searxng/search, /brave...).
+    Se usa como context manager; `url` queda disponible tras start().
+    """
+
+    def __init__(self, profiles: Dict[str, EngineProfile], seed: int = 0, host: str = '127.0.0.1'):
+        self.profiles = profiles
+        self.host = host
+        self.requests: Dict[str, int] = {name: 0 for name in profiles}
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._httpd: Optional[ThreadingHTTPServer] = None
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self._httpd.server_address[1]}"
+
+    def start(self) -> 'MockEngineServer':
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                server._handle(self)
+
+            def log_message(self, *args):
+                pass
+
+        self._httpd = ThreadingHTTPServer((self.host, 0), Handler)
+        self._httpd.daemon_threads = True
+        threading.Thread(target=self._httpd.serve_forever, daemon=True, name='nexa-bench-mock').start()
+        return self
+
+    def stop(self):
+        self._stop.set()  # Libera a los handlers colgados
+        if self._httpd is not None:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+            self._httpd = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _handle(self, request: BaseHTTPRequestHandler):
+        parts = urlsplit(request.path)
+        engine = parts.path.strip('/').split('/')[0]
+        profile = self.profiles.get(engine)
+        if profile is None:
+            request.send_error(404)
+            return
+        with self._lock:
+            self.requests[engine] += 1
+            roll = self._rng.random()
+            delay = profile.delay(self._rng)
+
+        if roll < profile.timeout_rate:
+            self._stop.wait(profile.hang)
+            return
+        self._stop.wait(delay)
+        if roll < profile.timeout_rate + profile.error_rate:
+            request.send_error(500)
+            return
+
+        params = parse_qs(parts.query)
+        query = params.get(_QUERY_PARAMS.get(engine, 'q'), [''])[0]
+        body = json.dumps(_engine_payload(engine, query, _documents(query, engine, profile.results))).encode()
+        try:
+            request.send_response(200)
+            request.send_header('Content-Type', 'application/json')
+            request.send_header('Content-Length', str(len(body)))
+            request.end_headers()
+            request.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # El cliente ya se rindió por timeout
+
+
+def point_core_at(core: NexaSearchCore, base_url: str, engines: List[str],
+                  engine_timeout: Optional[float] = None, rate_limits: bool = False):
+    """Redirige los motores del core al servidor simulado y desactiva el resto"""
+    for name, cfg in core.engines.items():
+        cfg['enabled'] = name in engines
+        if name not in engines:
+            continue
+        cfg['url'] = f"{base_url}/{name}"
+        if 'key' in cfg:
+            cfg['key'] = 'bench'
+        if 'cx' in cfg:
+            cfg['cx'] = 'bench'
+        if engine_timeout is not None:
+            cfg['timeout'] = engine_timeout
+        if not rate_limits:
+            core.set_rate_limit(name, None)
+        if core.quota.has_quota(name):
+            core.quota.register(name, {'daily': 10 ** 9})
+    searxng = core.registry.get('searxng')
+    if searxng is not None and 'searxng' in engines:
+        searxng.config['instances'] = [f"{base_url}/searxng"]
+        searxng.pool = InstancePool(searxng.config['instances'], failure_threshold=2, reset_timeout=60)
+
+
+# ────────────────────────────────────────────────────────────────────
+# ⏱️ MEDICIÓN
+# ────────────────────────────────────────────────────────────────────
+
+class CpuMeter:
+    """Tiempo de CPU (por hilo) acumulado en deduplicación y fusión"""
+
+    def __init__(self):
+        self.totals = {'dedup': 0.0, 'merge': 0.0}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def _wrap(self, owner, attr: str, bucket: str):
+        original = getattr(owner, attr)
+        meter = self
+
+        def timed(*args, **kwargs):
+            depth = getattr(meter._local, 'depth', 0)
+            meter._local.depth = depth + 1
+            started = time.thread_time()
+            try:
+                return original(*args, **kwargs)
+            finally:
+                meter._local.depth = depth
+                if depth == 0:
+                    # Solo la llamada externa cuenta: resolve() dentro de add() ya es dedup
+                    spent = time.thread_time() - started
+                    nested = getattr(meter._local, 'nested', 0.0)
+                    meter._local.nested = 0.0
+                    with meter._lock:
+                        meter.totals[bucket] += spent - nested
+                        if bucket != 'dedup':
+                            meter.totals['dedup'] += nested
+                else:
+                    meter._local.nested = getattr(meter._local, 'nested', 0.0) + time.thread_time() - started
+
+        return original, timed
+
+    @contextmanager
+    def installed(self):
+        patches = [
+            (Deduplicator, 'resolve', 'dedup'),
+            (RankFusion, 'add', 'merge'),
+            (RankFusion, 'top', 'merge')
+        ]
+        originals = []
+        for owner, attr, bucket in patches:
+            original, timed = self._wrap(owner, attr, bucket)
+            originals.append((owner, attr, original))
+            setattr(owner, attr, timed)
+        try:
+            yield self
+        finally:
+            for owner, attr, original in originals:
+                setattr(owner, attr, original)
+
+
+def _percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = max(0, math.ceil(pct / 100 * len(sorted_values)) - 1)
+    return sorted_values[index]
+
+
+def _workload(requests: int, distinct: int, zipf: float, seed: int) -> List[str]:
+    """Consultas con popularidad tipo Zipf: pocas muy repetidas y una cola larga"""
+    rng = random.Random(seed)
+    queries = [f"consulta {i} {rng.choice(_WORDS)} {rng.choice(_WORDS)}" for i in range(distinct)]
+    weights = [1 / (rank + 1) ** zipf for rank in range(distinct)]
+    return rng.choices(queries, weights=weights, k=requests)
+
+
+def run_benchmark(requests: int = 300, concurrency: int = 8, distinct: int = 100, zipf: float = 1.1,
+                  max_results: int = 10, parallel: bool = True, deadline: Optional[float] = None,
+                  engines: Optional[List[str]] = None, profiles: Optional[Dict[str, Dict]] = None,
+                  engine_timeout: Optional[float] = 1.0, rate_limits: bool = False,
+                  seed: int = 0) -> Dict:
+    """Ejecuta una pasada completa y devuelve el informe como dict"""
+    engines = engines or list(DEFAULT_PROFILES)
+    merged = {name: {**DEFAULT_PROFILES.get(name, {}), **(profiles or {}).get(name, {})} for name in engines}
+    queries = _workload(requests, distinct, zipf, seed)
+
+    with MockEngineServer({n: EngineProfile.from_dict(p) for n, p in merged.items()}, seed) as server:
+        core = NexaSearchCore(cache_path=':memory:', warm_cache=False, quota_path=':memory:',
+                              index_path=':memory:', query_log_path=':memory:')
+        point_core_at(core, server.url, engines, engine_timeout, rate_limits)
+        meter = CpuMeter()
+        latencies: List[float] = []
+        outcomes = {'ok': 0, 'empty': 0, 'timed_out': 0, 'error': 0}
+        lock = threading.Lock()
+
+        def one(query: str):
+            started = time.perf_counter()
+            try:
+                response = core.buscar(query, max_results, parallel=parallel, deadline=deadline)
+                outcome = 'timed_out' if response.get('timed_out') else 'ok' if response['results'] else 'empty'
+            except Exception:
+                outcome = 'error'
+            elapsed = time.perf_counter() - started
+            with lock:
+                latencies.append(elapsed)
+                outcomes[outcome] += 1
+
+        with meter.installed():
+            cpu_started = time.process_time()
+            started = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='nexa-bench') as pool:
+                list(pool.map(one, queries))
+            wall = time.perf_counter() - started
+            cpu_total = time.process_time() - cpu_started
+
+        cache = core.cache.stats()
+        inflight = core._inflight.stats()
+        core.close()
+
+    latencies.sort()
+    return {
+        'config': {
+            'requests': requests, 'concurrency': concurrency, 'distinct': distinct, 'zipf': zipf,
+            'max_results': max_results, 'parallel': parallel, 'deadline': deadline,
+            'engine_timeout': engine_timeout, 'engines': merged
+        },
+        'throughput_rps': round(requests / wall, 2) if wall else 0.0,
+        'wall_s': round(wall, 3),
+        'latency_ms': {
+            'p50': round(_percentile(latencies, 50) * 1000, 2),
+            'p95': round(_percentile(latencies, 95) * 1000, 2),
+            'p99': round(_percentile(latencies, 99) * 1000, 2),
+            'max': round(latencies[-1] * 1000, 2) if latencies else 0.0,
+            'mean': round(sum(latencies) / len(latencies) * 1000, 2) if latencies else 0.0
+        },
+        'outcomes': outcomes,
+        'cache': {
+            'hit_rate': cache['hit_rate'],
+            'hits': cache['hits'],
+            'stale_hits': cache['stale_hits'],
+            'misses': cache['misses'],
+            'coalesced': inflight['coalesced']
+        },
+        'cpu_ms': {
+            'total': round(cpu_total * 1000, 2),
+            'dedup': round(meter.totals['dedup'] * 1000, 2),
+            'merge': round(meter.totals['merge'] * 1000, 2),
+            'dedup_per_search_us': round(meter.totals['dedup'] / max(cache['misses'], 1) * 1e6, 1),
+            'merge_per_search_us': round(meter.totals['merge'] / max(cache['misses'], 1) * 1e6, 1)
+        },
+        'engine_requests': dict(server.requests)
+    }
+
+
+def compare(report: Dict, baseline: Dict, tolerance: float) -> List[str]:
+    """Regresiones frente a una línea base (más de `tolerance` relativo de empeoramiento)"""
+    regressions = []
+    checks = [
+        ('throughput_rps', report['throughput_rps'], baseline['throughput_rps'], False),
+        ('cpu_ms.dedup_per_search_us', report['cpu_ms']['dedup_per_search_us'],
+         baseline['cpu_ms']['dedup_per_search_us'], True),
+        ('cpu_ms.merge_per_search_us', report['cpu_ms']['merge_per_search_us'],
+         baseline['cpu_ms']['merge_per_search_us'], True)
+    ]
+    checks += [(f"latency_ms.{p}", report['latency_ms'][p], baseline['latency_ms'][p], True)
+               for p in ('p50', 'p95', 'p99')]
+    for name, current, base, lower_is_better in checks:
+        if not base:
+            continue
+        change = (current - base) / base
+        if (change > tolerance) if lower_is_better else (change < -tolerance):
+            regressions.append(f"{name}: {base} -> {current} ({change:+.0%})")
+    return regressions
+
+
+def print_report(report: Dict):
+    cfg = report['config']
+    lat = report['latency_ms']
+    cpu = report['cpu_ms']
+    print("📊 NEXA SEARCH BENCHMARK")
+    print(f"   {cfg['requests']} búsquedas | concurrencia {cfg['concurrency']} | "
+          f"{cfg['distinct']} consultas distintas | {'paralelo' if cfg['parallel'] else 'secuencial'}")
+    print(f"   Throughput: {report['throughput_rps']} búsquedas/s ({report['wall_s']}s)")
+    print(f"   Latencia: p50 {lat['p50']}ms | p95 {lat['p95']}ms | p99 {lat['p99']}ms | max {lat['max']}ms")
+    print(f"   Resultados: {report['outcomes']}")
+    print(f"   Cache: hit rate {report['cache']['hit_rate']:.1%} "
+          f"(hits {report['cache']['hits']}, stale {report['cache']['stale_hits']}, "
+          f"misses {report['cache']['misses']}, coalescidas {report['cache']['coalesced']})")
+    print(f"   CPU: total {cpu['total']}ms | dedup {cpu['dedup']}ms ({cpu['dedup_per_search_us']}µs/búsqueda) | "
+          f"fusión {cpu['merge']}ms ({cpu['merge_per_search_us']}µs/búsqueda)")
+    print(f"   Peticiones por motor: {report['engine_requests']}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark offline de NexaSearchCore")
+    parser.add_argument('--requests', type=int, default=300)
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--distinct', type=int, default=100, help="Consultas distintas en la carga")
+    parser.add_argument('--zipf', type=float, default=1.1, help="Sesgo de popularidad (0 = uniforme)")
+    parser.add_argument('--max-results', type=int, default=10)
+    parser.add_argument('--sequential', action='store_true', help="buscar() sin parallel=True")
+    parser.add_argument('--deadline', type=float, default=None)
+    parser.add_argument('--engines', default=','.join(DEFAULT_PROFILES), help="Motores separados por comas")
+    parser.add_argument('--engine-timeout', type=float, default=1.0)
+    parser.add_argument('--error-rate', type=float, default=None, help="Aplica a todos los motores")
+    parser.add_argument('--timeout-rate', type=float, default=None, help="Aplica a todos los motores")
+    parser.add_argument('--latency-scale', type=float, default=1.0, help="Multiplica las medianas")
+    parser.add_argument('--profiles', help="JSON con perfiles por motor (sobrescribe los de serie)")
+    parser.add_argument('--rate-limits', action='store_true', help="Respetar los cooldowns de cada motor")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', action='store_true', help="Imprimir el informe en JSON")
+    parser.add_argument('--save', help="Guardar el informe como línea base")
+    parser.add_argument('--compare', help="Línea base contra la que comparar")
+    parser.add_argument('--tolerance', type=float, default=0.2)
+    args = parser.parse_args(argv)
+
+    engines = [e.strip() for e in args.engines.split(',') if e.strip()]
+    profiles: Dict[str, Dict] = {}
+    if args.profiles:
+        with open(args.profiles, encoding='utf-8') as f:
+            profiles = json.load(f)
+    for name in engines:
+        profile = profiles.setdefault(name, {})
+        if args.error_rate is not None:
+            profile['error_rate'] = args.error_rate
+        if args.timeout_rate is not None:
+            profile['timeout_rate'] = args.timeout_rate
+        if args.latency_scale != 1.0:
+            kind, *params = profile.get('latency', DEFAULT_PROFILES.get(name, {}).get('latency', ('fixed', 0.05)))
+            params[0] *= args.latency_scale
+            if kind == 'uniform':
+                params[1] *= args.latency_scale
+            profile['latency'] = (kind, *params)
+
+    report = run_benchmark(args.requests, args.concurrency, args.distinct, args.zipf, args.max_results,
+                           not args.sequential, args.deadline, engines, profiles, args.engine_timeout,
+                           args.rate_limits, args.seed)
+    if args.json:
+        print(json.dumps(report, indent=2, ensure_ascii=False))
+    else:
+        print_report(report)
+    if args.save:
+        with open(args.save, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            regressions = compare(report, json.load(f), args.tolerance)
+        if regressions:
+            print("❌ Regresiones frente a la línea base:", file=sys.stderr)
+            for line in regressions:
+                print(f"   {line}", file=sys.stderr)
+            return 1
+        print("✅ Sin regresiones frente a la línea base", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
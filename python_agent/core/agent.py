@@ -1,3 +1,9 @@
+import time
+from typing import Dict, Iterator, List
+
+from .intents import IntentMatch, IntentRouter
+from .normalize import ACTION_WORDS, FILLER_PHRASES, MODIFIER_WORDS
+from .result import SearchResult
 from .search_core import NexaSearchCore
 
 class NexaAgent:
@@ -6,34 +12,79 @@ class NexaAgent:
         # Configura tus keys aquí (solo si quieres activar motores premium)
         # self.search.set_key('brave', 'TU_BRAVE_KEY')
         
+        # Las consultas más populares se precalientan en segundo plano mientras el
+        # usuario empieza a escribir (solo motores gratis, respetando sus rate limits)
+        self.search.start_warmup()
+        
+        # Intents: las frases de activación de todos se comparan en una sola pasada por palabras
+        # (sin acentos); "rápido" justo tras el verbo es un modificador y el relleno que le
+        # sigue ("por favor", "sobre") no llega al motor
+        self.router = IntentRouter(fillers=FILLER_PHRASES)
+        self.router.add('search', sorted(ACTION_WORDS), self._handle_search, stream=self._stream_search)
+        self.router.flag('fast', MODIFIER_WORDS)
+        
     def process_query(self, query: str):
         """Procesa consultas que requieren información externa"""
-        # Trigger de búsqueda
-        if "busca" in query.lower() or "encuentra" in query.lower():
-            return self._handle_search(query)
-        return self._generate_response(query)
+        return self.router.dispatch(query, self._generate_response)
     
-    def _handle_search(self, query: str):
-        """Ejecuta búsqueda y formatea resultados para la UI"""
-        # Detectar modo rápido
-        use_fast_mode = "rápido" in query.lower() or "rapido" in query.lower()
+    def process_query_stream(self, query: str) -> Iterator[Dict]:
+        """
+        Versión en streaming de process_query (para SSE / WebSocket). En búsquedas:
         
-        results = self.search.buscar(query, max_results=5, fast_mode=use_fast_mode)
+            {'type': 'search_start', 'query', 'engines'}
+            {'type': 'search_results', 'query', 'engine', 'results', 'partial': True}  → solo los nuevos
+            {'type': 'search_progress', 'engine', 'status', 'elapsed'}
+            {'type': 'done', 'response', 'elapsed'}  → la misma respuesta que process_query
         
+        Los 'search_results' parciales llegan según responde cada motor; el ranking final
+        (fusionado) es el de 'done'. Los intents sin stream propio producen solo el 'done'.
+        """
+        started = time.perf_counter()
+        match = self.router.match(query)
+        if match is not None and match.intent.stream is not None:
+            yield from match.intent.stream(match)
+            return
+        response = match.intent.handler(match) if match is not None else self._generate_response(query)
+        yield {'type': 'done', 'response': response, 'elapsed': round(time.perf_counter() - started, 3)}
+    
+    def _handle_search(self, match: IntentMatch):
+        """Ejecuta búsqueda y formatea resultados para la UI"""
+        results = self.search.buscar(match.payload, max_results=5, fast_mode='fast' in match.flags)
+        return self._search_response(results)
+    
+    def _stream_search(self, match: IntentMatch) -> Iterator[Dict]:
+        started = time.perf_counter()
+        for event in self.search.buscar_stream(match.payload, max_results=5, fast_mode='fast' in match.flags):
+            if event['type'] == 'start':
+                yield {'type': 'search_start', 'query': event['query'], 'engines': event['engines']}
+            elif event['type'] == 'results':
+                yield {'type': 'search_results', 'query': match.payload, 'engine': event['engine'],
+                       'results': self._ui_results(event['results']), 'partial': True,
+                       'elapsed': event['elapsed']}
+            elif event['type'] == 'progress':
+                yield {'type': 'search_progress', 'engine': event['engine'], 'status': event['status'],
+                       'elapsed': event['elapsed']}
+            elif event['type'] == 'done':
+                yield {'type': 'done', 'response': self._search_response(event['summary']),
+                       'elapsed': round(time.perf_counter() - started, 3)}
+    
+    @classmethod
+    def _search_response(cls, results: Dict) -> Dict:
         # Formato para la UI (compatible con tu interfaz actual)
-        response = {
+        return {
             "type": "search_results",
             "query": results["query"],
-            "results": [
-                {
-                    "title": r["title"],
-                    "url": r["url"],
-                    "source": r["source"].upper(),
-                    "snippet": r["snippet"]
-                } for r in results["results"]
-            ]
+            "results": cls._ui_results(results["results"])
         }
-        return response
+
+    @staticmethod
+    def _ui_results(results: List[SearchResult]) -> List[Dict]:
+        # Dicts nuevos, serializables con json.dumps: los SearchResult cacheados no salen del core
+        return [{**r.to_dict(), "source": r.source.upper()} for r in results]
+
+    def close(self):
+        """Detiene el precalentamiento y libera la cache, los pools y la sesión HTTP"""
+        self.search.close()
 
     def _generate_response(self, query: str):
         # Fallback/Placeholder for non-search queries
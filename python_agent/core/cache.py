@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+NEXA SEARCH CACHE
+Cache LRU + TTL acotada por entradas y bytes aproximados, con purga en segundo plano
+y backend persistente opcional en SQLite (WAL) compartido entre procesos
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .result import json_default
+
+
+class SQLiteCacheBackend:
+    """Almacén persistente en SQLite, seguro para varios procesos del mismo host"""
+
+    def __init__(self, path: str, busy_timeout: float = 5.0):
+        self.path = path
+        self.busy_timeout = busy_timeout
+        self._local = threading.local()
+        # Todas las conexiones abiertas (una por hilo) para poder cerrarlas juntas en close()
+        self._conns: List[sqlite3.Connection] = []
+        self._conns_lock = threading.Lock()
+        self._closed = False
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+        conn = self._conn()
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute(
+            'CREATE TABLE IF NOT EXISTS search_cache ('
+            ' key TEXT PRIMARY KEY,'
+            ' timestamp REAL NOT NULL,'
+            ' data TEXT NOT NULL)'
+        )
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_search_cache_ts ON search_cache (timestamp)')
+        conn.commit()
+
+    def _conn(self) -> sqlite3.Connection:
+        # Una conexión por hilo (cada hilo usa solo la suya; close() las cierra todas)
+        if self._closed:
+            raise sqlite3.ProgrammingError("Backend de cache cerrado")
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=self.busy_timeout, check_same_thread=False)
+            conn.execute('PRAGMA synchronous=NORMAL')
+            with self._conns_lock:
+                if self._closed:
+                    conn.close()
+                    raise sqlite3.ProgrammingError("Backend de cache cerrado")
+                self._conns.append(conn)
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: str) -> Optional[Tuple[float, Any]]:
+        row = self._conn().execute(
+            'SELECT timestamp, data FROM search_cache WHERE key = ?', (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        return row[0], json.loads(row[1])
+
+    def set(self, key: str, timestamp: float, data: Any):
+        conn = self._conn()
+        conn.execute(
+            'INSERT OR REPLACE INTO search_cache (key, timestamp, data) VALUES (?, ?, ?)',
+            (key, timestamp, json.dumps(data, ensure_ascii=False, default=json_default))
+        )
+        conn.commit()
+
+    def delete(self, key: str):
+        conn = self._conn()
+        conn.execute('DELETE FROM search_cache WHERE key = ?', (key,))
+        conn.commit()
+
+    def recent(self, since: float, limit: int) -> List[Tuple[str, float, Any]]:
+        """Entradas más recientes que `since`, de la más nueva a la más vieja"""
+        rows = self._conn().execute(
+            'SELECT key, timestamp, data FROM search_cache WHERE timestamp >= ?'
+            ' ORDER BY timestamp DESC LIMIT ?', (since, limit)
+        ).fetchall()
+        return [(key, ts, json.loads(data)) for key, ts, data in rows]
+
+    def purge_before(self, cutoff: float) -> int:
+        conn = self._conn()
+        cursor = conn.execute('DELETE FROM search_cache WHERE timestamp < ?', (cutoff,))
+        conn.commit()
+        return cursor.rowcount
+
+    def clear(self):
+        conn = self._conn()
+        conn.execute('DELETE FROM search_cache')
+        conn.commit()
+
+    def close(self):
+        """Cierra las conexiones de todos los hilos (pool de búsqueda, refrescos, purga...)"""
+        with self._conns_lock:
+            self._closed = True
+            conns, self._conns = self._conns, []
+        for conn in conns:
+            conn.close()
+        self._local.conn = None
+
+
+class SearchCache:
+    def __init__(self, max_entries: int = 1000, max_bytes: int = 32 * 1024 * 1024,
+                 ttl: float = 300, purge_interval: float = 60,
+                 backend: Optional[SQLiteCacheBackend] = None, stale_ttl: Optional[float] = None,
+                 decode: Optional[Callable[[Any], Any]] = None):
+        """
+        Args:
+            max_entries: Máximo de entradas antes de expulsar la menos usada
+            max_bytes: Tamaño aproximado máximo (JSON serializado) de todas las entradas
+            ttl: Segundos que una entrada se considera fresca (TTL blando)
+            purge_interval: Cada cuántos segundos se purgan las expiradas (0 = sin hilo)
+            backend: Almacén persistente opcional; la memoria actúa como L1 delante de él
+            stale_ttl: TTL duro; entre ttl y stale_ttl la entrada aún se puede servir como
+                'stale' mientras se revalida (default: igual a ttl, sin stale-while-revalidate)
+            decode: Convierte lo leído del backend (JSON plano) al formato en memoria
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.stale_ttl = max(ttl, stale_ttl if stale_ttl is not None else ttl)
+        self.backend = backend
+        self.decode = decode
+
+        # key -> (timestamp, size, data); el orden es el de uso (LRU al principio)
+        self._entries: 'OrderedDict[str, tuple]' = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._counters = {'hits': 0, 'stale_hits': 0, 'misses': 0, 'evictions': 0, 'expirations': 0,
+                          'backend_hits': 0, 'backend_errors': 0}
+
+        self._stop = threading.Event()
+        self._purger: Optional[threading.Thread] = None
+        if purge_interval > 0:
+            self._purger = threading.Thread(target=self._purge_loop, args=(purge_interval,),
+                                            name='nexa-cache-purge', daemon=True)
+            self._purger.start()
+
+    # ────────────────────────────────────────────────────────────────────
+    # 📦 API DE CACHE
+    # ────────────────────────────────────────────────────────────────────
+
+    def get(self, key: str, accept: Optional[Callable[[Any], bool]] = None) -> Optional[Any]:
+        """
+        Args:
+            key: Clave de la entrada
+            accept: Filtro opcional; una entrada vigente que no lo cumple cuenta como miss
+        """
+        found = self.lookup(key, accept, allow_stale=False)
+        return found[0] if found is not None else None
+
+    def lookup(self, key: str, accept: Optional[Callable[[Any], bool]] = None,
+               allow_stale: bool = True) -> Optional[Tuple[Any, bool]]:
+        """
+        Devuelve (data, stale) o None. stale=True si la entrada pasó el TTL blando pero
+        no el duro: se puede servir ya, y quien llama decide revalidarla en segundo plano.
+        """
+        max_age = self.stale_ttl if allow_stale else self.ttl
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                age = time.time() - entry[0]
+                if age < max_age:
+                    if accept is None or accept(entry[2]):
+                        self._entries.move_to_end(key)
+                        self._counters['stale_hits' if age >= self.ttl else 'hits'] += 1
+                        return entry[2], age >= self.ttl
+                    self._counters['misses'] += 1
+                    return None
+                if age >= self.stale_ttl:
+                    self._drop(key)
+                    self._counters['expirations'] += 1
+
+        # L2: otro proceso (o una ejecución anterior) pudo haberla guardado
+        stored = self._backend_call('get', key)
+        if stored is not None and time.time() - stored[0] < max_age:
+            stored = stored[0], self._decode(stored[1])
+            self._store(key, stored[1], stored[0])
+            if accept is None or accept(stored[1]):
+                stale = time.time() - stored[0] >= self.ttl
+                with self._lock:
+                    self._counters['stale_hits' if stale else 'hits'] += 1
+                    self._counters['backend_hits'] += 1
+                return stored[1], stale
+
+        with self._lock:
+            self._counters['misses'] += 1
+        return None
+
+    def set(self, key: str, data: Any, timestamp: Optional[float] = None):
+        timestamp = timestamp if timestamp is not None else time.time()
+        self._store(key, data, timestamp)
+        self._backend_call('set', key, timestamp, data)
+
+    def warm_load(self, limit: Optional[int] = None) -> int:
+        """Carga en memoria las entradas vigentes más recientes del backend persistente"""
+        if self.backend is None:
+            return 0
+        rows = self._backend_call('recent', time.time() - self.stale_ttl, limit or self.max_entries) or []
+        # De la más vieja a la más nueva para que las recientes queden al final del LRU
+        for key, timestamp, data in reversed(rows):
+            self._store(key, self._decode(data), timestamp)
+        return len(rows)
+
+    def _store(self, key: str, data: Any, timestamp: float):
+        size = self._sizeof(data)
+        if size > self.max_bytes:
+            return  # Nunca cabría: no vale la pena vaciar la cache por ella
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (timestamp, size, data)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._drop(oldest)
+                self._counters['evictions'] += 1
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry is not None and time.time() - entry[0] < self.ttl
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def age(self, key: str) -> Optional[float]:
+        """Segundos desde que se guardó la entrada en memoria (None si no está)"""
+        with self._lock:
+            entry = self._entries.get(key)
+            return time.time() - entry[0] if entry is not None else None
+
+    def purge_expired(self) -> int:
+        """Elimina todas las entradas que pasaron el TTL duro y devuelve cuántas se quitaron"""
+        now = time.time()
+        with self._lock:
+            expired = [key for key, entry in self._entries.items() if now - entry[0] >= self.stale_ttl]
+            for key in expired:
+                self._drop(key)
+            self._counters['expirations'] += len(expired)
+        self._backend_call('purge_before', now - self.stale_ttl)
+        return len(expired)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+        self._backend_call('clear')
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self._counters['hits'] + self._counters['stale_hits'] + self._counters['misses']
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_entries': self.max_entries,
+                'max_bytes': self.max_bytes,
+                **self._counters,
+                'hit_rate': round((self._counters['hits'] + self._counters['stale_hits']) / lookups, 4) if lookups else 0.0,
+                'persistent': self.backend.path if self.backend else None
+            }
+
+    def close(self):
+        self._stop.set()
+        if self.backend is not None:
+            self.backend.close()
+
+    # ────────────────────────────────────────────────────────────────────
+    # 🧹 UTILIDADES
+    # ────────────────────────────────────────────────────────────────────
+
+    def _drop(self, key: str):
+        entry = self._entries.pop(key)
+        self._bytes -= entry[1]
+
+    def _decode(self, data: Any) -> Any:
+        return self.decode(data) if self.decode is not None else data
+
+    def _backend_call(self, method: str, *args):
+        """Un fallo del disco degrada a cache solo en memoria, nunca rompe la búsqueda"""
+        if self.backend is None:
+            return None
+        try:
+            return getattr(self.backend, method)(*args)
+        except (sqlite3.Error, ValueError, OSError):
+            with self._lock:
+                self._counters['backend_errors'] += 1
+            return None
+
+    def _purge_loop(self, interval: float):
+        while not self._stop.wait(interval):
+            self.purge_expired()
+
+    @staticmethod
+    def _sizeof(data: Any) -> int:
+        try:
+            return len(json.dumps(data, ensure_ascii=False, default=json_default).encode('utf-8'))
+        except (TypeError, ValueError):
+            return len(repr(data))
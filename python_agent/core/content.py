@@ -0,0 +1,328 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+NEXA CONTENT FETCHER
+Etapa opcional tras buscar(): descarga en paralelo las páginas de los primeros resultados
+(pool de conexiones compartido, límite de conexiones por host, tope de bytes y timeout)
+y extrae el texto principal con un parser HTML en streaming. El texto se cachea por URL
+y se revalida con ETag / Last-Modified, así una página repetida no se vuelve a bajar.
+"""
+
+import codecs
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from html.parser import HTMLParser
+from typing import Dict, List, Optional
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .cache import SearchCache
+from .result import SearchResult
+
+logger = logging.getLogger(__name__)
+
+# Contenedores cuyo texto nunca es contenido principal
+SKIP_TAGS = frozenset((
+    'script', 'style', 'noscript', 'svg', 'nav', 'header', 'footer', 'aside', 'form',
+    'iframe', 'template', 'button', 'select', 'canvas', 'figure'
+))
+# Etiquetas que cortan párrafo
+BLOCK_TAGS = frozenset((
+    'p', 'div', 'li', 'ul', 'ol', 'br', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'section',
+    'article', 'main', 'blockquote', 'pre', 'tr', 'td', 'th', 'table', 'dd', 'dt', 'hr'
+))
+MAIN_TAGS = frozenset(('article', 'main'))
+VOID_TAGS = frozenset(('br', 'hr', 'img', 'input', 'meta', 'link', 'source', 'wbr', 'area', 'col', 'embed'))
+
+
+class HTMLTextExtractor(HTMLParser):
+    """
+    HTML -> texto en una sola pasada y por trozos (feed() a medida que llegan los bytes).
+    Ignora scripts, menús, cabeceras y pies; si la página tiene <article>/<main> con texto
+    suficiente se queda solo con eso. `done` pasa a True cuando ya hay texto de sobra.
+    """
+
+    def __init__(self, max_chars: int = 4000, min_paragraph: int = 40):
+        super().__init__(convert_charrefs=True)
+        self.max_chars = max_chars
+        self.min_paragraph = min_paragraph
+        self.title = ''
+        self.done = False
+        self._in_title = False
+        self._skip = 0
+        self._main = 0
+        self._line: List[str] = []
+        self._paragraphs: List[tuple] = []  # (texto, dentro de article/main)
+        self._chars = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in SKIP_TAGS:
+            self._skip += 1
+        elif tag == 'title':
+            self._in_title = True
+        if tag in BLOCK_TAGS:
+            self._flush_line()
+        if tag in MAIN_TAGS:
+            self._main += 1
+
+    def handle_startendtag(self, tag, attrs):
+        if tag in BLOCK_TAGS:
+            self._flush_line()
+
+    def handle_endtag(self, tag):
+        if tag in BLOCK_TAGS:
+            self._flush_line()
+        if tag in SKIP_TAGS and self._skip and tag not in VOID_TAGS:
+            self._skip -= 1
+        elif tag == 'title':
+            self._in_title = False
+        elif tag in MAIN_TAGS and self._main:
+            self._main -= 1
+
+    def handle_data(self, data):
+        if self._in_title:
+            self.title += data
+        elif not self._skip and not self.done:
+            self._line.append(data)
+
+    def _flush_line(self):
+        if not self._line:
+            return
+        text = ' '.join(''.join(self._line).split())
+        self._line = []
+        # Las líneas cortas suelen ser menús, migas de pan o botones
+        if len(text) < self.min_paragraph:
+            return
+        self._paragraphs.append((text, self._main > 0))
+        self._chars += len(text)
+        # Margen de 3x: al final se descarta lo que quede fuera de <article>/<main>
+        if self._chars >= self.max_chars * 3:
+            self.done = True
+
+    def text(self) -> str:
+        self._flush_line()
+        main = [text for text, in_main in self._paragraphs if in_main]
+        paragraphs = main if sum(map(len, main)) >= self.min_paragraph * 3 else [t for t, _ in self._paragraphs]
+        out, size = [], 0
+        for paragraph in paragraphs:
+            if size + len(paragraph) > self.max_chars:
+                out.append(paragraph[:max(0, self.max_chars - size)].rsplit(' ', 1)[0] + '…')
+                break
+            out.append(paragraph)
+            size += len(paragraph) + 1
+        return '\n'.join(p for p in out if p.strip('…'))
+
+
+class ContentFetcher:
+    def __init__(self, session: Optional[requests.Session] = None, max_workers: int = 8, per_host: int = 2,
+                 max_bytes: int = 1024 * 1024, timeout: float = 5, max_chars: int = 4000,
+                 cache_entries: int = 500, cache_ttl: float = 3600, cache_stale_ttl: float = 7 * 86400):
+        """
+        Args:
+            session: Sesión HTTP (default: una propia con pool de max_workers conexiones)
+            max_workers: Páginas descargándose a la vez
+            per_host: Conexiones simultáneas como mucho contra un mismo host
+            max_bytes: Se deja de leer una página al pasar este tamaño
+            timeout: Segundos máximos por página (conexión + lectura completa)
+            max_chars: Longitud máxima del texto extraído
+            cache_entries: Páginas en la cache de contenido
+            cache_ttl: Segundos que el texto se sirve sin revalidar
+            cache_stale_ttl: Hasta cuándo se guarda para revalidar con ETag / Last-Modified
+        """
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers)
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            session.headers.update({
+                'User-Agent': 'NEXA-AI/1.0 (Cyberpunk Edition)',
+                'Accept': 'text/html,application/xhtml+xml;q=0.9,text/plain;q=0.8',
+                'Accept-Language': 'es-ES,es;q=0.9'
+            })
+        self.session = session
+        self.max_workers = max_workers
+        self.per_host = per_host
+        self.max_bytes = max_bytes
+        self.timeout = timeout
+        self.max_chars = max_chars
+        self.cache = SearchCache(max_entries=cache_entries, max_bytes=64 * 1024 * 1024, ttl=cache_ttl,
+                                 stale_ttl=cache_stale_ttl)
+        self._hosts: Dict[str, threading.BoundedSemaphore] = {}
+        self._hosts_lock = threading.Lock()
+        self._pool: Optional[ThreadPoolExecutor] = None
+
+    # ────────────────────────────────────────────────────────────────────
+    # 📄 DESCARGA
+    # ────────────────────────────────────────────────────────────────────
+
+    def fetch(self, url: str) -> Dict:
+        """
+        Texto principal de una página:
+        {'url', 'title', 'content', 'status', 'bytes', 'elapsed'[, 'error']}
+        status: 'ok', 'cached', 'revalidated', 'unsupported', 'timeout' o 'error'
+        """
+        started = time.time()
+        found = self.cache.lookup(url)
+        if found is not None and not found[1]:
+            return self._page(url, found[0], 'cached', 0, started)
+        stored = found[0] if found is not None else None
+
+        headers = {}
+        if stored and stored.get('etag'):
+            headers['If-None-Match'] = stored['etag']
+        if stored and stored.get('last_modified'):
+            headers['If-Modified-Since'] = stored['last_modified']
+
+        slot = self._host_slot(url)
+        if not slot.acquire(timeout=self.timeout):
+            return self._page(url, None, 'timeout', 0, started, "sin hueco para el host")
+        try:
+            return self._download(url, headers, stored, started)
+        except requests.Timeout as e:
+            logger.debug("Timeout leyendo %s: %r", url, e)
+            return self._page(url, stored, 'timeout', 0, started, repr(e))
+        except (requests.RequestException, ValueError) as e:
+            logger.debug("No se pudo leer %s: %r", url, e)
+            return self._page(url, stored, 'error', 0, started, repr(e))
+        finally:
+            slot.release()
+
+    def _download(self, url: str, headers: Dict, stored: Optional[Dict], started: float) -> Dict:
+        with self.session.get(url, headers=headers, stream=True, timeout=self.timeout) as r:
+            if r.status_code == 304 and stored is not None:
+                self.cache.set(url, stored)  # Sigue vigente: se renueva el TTL sin bajar nada
+                return self._page(url, stored, 'revalidated', 0, started)
+            r.raise_for_status()
+            content_type = r.headers.get('Content-Type', '').lower()
+            if content_type and 'html' not in content_type and 'text/plain' not in content_type:
+                return self._page(url, None, 'unsupported', 0, started, content_type)
+
+            extractor = HTMLTextExtractor(self.max_chars)
+            decoder = codecs.getincrementaldecoder(self._encoding(r))(errors='replace')
+            plain: Optional[List[str]] = [] if 'text/plain' in content_type else None
+            received = 0
+            for chunk in r.iter_content(chunk_size=16 * 1024):
+                received += len(chunk)
+                text = decoder.decode(chunk)
+                if plain is not None:
+                    plain.append(text)
+                else:
+                    extractor.feed(text)
+                # Tope de bytes, texto suficiente o tiempo agotado: se corta la descarga
+                if received >= self.max_bytes or extractor.done or time.time() - started > self.timeout:
+                    break
+            if plain is not None:
+                content = ' '.join(''.join(plain).split())[:self.max_chars]
+            else:
+                extractor.feed(decoder.decode(b'', final=True))
+                extractor.close()
+                content = extractor.text()
+            data = {
+                'title': ' '.join(extractor.title.split()),
+                'content': content,
+                'etag': r.headers.get('ETag'),
+                'last_modified': r.headers.get('Last-Modified')
+            }
+        self.cache.set(url, data)
+        return self._page(url, data, 'ok', received, started)
+
+    def fetch_many(self, urls: List[str], deadline: Optional[float] = None) -> Dict[str, Dict]:
+        """Descarga varias páginas en paralelo; las que no acaben antes del deadline salen como 'timeout'"""
+        urls = list(dict.fromkeys(urls))
+        if not urls:
+            return {}
+        started = time.time()
+        pool = self._get_pool()
+        futures = {pool.submit(self.fetch, url): url for url in urls}
+        done, pending = wait(futures, timeout=deadline if deadline is not None else self.timeout * 2)
+        pages = {futures[f]: f.result() for f in done}
+        for future in pending:
+            future.cancel()
+            pages[futures[future]] = self._page(futures[future], None, 'timeout', 0, started, "deadline")
+        return {url: pages[url] for url in urls}
+
+    def enrich(self, resultados: Dict, top_k: int = 3, deadline: Optional[float] = None) -> Dict:
+        """
+        Copia de un resultado de buscar() con 'content' en los top_k primeros resultados
+        (los que no se pudieron leer quedan sin él). El dict original, que puede estar en
+        la cache de búsquedas, no se modifica.
+        """
+        started = time.time()
+        results = list(resultados.get('results', []))
+        urls = [r['url'] for r in results[:top_k] if r.get('url')]
+        pages = self.fetch_many(urls, deadline)
+        for i, result in enumerate(results[:top_k]):
+            page = pages.get(result.get('url'))
+            if page and page['content']:
+                results[i] = result.with_content(page['content']) if isinstance(result, SearchResult) \
+                    else {**result, 'content': page['content']}
+        statuses: Dict[str, int] = {}
+        for page in pages.values():
+            statuses[page['status']] = statuses.get(page['status'], 0) + 1
+        return {
+            **resultados,
+            'results': results,
+            'content': {
+                'fetched': len(pages),
+                'with_content': sum(1 for page in pages.values() if page['content']),
+                'status': statuses,
+                'bytes': sum(page['bytes'] for page in pages.values()),
+                'time': round(time.time() - started, 3)
+            }
+        }
+
+    # ────────────────────────────────────────────────────────────────────
+    # 🧩 UTILIDADES
+    # ────────────────────────────────────────────────────────────────────
+
+    def _host_slot(self, url: str) -> threading.BoundedSemaphore:
+        host = urlsplit(url).netloc.lower()
+        with self._hosts_lock:
+            slot = self._hosts.get(host)
+            if slot is None:
+                slot = self._hosts[host] = threading.BoundedSemaphore(self.per_host)
+            return slot
+
+    def _get_pool(self) -> ThreadPoolExecutor:
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='nexa-content')
+        return self._pool
+
+    @staticmethod
+    def _encoding(r: requests.Response) -> str:
+        # requests asume ISO-8859-1 para text/* sin charset; en la web actual casi siempre es UTF-8
+        encoding = r.encoding if 'charset' in r.headers.get('Content-Type', '').lower() else 'utf-8'
+        try:
+            codecs.lookup(encoding)
+        except LookupError:
+            encoding = 'utf-8'
+        return encoding
+
+    @staticmethod
+    def _page(url: str, data: Optional[Dict], status: str, received: int, started: float,
+              error: Optional[str] = None) -> Dict:
+        page = {
+            'url': url,
+            'title': data.get('title', '') if data else '',
+            'content': data.get('content', '') if data else '',
+            'status': status,
+            'bytes': received,
+            'elapsed': round(time.time() - started, 3)
+        }
+        if error:
+            page['error'] = error
+        return page
+
+    def stats(self) -> Dict:
+        return {'cache': self.cache.stats(), 'hosts': len(self._hosts)}
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+        self.cache.close()
+        self.session.close()
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+NEXA DEDUP
+Deduplicación incremental O(n) mientras llegan resultados: URL normalizada una sola vez
+(esquema, www, parámetros de tracking, barra final) y sketch MinHash de los trigramas del
+snippet para detectar casi-duplicados entre motores (válido dentro del proceso, no se persiste)
+"""
+
+import re
+from typing import Dict, List, Optional, Set, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+TRACKING_PARAMS = {
+    'gclid', 'fbclid', 'msclkid', 'dclid', 'yclid', 'mc_cid', 'mc_eid',
+    'ref', 'ref_src', 'igshid', '_hsenc', '_hsmi', 'spm', 'si'
+}
+TRACKING_PREFIXES = ('utm_', 'pk_', 'mtm_')
+
+_TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def normalize_url(url: str) -> str:
+    """
+    Clave canónica de una URL: sin esquema, sin 'www.', host en minúsculas,
+    sin parámetros de tracking, query ordenada, sin fragmento ni barra final
+    """
+    try:
+        parts = urlsplit(url.strip())
+    except ValueError:
+        return url.strip().lower()
+    host = parts.netloc.lower()
+    if host.startswith('www.'):
+        host = host[4:]
+    if host.endswith(':80') or host.endswith(':443'):
+        host = host.rsplit(':', 1)[0]
+    path = parts.path.rstrip('/') or ''
+    query = [
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if k.lower() not in TRACKING_PARAMS and not k.lower().startswith(TRACKING_PREFIXES)
+    ]
+    query.sort()
+    key = host + path
+    if query:
+        key += '?' + urlencode(query)
+    return key
+
+
+def minhash(text: str, k: int = 16) -> Optional[Tuple[int, ...]]:
+    """Sketch MinHash (bottom-k) de los trigramas de palabras del texto (None si es corto)"""
+    return _sketch(_TOKEN_RE.findall(text.lower()), k)
+
+
+def snippet_signature(text: str) -> Tuple[int, Optional[Tuple[int, ...]]]:
+    """(número de palabras, sketch MinHash) tokenizando el texto una sola vez"""
+    tokens = _TOKEN_RE.findall(text.lower())
+    return len(tokens), _sketch(tokens)
+
+
+def _sketch(tokens: List[str], k: int = 16) -> Optional[Tuple[int, ...]]:
+    # Un hash por trigrama (hash() de Python: el sketch solo se compara dentro del proceso)
+    # y los k menores, ordenados; todo en C salvo la comprensión
+    if len(tokens) < 3:
+        return None
+    return tuple(sorted({hash(shingle) for shingle in zip(tokens, tokens[1:], tokens[2:])})[:k])
+
+
+def similarity(a: Tuple[int, ...], b: Tuple[int, ...]) -> float:
+    """Jaccard estimado entre dos sketches: de los k menores de la unión, cuántos están en ambos"""
+    k = max(len(a), len(b))
+    union = sorted(set(a) | set(b))[:k]
+    both = set(a) & set(b)
+    return sum(1 for h in union if h in both) / len(union)
+
+
+class Deduplicator:
+    """
+    Acumula resultados únicos a medida que llegan. Cada URL se normaliza una vez y
+    los snippets se comparan por MinHash: cada hash del sketch indexa el resultado, así
+    una inserción solo compara contra los que comparten algún trigrama de su sketch
+    (los casi-duplicados comparten la mayoría).
+    """
+
+    def __init__(self, min_similarity: float = 0.6, min_snippet_tokens: int = 6):
+        self.min_similarity = min_similarity
+        self.min_snippet_tokens = min_snippet_tokens
+        self.results: List[Dict] = []
+        self.duplicates = 0
+        self._urls: Set[str] = set()
+        self._sketches: Dict[int, List[Tuple[Tuple[int, ...], str]]] = {}
+
+    def add(self, result: Dict) -> bool:
+        """Añade el resultado si es nuevo; devuelve True si se aceptó"""
+        return self.resolve(result)[1]
+
+    def resolve(self, result: Dict) -> Tuple[Optional[str], bool]:
+        """
+        Devuelve (clave canónica, es_nuevo). Un casi-duplicado resuelve a la clave del
+        resultado que ya estaba; None si el resultado no tiene URL utilizable.
+        """
+        key = _url_key(result)
+        if not key:
+            return None, False
+        if key in self._urls:
+            self.duplicates += 1
+            return key, False
+
+        tokens, sketch = _signature(result)
+        if tokens < self.min_snippet_tokens:
+            sketch = None
+        if sketch is not None:
+            original = self._near_duplicate(sketch)
+            if original is not None:
+                self.duplicates += 1
+                return original, False
+
+        self._urls.add(key)
+        if sketch is not None:
+            for h in sketch:
+                self._sketches.setdefault(h, []).append((sketch, key))
+        self.results.append(result)
+        return key, True
+
+    def extend(self, results: List[Dict]) -> int:
+        """Añade varios resultados; devuelve cuántos eran nuevos"""
+        return sum(1 for r in results if self.add(r))
+
+    def __len__(self) -> int:
+        return len(self.results)
+
+    def _near_duplicate(self, sketch: Tuple[int, ...]) -> Optional[str]:
+        """Clave del resultado ya visto cuyo snippet es casi idéntico, si lo hay"""
+        checked = set()
+        for h in sketch:
+            for other, key in self._sketches.get(h, ()):
+                if key not in checked:
+                    checked.add(key)
+                    if similarity(sketch, other) >= self.min_similarity:
+                        return key
+        return None
+
+
+def _url_key(result) -> str:
+    # SearchResult memoriza la URL normalizada; un dict se normaliza cada vez
+    if isinstance(result, dict):
+        url = result.get('url', '')
+        return normalize_url(url) if url else ''
+    return result.url_key
+
+
+def _signature(result) -> Tuple[int, Optional[Tuple[int, ...]]]:
+    if isinstance(result, dict):
+        return snippet_signature(result.get('snippet', ''))
+    return result.signature
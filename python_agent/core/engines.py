@@ -0,0 +1,434 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+NEXA ENGINES
+Registro de motores de búsqueda enchufables. Cada motor declara su configuración
+(coste, peso, timeout, rate limit, cuota) y expone search() síncrono y/o asearch()
+async; los motores HTTP separan la petición del parser.
+✅ DuckDuckGo | ✅ SearXNG | ✅ Brave | ✅ You.com | ✅ Google CSE | ✅ SerpAPI
+"""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import requests
+
+from .health import InstancePool
+from .result import SearchResult
+
+# Valores por defecto de la configuración de un motor
+DEFAULT_CONFIG = {
+    'enabled': True,
+    'type': 'local',
+    'timeout': 4,
+    'cooldown': 0,     # Segundos entre peticiones (tasa del token bucket = 1 / cooldown)
+    'cost': 0,         # Coste relativo por llamada (0 = gratis)
+    'weight': 1.0      # Peso en la fusión de rankings
+}
+
+
+class SearchEngine:
+    """
+    Interfaz mínima de un motor. Basta con implementar search() (o asearch() y
+    poner is_async = True). La configuración vive en `config`, que es el mismo dict
+    que NexaSearchCore expone en `engines[nombre]`.
+    """
+
+    is_async = False
+
+    def __init__(self, name: str, config: Optional[Dict] = None, **overrides):
+        self.name = name
+        self.config = {**DEFAULT_CONFIG, **(config or {}), **overrides}
+        self.bytes_received = 0  # Tamaño acumulado de las respuestas (para las métricas)
+        self._bytes_lock = threading.Lock()
+
+    def search(self, query: str, limit: int) -> List[Dict]:
+        if self.is_async:
+            # Motor nativamente async usado desde un hilo del pool (sin event loop propio)
+            return asyncio.run(self.asearch(query, limit))
+        raise NotImplementedError
+
+    async def asearch(self, query: str, limit: int) -> List[Dict]:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.search, query, limit)
+
+    def covers(self, query: str, results: List[Dict], limit: int) -> bool:
+        """
+        Motores locales: True si `results` bastan para responder sin ir a la red (el core
+        solo lo pregunta cuando ya hay `limit` resultados únicos)
+        """
+        return True
+
+    def fetched_at(self, results: List[Dict]) -> Optional[float]:
+        """
+        Motores locales: cuándo trajo la red el más viejo de `results` (epoch). El core
+        fecha así en la cache lo que respondió sin red; None = ahora
+        """
+        return None
+
+    def stats(self) -> Dict:
+        """Datos extra para get_stats() (p.ej. estado de instancias)"""
+        return {}
+
+    def close(self):
+        pass
+
+    def _count_bytes(self, n: int):
+        with self._bytes_lock:
+            self.bytes_received += n
+
+    def _result(self, title: str, url: str, snippet: str) -> SearchResult:
+        return SearchResult(title, url, self.name, snippet)
+
+
+class HttpEngine(SearchEngine):
+    """Motor JSON sobre HTTP: build_request() arma la petición y parse() la interpreta"""
+
+    def __init__(self, name: str, session: requests.Session, config: Optional[Dict] = None, **overrides):
+        super().__init__(name, config, **overrides)
+        self.session = session
+
+    def build_request(self, query: str, limit: int) -> Tuple[str, Dict, Optional[Dict]]:
+        """Devuelve (url, params, headers)"""
+        raise NotImplementedError
+
+    def parse(self, data: Any, query: str, limit: int) -> List[Dict]:
+        raise NotImplementedError
+
+    def check_config(self):
+        """Lanza ValueError si falta configuración (p.ej. la API key)"""
+
+    def search(self, query: str, limit: int) -> List[Dict]:
+        self.check_config()
+        url, params, headers = self.build_request(query, limit)
+        return self.parse(self._get_json(url, params, headers), query, limit)[:limit]
+
+    def _get_json(self, url: str, params: Dict, headers: Optional[Dict] = None) -> Any:
+        r = self.session.get(url, params=params, headers=headers, timeout=self.config['timeout'])
+        self._count_bytes(len(r.content))
+        r.raise_for_status()
+        return r.json()
+
+
+# ────────────────────────────────────────────────────────────────────
+# 🔍 MOTORES INTEGRADOS
+# ────────────────────────────────────────────────────────────────────
+
+class DuckDuckGoEngine(HttpEngine):
+    def __init__(self, session: requests.Session):
+        super().__init__('duckduckgo', session, {
+            'type': 'official',
+            'url': 'https://api.duckduckgo.com',
+            'timeout': 3,
+            'cooldown': 0,
+            'cost': 0,
+            'weight': 0.8  # Los Related Topics son flojos frente a resultados web reales
+        })
+
+    def build_request(self, query, limit):
+        params = {
+            'q': query,
+            'format': 'json',
+            'no_html': 1,
+            'skip_disambig': 1,
+            't': 'NEXA'
+        }
+        return self.config['url'], params, None
+
+    def parse(self, data, query, limit):
+        results = []
+        # Resultados principales
+        if data.get('AbstractURL'):
+            results.append(self._result(data.get('Heading', query), data['AbstractURL'],
+                                        data.get('AbstractText', '')))
+
+        # Related Topics
+        for item in data.get('RelatedTopics', [])[:limit]:
+            if isinstance(item, dict) and 'FirstURL' in item:
+                results.append(self._result(item.get('Text', query), item['FirstURL'], item.get('Text', '')))
+            elif isinstance(item, dict) and 'Topics' in item:
+                for sub in item.get('Topics', [])[:2]:
+                    if 'FirstURL' in sub:
+                        results.append(self._result(sub.get('Text', query), sub['FirstURL'], sub.get('Text', '')))
+        return results
+
+
+class SearXNGEngine(HttpEngine):
+    def __init__(self, session: requests.Session):
+        super().__init__('searxng', session, {
+            'type': 'public',
+            'instances': [
+                'https://searx.be',
+                'https://search.unlocked.link',
+                'https://searxng.site',
+                'https://searx.work',
+                'https://northboot.xyz'
+            ],
+            'timeout': 5,
+            'cooldown': 1,
+            'cost': 0,
+            'weight': 1.0,
+            'max_attempts': 3,  # Instancias a probar por búsqueda
+            'race': False       # True = lanzar las 2 mejores a la vez y quedarse con la primera
+        })
+        # Mirrors: latencia/éxito por instancia y cuarentena de las caídas
+        self.pool = InstancePool(self.config['instances'], failure_threshold=2, reset_timeout=60)
+        self._race_pool: Optional[ThreadPoolExecutor] = None
+
+    def build_request(self, query, limit):
+        params = {
+            'q': query,
+            'format': 'json',
+            'language': 'es',
+            'safesearch': 0,
+            'categories': 'general'
+        }
+        return '', params, None
+
+    def parse(self, data, query, limit):
+        return [
+            self._result(item.get('title', 'Sin título'), item.get('url', ''), item.get('content', ''))
+            for item in data.get('results', [])[:limit]
+        ]
+
+    def search(self, query: str, limit: int) -> List[Dict]:
+        # Las instancias más rápidas y sanas primero; las que fallan quedan en cuarentena
+        candidates = self.pool.ranked(self.config.get('max_attempts', 3))
+        if not candidates:
+            raise RuntimeError("Todas las instancias de SearXNG están en cuarentena")
+
+        last_error = None
+        if self.config.get('race') and len(candidates) > 1:
+            # Carrera entre las dos mejores: gana la primera que responda con resultados
+            racers, candidates = candidates[:2], candidates[2:]
+            futures = [self._get_race_pool().submit(self._query_instance, instance, query, limit)
+                       for instance in racers]
+            for future in as_completed(futures):
+                try:
+                    results = future.result()
+                except Exception as e:
+                    last_error = e
+                    continue
+                if results:
+                    return results
+
+        for instance in candidates:
+            try:
+                results = self._query_instance(instance, query, limit)
+            except Exception as e:
+                last_error = e
+                continue
+            if results:
+                return results
+        if last_error is not None:
+            raise last_error  # Todas las instancias fallaron: que cuente como error del motor
+        return []
+
+    def _query_instance(self, instance: str, query: str, limit: int) -> List[Dict]:
+        _, params, _ = self.build_request(query, limit)
+        started = time.time()
+        try:
+            data = self._get_json(f"{instance.rstrip('/')}/search", params)
+        except Exception as e:
+            self.pool.record_failure(instance, time.time() - started, type(e).__name__)
+            raise
+        self.pool.record_success(instance, time.time() - started)
+        return self.parse(data, query, limit)
+
+    def _get_race_pool(self) -> ThreadPoolExecutor:
+        # Pool aparte: las carreras se lanzan desde hilos del pool principal
+        if self._race_pool is None:
+            self._race_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix='nexa-race')
+        return self._race_pool
+
+    def stats(self) -> Dict:
+        return {'instances': self.pool.snapshot()}
+
+    def close(self):
+        if self._race_pool is not None:
+            self._race_pool.shutdown(wait=False, cancel_futures=True)
+            self._race_pool = None
+
+
+class BraveEngine(HttpEngine):
+    def __init__(self, session: requests.Session):
+        super().__init__('brave', session, {
+            'enabled': False,
+            'type': 'official',
+            'key': None,  # ← AGREGA TU KEY AQUÍ
+            'url': 'https://api.search.brave.com/res/v1/web/search',
+            'timeout': 4,
+            'cost': 1,
+            'weight': 1.0,
+            'quota': {'daily': 2000, 'used': 0, 'reset': None}
+        })
+
+    def check_config(self):
+        if not self.config['key']:
+            raise ValueError("Brave API key no configurada")
+
+    def build_request(self, query, limit):
+        headers = {
+            'X-Subscription-Token': self.config['key'],
+            'Accept': 'application/json'
+        }
+        params = {
+            'q': query,
+            'count': limit,
+            'search_lang': 'es',
+            'country': 'es'
+        }
+        return self.config['url'], params, headers
+
+    def parse(self, data, query, limit):
+        return [
+            self._result(item.get('title', 'Sin título'), item.get('url', ''), item.get('description', ''))
+            for item in data.get('web', {}).get('results', [])[:limit]
+        ]
+
+
+class YouEngine(HttpEngine):
+    def __init__(self, session: requests.Session):
+        super().__init__('you', session, {
+            'enabled': False,
+            'type': 'official',
+            'key': None,  # ← AGREGA TU KEY AQUÍ
+            'url': 'https://api.you.com/search/web',
+            'timeout': 4,
+            'cost': 1,
+            'weight': 1.0,
+            'quota': {'daily': 1000, 'used': 0, 'reset': None}
+        })
+
+    def check_config(self):
+        if not self.config['key']:
+            raise ValueError("You.com API key no configurada")
+
+    def build_request(self, query, limit):
+        headers = {'X-API-Key': self.config['key']}
+        params = {'query': query, 'num_web_results': limit}
+        return self.config['url'], params, headers
+
+    def parse(self, data, query, limit):
+        return [
+            self._result(item.get('title', 'Sin título'), item.get('url', ''), item.get('snippet', ''))
+            for item in data.get('web', {}).get('results', [])[:limit]
+        ]
+
+
+class GoogleCSEEngine(HttpEngine):
+    def __init__(self, session: requests.Session):
+        super().__init__('google_cse', session, {
+            'enabled': False,
+            'type': 'official',
+            'key': None,  # ← AGREGA TU KEY AQUÍ
+            'cx': None,   # ← AGREGA TU CX ID AQUÍ
+            'url': 'https://www.googleapis.com/customsearch/v1',
+            'timeout': 4,
+            'cost': 2,
+            'weight': 1.2,
+            'quota': {'daily': 100, 'used': 0, 'reset': None}
+        })
+
+    def check_config(self):
+        if not self.config['key'] or not self.config['cx']:
+            raise ValueError("Google CSE key o CX ID no configurados")
+
+    def build_request(self, query, limit):
+        params = {
+            'key': self.config['key'],
+            'cx': self.config['cx'],
+            'q': query,
+            'num': min(limit, 10),
+            'lr': 'lang_es'
+        }
+        return self.config['url'], params, None
+
+    def parse(self, data, query, limit):
+        return [
+            self._result(item.get('title', 'Sin título'), item.get('link', ''), item.get('snippet', ''))
+            for item in data.get('items', [])[:limit]
+        ]
+
+
+class SerpApiEngine(HttpEngine):
+    def __init__(self, session: requests.Session):
+        super().__init__('serpapi', session, {
+            'enabled': False,
+            'type': 'official',
+            'key': None,  # ← AGREGA TU KEY AQUÍ
+            'url': 'https://serpapi.com/search',
+            'timeout': 4,
+            'cost': 2,
+            'weight': 1.2,
+            'quota': {'monthly': 100, 'used': 0, 'reset': None}
+        })
+
+    def check_config(self):
+        if not self.config['key']:
+            raise ValueError("SerpAPI key no configurada")
+
+    def build_request(self, query, limit):
+        params = {
+            'api_key': self.config['key'],
+            'q': query,
+            'num': limit,
+            'engine': 'google',
+            'hl': 'es',
+            'gl': 'es'
+        }
+        return self.config['url'], params, None
+
+    def parse(self, data, query, limit):
+        return [
+            self._result(item.get('title', 'Sin título'), item.get('link', ''), item.get('snippet', ''))
+            for item in data.get('organic_results', [])[:limit]
+        ]
+
+
+BUILTIN_ENGINES = (DuckDuckGoEngine, SearXNGEngine, BraveEngine, YouEngine, GoogleCSEEngine, SerpApiEngine)
+
+
+# ────────────────────────────────────────────────────────────────────
+# 🗂️ REGISTRO
+# ────────────────────────────────────────────────────────────────────
+
+class EngineRegistry:
+    """Motores por nombre, en orden de prioridad (del más rápido/barato al más lento)"""
+
+    def __init__(self):
+        self._engines: Dict[str, SearchEngine] = {}
+        self.order: List[str] = []
+
+    def register(self, engine: SearchEngine, position: Optional[int] = None):
+        if engine.name in self._engines:
+            self.unregister(engine.name)
+        self._engines[engine.name] = engine
+        if position is None:
+            self.order.append(engine.name)
+        else:
+            self.order.insert(position, engine.name)
+
+    def unregister(self, name: str) -> Optional[SearchEngine]:
+        engine = self._engines.pop(name, None)
+        if engine is not None:
+            self.order.remove(name)
+        return engine
+
+    def get(self, name: str) -> Optional[SearchEngine]:
+        return self._engines.get(name)
+
+    def __getitem__(self, name: str) -> SearchEngine:
+        return self._engines[name]
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._engines
+
+    def __iter__(self) -> Iterator[SearchEngine]:
+        return (self._engines[name] for name in self.order)
+
+    def __len__(self) -> int:
+        return len(self._engines)
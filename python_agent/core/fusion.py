@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+NEXA RANK FUSION
+Reciprocal Rank Fusion con pesos por motor: cada resultado suma peso / (k + posición)
+por cada motor que lo devuelve, así lo que varios motores coinciden en poner arriba
+gana a un resultado flojo de un solo motor. Los motores de relleno (el índice local)
+solo completan huecos: sus documentos no cuentan como respondidos ni desplazan a los de
+los demás motores
+"""
+
+from typing import Dict, Iterable, List, Optional, Set
+
+from .dedup import Deduplicator
+
+
+class _Entry:
+    __slots__ = ('score', 'best_rank', 'priority', 'result', 'engines', 'confirmed')
+
+    def __init__(self, result: Dict, priority: int):
+        self.score = 0.0
+        self.best_rank = 10 ** 6
+        self.priority = priority
+        self.result = result
+        self.engines: List[str] = []
+        self.confirmed = False  # Lo devolvió algún motor que no es de relleno
+
+
+class RankFusion:
+    def __init__(self, weights: Optional[Dict[str, float]] = None, k: int = 60,
+                 dedup: Optional[Deduplicator] = None, fallback: Iterable[str] = ()):
+        """
+        Args:
+            weights: Peso de cada motor (default 1.0)
+            k: Constante de RRF; valores altos aplanan la ventaja de las primeras posiciones
+            dedup: Deduplicador que decide qué resultados son el mismo documento
+            fallback: Motores de relleno: lo que solo ellos devuelven va detrás del resto
+                y no cuenta en confirmed()
+        """
+        self.weights = weights or {}
+        self.k = k
+        self.dedup = dedup or Deduplicator()
+        self.fallback: Set[str] = set(fallback)
+        self._entries: Dict[str, _Entry] = {}
+        self._confirmed = 0
+
+    def add(self, engine: str, results: List[Dict], priority: int = 0) -> List[Dict]:
+        """
+        Incorpora la lista de un motor (en el orden en que la devolvió).
+        `priority` desempata y elige qué copia de un documento repetido se muestra:
+        gana la del motor con prioridad más baja. Devuelve los documentos nuevos.
+        """
+        weight = self.weights.get(engine, 1.0)
+        new = []
+        for rank, result in enumerate(results):
+            key, is_new = self.dedup.resolve(result)
+            if key is None:
+                continue
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = self._entries[key] = _Entry(result, priority)
+            elif priority < entry.priority:
+                entry.result, entry.priority = result, priority
+            if engine in entry.engines:
+                continue  # Un motor solo vota una vez por documento
+            entry.engines.append(engine)
+            if not entry.confirmed and engine not in self.fallback:
+                entry.confirmed = True
+                self._confirmed += 1
+            entry.score += weight / (self.k + rank + 1)
+            entry.best_rank = min(entry.best_rank, rank)
+            if is_new:
+                new.append(result)
+        return new
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def confirmed(self) -> int:
+        """Documentos únicos que devolvió algún motor que no es de relleno"""
+        return self._confirmed
+
+    def ranked(self) -> List[_Entry]:
+        return sorted(self._entries.values(), key=lambda e: (not e.confirmed, -e.score, e.best_rank, e.priority))
+
+    def top(self, n: int) -> List[Dict]:
+        return [entry.result for entry in self.ranked()[:n]]
+
+    def is_stable(self, n: int, pending: Iterable[str]) -> bool:
+        """
+        True si ningún motor pendiente puede cambiar qué documentos forman el top-n:
+        la ventaja del n-ésimo sobre el (n+1)-ésimo supera lo máximo que pueden sumar
+        los pendientes (peso / (k + 1) cada uno)
+        """
+        if self._confirmed < n:
+            return False  # Un pendiente aún puede confirmar o desplazar un documento de relleno
+        entries = self.ranked()
+        headroom = sum(self.weights.get(engine, 1.0) / (self.k + 1) for engine in pending)
+        if not headroom:
+            return True
+        runner_up = max((entry.score for entry in entries[n:]), default=0.0)
+        return entries[n - 1].score - runner_up > headroom
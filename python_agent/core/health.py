@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+NEXA ENGINE HEALTH
+Seguimiento en vivo de cada motor: EWMA de latencia y de tasa de error, más un
+circuit breaker (closed → open → half_open → closed) para dejar de pagar timeouts
+de motores caídos
+"""
+
+import threading
+import time
+from typing import Dict, List, Optional
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class EngineHealth:
+    def __init__(self, alpha: float = 0.3, failure_threshold: int = 3,
+                 error_rate_threshold: float = 0.5, reset_timeout: float = 30,
+                 max_reset_timeout: float = 600):
+        """
+        Args:
+            alpha: Peso de la última muestra en las EWMA (0-1)
+            failure_threshold: Fallos consecutivos que abren el circuito
+            error_rate_threshold: Tasa de error (EWMA) a partir de la cual el motor se degrada
+            reset_timeout: Segundos en 'open' antes de permitir una sonda (half_open)
+            max_reset_timeout: Tope del backoff exponencial cuando la sonda vuelve a fallar
+        """
+        self.alpha = alpha
+        self.failure_threshold = failure_threshold
+        self.error_rate_threshold = error_rate_threshold
+        self.base_reset_timeout = reset_timeout
+        self.max_reset_timeout = max_reset_timeout
+
+        self.state = CLOSED
+        self.latency_ewma: Optional[float] = None
+        self.error_rate = 0.0
+        self.consecutive_failures = 0
+        self.successes = 0
+        self.failures = 0
+        self.last_error: Optional[str] = None
+        self.reset_timeout = reset_timeout
+        self.opened_at = 0.0
+        self.probe_started = 0.0
+
+    def allow_request(self, now: float) -> bool:
+        """Decide si el motor puede recibir tráfico; en half_open solo pasa una sonda"""
+        if self.state == CLOSED:
+            return True
+        if self.state == OPEN:
+            if now - self.opened_at < self.reset_timeout:
+                return False
+            self.state = HALF_OPEN
+            self.probe_started = now
+            return True
+        # HALF_OPEN: una sonda a la vez; si la sonda nunca se ejecutó, se vuelve a ofrecer
+        if now - self.probe_started >= self.reset_timeout:
+            self.probe_started = now
+            return True
+        return False
+
+    def record_success(self, latency: float):
+        self.successes += 1
+        self.consecutive_failures = 0
+        self._update(latency, 0.0)
+        if self.state != CLOSED:
+            self.state = CLOSED
+            self.reset_timeout = self.base_reset_timeout
+
+    def record_failure(self, latency: float, error: str, now: float):
+        self.failures += 1
+        self.consecutive_failures += 1
+        self.last_error = error
+        self._update(latency, 1.0)
+        if self.state == HALF_OPEN:
+            # La sonda falló: reabrir con backoff exponencial
+            self.reset_timeout = min(self.reset_timeout * 2, self.max_reset_timeout)
+            self._open(now)
+        elif self.state == CLOSED and self.consecutive_failures >= self.failure_threshold:
+            self._open(now)
+
+    def is_degraded(self, timeout: Optional[float] = None) -> bool:
+        if self.state == HALF_OPEN or self.error_rate >= self.error_rate_threshold:
+            return True
+        return bool(timeout and self.latency_ewma is not None and self.latency_ewma >= 0.8 * timeout)
+
+    def snapshot(self) -> Dict:
+        return {
+            'state': self.state,
+            'latency_ewma': round(self.latency_ewma, 4) if self.latency_ewma is not None else None,
+            'error_rate': round(self.error_rate, 4),
+            'consecutive_failures': self.consecutive_failures,
+            'successes': self.successes,
+            'failures': self.failures,
+            'last_error': self.last_error,
+            'reset_timeout': self.reset_timeout
+        }
+
+    def _update(self, latency: float, error: float):
+        if self.latency_ewma is None:
+            self.latency_ewma = latency
+        else:
+            self.latency_ewma += self.alpha * (latency - self.latency_ewma)
+        self.error_rate += self.alpha * (error - self.error_rate)
+
+    def _open(self, now: float):
+        self.state = OPEN
+        self.opened_at = now
+
+
+class HealthTracker:
+    def __init__(self, engines: List[str], **health_kwargs):
+        self._health = {engine: EngineHealth(**health_kwargs) for engine in engines}
+        self._health_kwargs = health_kwargs
+        self._lock = threading.Lock()
+
+    def _get(self, engine: str) -> EngineHealth:
+        health = self._health.get(engine)
+        if health is None:
+            health = self._health[engine] = EngineHealth(**self._health_kwargs)
+        return health
+
+    def route(self, order: List[str], timeouts: Optional[Dict[str, float]] = None) -> List[str]:
+        """
+        Reordena según salud en vivo: descarta circuitos abiertos y manda al final
+        los motores degradados, conservando la prioridad entre los sanos
+        """
+        timeouts = timeouts or {}
+        now = time.time()
+        healthy, degraded = [], []
+        with self._lock:
+            for engine in order:
+                health = self._get(engine)
+                if not health.allow_request(now):
+                    continue
+                if health.is_degraded(timeouts.get(engine)):
+                    degraded.append(engine)
+                else:
+                    healthy.append(engine)
+        # Entre los degradados, primero el más rápido
+        degraded.sort(key=lambda e: self._health[e].latency_ewma or 0.0)
+        return healthy + degraded
+
+    def record_success(self, engine: str, latency: float):
+        with self._lock:
+            self._get(engine).record_success(latency)
+
+    def record_failure(self, engine: str, latency: float, error: str):
+        with self._lock:
+            self._get(engine).record_failure(latency, error, time.time())
+
+    def state(self, engine: str) -> str:
+        with self._lock:
+            return self._get(engine).state
+
+    def reset(self, engine: Optional[str] = None):
+        with self._lock:
+            for name in ([engine] if engine else list(self._health)):
+                self._health[name] = EngineHealth(**self._health_kwargs)
+
+    def snapshot(self) -> Dict[str, Dict]:
+        with self._lock:
+            return {engine: health.snapshot() for engine, health in self._health.items()}
+
+
+class InstancePool:
+    """
+    Pool de réplicas de un mismo motor (p.ej. mirrors públicos de SearXNG):
+    prefiere las más rápidas y sanas y pone en cuarentena las que fallan
+    """
+
+    def __init__(self, instances: List[str], **health_kwargs):
+        self._tracker = HealthTracker(instances, **health_kwargs)
+        self.instances = list(instances)
+
+    def ranked(self, limit: Optional[int] = None) -> List[str]:
+        """Instancias utilizables, de la más rápida a la más lenta; las nuevas primero para medirlas"""
+        usable = self._tracker.route(self.instances)
+        snapshot = self._tracker.snapshot()
+
+        def score(instance: str) -> float:
+            data = snapshot[instance]
+            if data['latency_ewma'] is None:
+                return 0.0
+            # Penalizar la latencia con la tasa de error para no preferir un mirror rápido pero inestable
+            return data['latency_ewma'] * (1 + 4 * data['error_rate'])
+
+        usable.sort(key=score)
+        return usable[:limit] if limit else usable
+
+    def record_success(self, instance: str, latency: float):
+        self._tracker.record_success(instance, latency)
+
+    def record_failure(self, instance: str, latency: float, error: str):
+        self._tracker.record_failure(instance, latency, error)
+
+    def snapshot(self) -> Dict[str, Dict]:
+        return self._tracker.snapshot()
@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+NEXA INTENT ROUTER
+Enrutado de consultas a handlers registrados. Las frases de activación de todos los
+intents se compilan en una única tabla por palabra (sin acentos y en minúsculas): la
+consulta se tokeniza una vez y cada palabra cuesta una búsqueda en un dict, así el
+despacho no crece con el número de intents. Solo se comparan palabras completas
+("encuentra" no salta dentro de "reencuentra") y se extrae el payload: la consulta sin
+las frases de activación ni los modificadores ("rápido") y el relleno ("por favor") que
+vienen justo detrás; fuera de esa posición son contenido ("el libro Rápido y furioso").
+"""
+
+import re
+from functools import lru_cache
+from typing import Callable, Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+from .normalize import fold_accents
+
+_WORD_RE = re.compile(r'\w+', re.UNICODE)
+_SPACE_RE = re.compile(r'\s+')
+
+
+
+class Intent:
+    __slots__ = ('name', 'triggers', 'handler', 'stream', 'priority')
+
+    def __init__(self, name: str, triggers: Tuple[str, ...], handler: Callable, stream: Optional[Callable],
+                 priority: int):
+        self.name = name
+        self.triggers = triggers
+        self.handler = handler    # handler(match) -> respuesta
+        self.stream = stream      # stream(match) -> iterador de eventos (opcional)
+        self.priority = priority
+
+    def __repr__(self) -> str:
+        return f"Intent({self.name!r}, priority={self.priority})"
+
+
+class IntentMatch:
+    __slots__ = ('intent', 'query', 'payload', 'flags', 'trigger')
+
+    def __init__(self, intent: Intent, query: str, payload: str, flags: FrozenSet[str], trigger: str):
+        self.intent = intent
+        self.query = query        # Consulta original
+        self.payload = payload    # Sin frases de activación ni los modificadores/relleno que las siguen
+        self.flags = flags        # Modificadores tras la frase de activación (p.ej. {'fast'})
+        self.trigger = trigger    # Frase que activó el intent, tal como la escribió el usuario
+
+    @property
+    def name(self) -> str:
+        return self.intent.name
+
+    def __repr__(self) -> str:
+        return f"IntentMatch({self.name!r}, payload={self.payload!r}, flags={sorted(self.flags)})"
+
+
+class IntentRouter:
+    def __init__(self, fillers: Iterable[str] = ()):
+        """
+        Args:
+            fillers: Frases de relleno que se quitan del payload cuando siguen a una
+                frase de activación ("busca por favor sobre X" -> "X"); en otra posición
+                se respetan ("busca por qué..." conserva el "por")
+        """
+        self.fillers = tuple(fillers)
+        self._intents: Dict[str, Intent] = {}
+        self._flags: Dict[str, Tuple[str, ...]] = {}
+        # Primera palabra -> [(palabras de la frase, nombre)], las frases largas primero
+        self._table: Dict[str, List[Tuple[Tuple[str, ...], str]]] = {}
+        # Igual para lo que puede seguir a una frase de activación: (palabras, flag o None = relleno)
+        self._adjacent: Dict[str, List[Tuple[Tuple[str, ...], Optional[str]]]] = {}
+
+    # ────────────────────────────────────────────────────────────────────
+    # 📝 REGISTRO
+    # ────────────────────────────────────────────────────────────────────
+
+    def add(self, name: str, triggers: Iterable[str], handler: Callable, stream: Optional[Callable] = None,
+            priority: int = 0) -> Intent:
+        """
+        Registra (o reemplaza) un intent. Si varias frases de distintos intents aparecen en
+        la misma consulta gana el de mayor prioridad y, a igualdad, el que aparece antes.
+        """
+        intent = Intent(name, tuple(triggers), handler, stream, priority)
+        self._intents[name] = intent
+        self._compile()
+        return intent
+
+    def intent(self, name: str, triggers: Iterable[str], priority: int = 0) -> Callable:
+        """Decorador: @router.intent('hora', ['qué hora es', 'hora actual'])"""
+        def register(handler: Callable) -> Callable:
+            self.add(name, triggers, handler, priority=priority)
+            return handler
+        return register
+
+    def flag(self, name: str, words: Iterable[str]):
+        """Modificador que se detecta justo tras una frase de activación ("busca rápido X")"""
+        self._flags[name] = tuple(words)
+        self._compile()
+
+    def remove(self, name: str) -> Optional[Intent]:
+        intent = self._intents.pop(name, None)
+        self._compile()
+        return intent
+
+    def _compile(self):
+        self._table = self._build((phrase, intent.name) for intent in self._intents.values()
+                                  for phrase in intent.triggers)
+        adjacent = [(phrase, name) for name, words in self._flags.items() for phrase in words]
+        self._adjacent = self._build(adjacent + [(phrase, None) for phrase in self.fillers])
+
+    def _build(self, entries: Iterable[Tuple[str, Optional[str]]]) -> Dict[str, List]:
+        """Primera palabra -> [(palabras de la frase, valor)], las frases largas primero"""
+        table: Dict[str, List] = {}
+        for phrase, value in entries:
+            words = tuple(self._fold(w) for w in _WORD_RE.findall(phrase))
+            if words:
+                table.setdefault(words[0], []).append((words, value))
+        for candidates in table.values():
+            candidates.sort(key=lambda entry: -len(entry[0]))
+        return table
+
+    @staticmethod
+    def _lookup(table: Dict[str, List], words: List[str], i: int):
+        """(palabras, valor) de la frase más larga de `table` que empieza en words[i], o None"""
+        for phrase, value in table.get(words[i], ()):
+            if len(phrase) == 1 or tuple(words[i:i + len(phrase)]) == phrase:
+                return phrase, value
+        return None
+
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def _fold(word: str) -> str:
+        return word.lower() if word.isascii() else fold_accents(word).lower()
+
+    # ────────────────────────────────────────────────────────────────────
+    # 🧭 DESPACHO
+    # ────────────────────────────────────────────────────────────────────
+
+    def match(self, query: str) -> Optional[IntentMatch]:
+        """Intent de la consulta (None si ninguna frase de activación aparece)"""
+        fold, table = self._fold, self._table
+        words = [fold(w) for w in _WORD_RE.findall(query)]
+        if not any(w in table for w in words):
+            return None  # Caso común: ninguna palabra abre una frase, sin calcular posiciones
+        spans = [m.span() for m in _WORD_RE.finditer(query)]
+        best: Optional[Tuple[Intent, int, int, FrozenSet[str]]] = None
+        removed: List[Tuple[int, int]] = []
+        i, n = 0, len(words)
+        while i < n:
+            hit = self._lookup(table, words, i)
+            if hit is None:
+                i += 1
+                continue
+
+            phrase, name = hit
+            start = spans[i][0]
+            trigger_end = end = spans[i + len(phrase) - 1][1]
+            i += len(phrase)
+            # Modificadores y relleno solo cuentan pegados a la frase (y antes de otra)
+            flags = set()
+            while i < n and words[i] not in table:
+                extra = self._lookup(self._adjacent, words, i)
+                if extra is None:
+                    break
+                if extra[1] is not None:
+                    flags.add(extra[1])
+                i += len(extra[0])
+                end = spans[i - 1][1]
+            removed.append((start, end))
+            intent = self._intents[name]
+            if best is None or intent.priority > best[0].priority:
+                best = (intent, start, trigger_end, frozenset(flags))
+
+        if best is None:
+            return None
+        intent, start, end, flags = best
+        return IntentMatch(intent, query, self._strip(query, removed), flags, query[start:end])
+
+    def dispatch(self, query: str, default: Callable[[str], Dict]):
+        """handler(match) del intent detectado, o default(query) si no hay ninguno"""
+        match = self.match(query)
+        return match.intent.handler(match) if match is not None else default(query)
+
+    @staticmethod
+    def _strip(query: str, removed: List[Tuple[int, int]]) -> str:
+        if not removed:
+            return query.strip()
+        parts, last = [], 0
+        for start, end in removed:
+            parts.append(query[last:start])
+            last = end
+        parts.append(query[last:])
+        payload = _SPACE_RE.sub(' ', ' '.join(parts)).strip(' ,.:;')
+        return payload or query.strip()
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._intents
+
+    def __len__(self) -> int:
+        return len(self._intents)
+
+    @property
+    def intents(self) -> List[Intent]:
+        return sorted(self._intents.values(), key=lambda intent: -intent.priority)
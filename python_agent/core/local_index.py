@@ -0,0 +1,365 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+NEXA LOCAL INDEX
+Índice invertido BM25 sobre los resultados que ya trajeron los motores (título, snippet,
+URL y motor). Se alimenta en cada búsqueda, se consulta como el motor 'local' sin tocar
+la red y persiste en SQLite con un máximo de documentos (se expulsan los menos vistos).
+"""
+
+import logging
+import math
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .dedup import normalize_url
+from .engines import SearchEngine
+from .normalize import fold_accents
+from .result import SearchResult, as_results
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_INDEX_PATH = os.path.join(os.path.expanduser('~'), '.nexa', 'search_index.sqlite3')
+
+_TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+_OPERATOR_RE = re.compile(r'(^|\s)(-\S+|[a-z_]+:\S+)', re.IGNORECASE)
+
+# Palabras vacías (es/en): no discriminan y engordan las listas de postings
+STOPWORDS = frozenset(fold_accents(w) for w in (
+    'a al algo como con de del el en es esta este la las lo los mas o para pero por que se '
+    'sin sobre su sus un una uno y the of and or to in on for is are with by from at an be '
+    'this that it as www http https com html'
+).split())
+
+
+# Consultas distintas que se recuerdan por documento (las más recientes)
+MAX_QUERIES_PER_DOC = 8
+
+
+def tokenize(text: str) -> List[str]:
+    """Palabras en minúsculas y sin acentos, sin palabras vacías ni tokens de 1 carácter"""
+    return [t for t in _TOKEN_RE.findall(fold_accents(text).lower()) if len(t) > 1 and t not in STOPWORDS]
+
+
+def query_signature(query: str) -> str:
+    """Términos de la consulta sin orden ni repeticiones: 'Python serpiente' == 'serpiente python'"""
+    return ' '.join(sorted(set(tokenize(query))))
+
+
+class _Doc:
+    __slots__ = ('url', 'title', 'snippet', 'engine', 'seen', 'queries', 'terms', 'length')
+
+    def __init__(self, url: str, title: str, snippet: str, engine: str, seen: float,
+                 queries: Tuple[str, ...] = ()):
+        self.url = url
+        self.title = title
+        self.snippet = snippet
+        self.engine = engine
+        self.seen = seen
+        self.queries = queries  # Firmas de las consultas que lo devolvieron (query_signature)
+        # El título cuenta doble: suele resumir mejor el documento que el snippet
+        terms: Dict[str, int] = {}
+        for token in tokenize(title) * 2 + tokenize(snippet) + tokenize(url) + [engine.lower()]:
+            terms[token] = terms.get(token, 0) + 1
+        self.terms = terms
+        self.length = sum(terms.values())
+
+
+class LocalIndex:
+    def __init__(self, path: Optional[str] = None, max_docs: int = 20000, k1: float = 1.2, b: float = 0.75,
+                 flush_interval: float = 30):
+        """
+        Args:
+            path: Archivo SQLite (default: NEXA_SEARCH_INDEX o ~/.nexa/search_index.sqlite3;
+                ':memory:' para no persistir)
+            max_docs: Máximo de documentos; al pasarlo se expulsan los vistos hace más tiempo
+            k1, b: Parámetros de BM25 (saturación de frecuencia y normalización por longitud)
+            flush_interval: Cada cuántos segundos se vuelcan los cambios a disco (0 = sin hilo)
+        """
+        self.path = path or os.getenv('NEXA_SEARCH_INDEX') or DEFAULT_INDEX_PATH
+        self.max_docs = max_docs
+        self.k1 = k1
+        self.b = b
+
+        # clave (URL normalizada) -> documento; el orden es el de última vez visto
+        self._docs: 'OrderedDict[str, _Doc]' = OrderedDict()
+        self._postings: Dict[str, Dict[str, int]] = {}
+        self._total_length = 0
+        self._dirty: Dict[str, Optional[_Doc]] = {}  # None = borrar del disco
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        try:
+            if self.path != ':memory:':
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+                self._conn = self._connect(self.path)
+                self._load()
+        except (sqlite3.Error, OSError) as e:
+            # Sin disco el índice sigue funcionando, solo que no sobrevive al reinicio
+            logger.warning("Índice local sin persistencia (%s): %r", self.path, e)
+            self._conn = None
+
+        self._stop = threading.Event()
+        if self._conn is not None and flush_interval > 0:
+            threading.Thread(target=self._flush_loop, args=(flush_interval,),
+                             name='nexa-index-flush', daemon=True).start()
+
+    @staticmethod
+    def _connect(path: str) -> sqlite3.Connection:
+        conn = sqlite3.connect(path, timeout=5.0, check_same_thread=False)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute(
+            'CREATE TABLE IF NOT EXISTS local_index ('
+            ' key TEXT PRIMARY KEY,'
+            ' url TEXT NOT NULL,'
+            ' title TEXT NOT NULL,'
+            ' snippet TEXT NOT NULL,'
+            ' engine TEXT NOT NULL,'
+            ' seen REAL NOT NULL,'
+            " queries TEXT NOT NULL DEFAULT '')"
+        )
+        columns = {row[1] for row in conn.execute('PRAGMA table_info(local_index)')}
+        if 'queries' not in columns:
+            # Índices creados antes de guardar las consultas de origen
+            conn.execute("ALTER TABLE local_index ADD COLUMN queries TEXT NOT NULL DEFAULT ''")
+        conn.commit()
+        return conn
+
+    def _load(self):
+        rows = self._conn.execute(
+            'SELECT key, url, title, snippet, engine, seen, queries FROM local_index ORDER BY seen DESC LIMIT ?',
+            (self.max_docs,)
+        ).fetchall()
+        for key, url, title, snippet, engine, seen, queries in reversed(rows):
+            self._insert(key, _Doc(url, title, snippet, engine, seen, tuple(filter(None, queries.split('\n')))))
+
+    # ────────────────────────────────────────────────────────────────────
+    # 📥 INDEXADO
+    # ────────────────────────────────────────────────────────────────────
+
+    def add(self, engine: str, results: Iterable, query: Optional[str] = None) -> int:
+        """
+        Indexa (o refresca) los resultados de un motor; devuelve cuántos eran nuevos.
+        `query` es la consulta que los trajo: se recuerda por documento (ver covered()).
+        """
+        now = time.time()
+        signature = query_signature(query) if query else ''
+        new = 0
+        with self._lock:
+            for result in as_results(results):
+                key = result.url_key
+                if not key:
+                    continue
+                previous = self._docs.get(key)
+                queries = previous.queries if previous is not None else ()
+                if signature:
+                    queries = (signature,) + tuple(q for q in queries if q != signature)[:MAX_QUERIES_PER_DOC - 1]
+                doc = _Doc(result.url, result.title, result.snippet, engine, now, queries)
+                new += previous is None
+                self._insert(key, doc)
+                self._mark(key, doc)
+            while len(self._docs) > self.max_docs:
+                oldest = next(iter(self._docs))
+                self._remove(oldest)
+                self._mark(oldest, None)
+        return new
+
+    def _mark(self, key: str, doc: Optional[_Doc]):
+        if self._conn is not None:
+            self._dirty[key] = doc
+
+    def _insert(self, key: str, doc: _Doc):
+        if key in self._docs:
+            self._remove(key)
+        self._docs[key] = doc
+        self._total_length += doc.length
+        for term, tf in doc.terms.items():
+            self._postings.setdefault(term, {})[key] = tf
+
+    def _remove(self, key: str):
+        doc = self._docs.pop(key)
+        self._total_length -= doc.length
+        for term in doc.terms:
+            postings = self._postings[term]
+            del postings[key]
+            if not postings:
+                del self._postings[term]
+
+    # ────────────────────────────────────────────────────────────────────
+    # 🔎 CONSULTA
+    # ────────────────────────────────────────────────────────────────────
+
+    def search(self, query: str, limit: int = 10,
+               max_age: Optional[float] = None) -> List[Tuple[float, float, SearchResult]]:
+        """
+        Devuelve [(score BM25, confianza, resultado)]: primero los documentos que contienen
+        todos los términos, de mayor a menor score. La confianza (0-1) es el score dividido
+        por el máximo alcanzable con esos términos, y vale 0 si falta alguno.
+        """
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms:
+            return []
+        cutoff = time.time() - max_age if max_age else None
+        with self._lock:
+            n = len(self._docs)
+            if not n:
+                return []
+            avgdl = self._total_length / n
+            scores: Dict[str, float] = {}
+            matched: Dict[str, int] = {}
+            ceiling = 0.0
+            for term in terms:
+                postings = self._postings.get(term, {})
+                idf = math.log(1 + (n - len(postings) + 0.5) / (len(postings) + 0.5))
+                ceiling += idf * (self.k1 + 1)
+                for key, tf in postings.items():
+                    dl = self._docs[key].length
+                    norm = tf * (self.k1 + 1) / (tf + self.k1 * (1 - self.b + self.b * dl / avgdl))
+                    scores[key] = scores.get(key, 0.0) + idf * norm
+                    matched[key] = matched.get(key, 0) + 1
+
+            ranked = sorted(scores.items(), key=lambda item: (matched[item[0]] < len(terms), -item[1]))
+            hits = []
+            for key, score in ranked:
+                doc = self._docs[key]
+                if cutoff is not None and doc.seen < cutoff:
+                    continue
+                confidence = score / ceiling if matched[key] == len(terms) else 0.0
+                hits.append((score, confidence, SearchResult(doc.title, doc.url, doc.engine, doc.snippet)))
+                if len(hits) >= limit:
+                    break
+        return hits
+
+    def covered(self, query: str, results: Iterable, max_age: Optional[float] = None) -> int:
+        """
+        Cuántos de `results` se indexaron como respuesta a esta misma consulta (mismos
+        términos) y hace menos de `max_age` segundos. Que un documento contenga los
+        términos no basta para dar la consulta por respondida: 'python' no es 'serpiente python'.
+        """
+        signature = query_signature(query)
+        if not signature:
+            return 0
+        cutoff = time.time() - max_age if max_age else None
+        count = 0
+        with self._lock:
+            for result in as_results(results):
+                doc = self._docs.get(result.url_key)
+                if doc is not None and signature in doc.queries and (cutoff is None or doc.seen >= cutoff):
+                    count += 1
+        return count
+
+    def oldest_seen(self, results: Iterable) -> Optional[float]:
+        """Cuándo se indexó por última vez el más viejo de `results` (None si ninguno está)"""
+        with self._lock:
+            seen = [self._docs[key].seen for key in (r.url_key for r in as_results(results)) if key in self._docs]
+        return min(seen) if seen else None
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def __contains__(self, url: str) -> bool:
+        return normalize_url(url) in self._docs
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                'documents': len(self._docs),
+                'terms': len(self._postings),
+                'max_docs': self.max_docs,
+                'pending_writes': len(self._dirty),
+                'persistent': self.path if self._conn is not None else None
+            }
+
+    # ────────────────────────────────────────────────────────────────────
+    # 💾 PERSISTENCIA
+    # ────────────────────────────────────────────────────────────────────
+
+    def flush(self):
+        """Vuelca a disco los documentos añadidos/expulsados desde el último volcado"""
+        if self._conn is None:
+            return
+        with self._lock:
+            dirty, self._dirty = self._dirty, {}
+            if not dirty:
+                return
+            try:
+                with self._conn:
+                    self._conn.executemany(
+                        'INSERT OR REPLACE INTO local_index (key, url, title, snippet, engine, seen, queries)'
+                        ' VALUES (?, ?, ?, ?, ?, ?, ?)',
+                        [(key, d.url, d.title, d.snippet, d.engine, d.seen, '\n'.join(d.queries))
+                         for key, d in dirty.items() if d]
+                    )
+                    self._conn.executemany('DELETE FROM local_index WHERE key = ?',
+                                           [(key,) for key, d in dirty.items() if d is None])
+            except sqlite3.Error as e:
+                logger.warning("No se pudo guardar el índice local: %r", e)
+
+    def clear(self):
+        with self._lock:
+            self._docs.clear()
+            self._postings.clear()
+            self._total_length = 0
+            self._dirty.clear()
+            if self._conn is not None:
+                with self._conn:
+                    self._conn.execute('DELETE FROM local_index')
+
+    def close(self):
+        self._stop.set()
+        self.flush()
+        if self._conn is not None:
+            with self._lock:
+                self._conn.close()
+                self._conn = None
+
+    def _flush_loop(self, interval: float):
+        while not self._stop.wait(interval):
+            self.flush()
+
+
+# ────────────────────────────────────────────────────────────────────
+# 🏠 MOTOR LOCAL
+# ────────────────────────────────────────────────────────────────────
+
+class LocalIndexEngine(SearchEngine):
+    """
+    Motor sin red sobre LocalIndex. Solo devuelve aciertos con confianza suficiente
+    (todos los términos presentes y score cerca del máximo), que se fusionan con los de
+    la red. La red solo se ahorra (covers) si esos aciertos llegaron para esta misma
+    consulta y son recientes: un tema que solo comparte palabras no cuenta como visto.
+    """
+
+    def __init__(self, index: LocalIndex, **overrides):
+        super().__init__('local', {
+            'type': 'local',
+            'local': True,        # El core lo ejecuta antes que los motores de red
+            'timeout': 1,
+            'cost': 0,
+            'weight': 0.9,
+            'min_confidence': 0.4,
+            'max_age': 1800       # Segundos; como el TTL duro de la cache (el core lo iguala)
+        }, **overrides)
+        self.index = index
+
+    def search(self, query: str, limit: int) -> List[SearchResult]:
+        if _OPERATOR_RE.search(query):
+            return []  # site:, filetype:, -exclusión... no se pueden honrar desde el índice
+        hits = self.index.search(query, limit, self.config.get('max_age'))
+        return [result for _, confidence, result in hits if confidence >= self.config['min_confidence']]
+
+    def covers(self, query: str, results: List[SearchResult], limit: int) -> bool:
+        return self.index.covered(query, results, self.config.get('max_age')) >= limit
+
+    def fetched_at(self, results: List[SearchResult]) -> Optional[float]:
+        return self.index.oldest_seen(results)
+
+    def stats(self) -> Dict:
+        return {'index': self.index.stats()}
+
+    def close(self):
+        self.index.close()
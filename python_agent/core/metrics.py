@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+NEXA SEARCH METRICS
+Instrumentación del core de búsqueda: histogramas de latencia por motor y resultado
+(success, empty, error, timeout), latencia total por origen (cache, live, coalesced) y
+contadores por motor. Se exporta como snapshot JSON o en formato de texto de Prometheus.
+"""
+
+import threading
+from bisect import bisect_left
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# Límites superiores (segundos) de los buckets: cubren desde cache caliente hasta timeouts
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+OUTCOMES = ('success', 'empty', 'error', 'timeout')
+
+
+class Histogram:
+    __slots__ = ('bounds', 'counts', 'sum', 'count')
+
+    def __init__(self, bounds: Sequence[float] = DEFAULT_BUCKETS):
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)  # El último es +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Estimación por interpolación lineal dentro del bucket (como histogram_quantile)"""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            if seen + n >= rank and n:
+                if i == len(self.bounds):
+                    return self.bounds[-1]  # Cae en +Inf: lo más que se puede afirmar
+                lower = self.bounds[i - 1] if i else 0.0
+                return lower + (self.bounds[i] - lower) * (rank - seen) / n
+            seen += n
+        return self.bounds[-1]
+
+    def snapshot(self) -> Dict:
+        cumulative, buckets = 0, []
+        for bound, n in zip(self.bounds, self.counts):
+            cumulative += n
+            buckets.append([bound, cumulative])
+        quantiles = {f"p{int(q * 100)}": self.quantile(q) for q in (0.5, 0.95, 0.99)}
+        return {
+            'count': self.count,
+            'sum': round(self.sum, 6),
+            'buckets': buckets,
+            **{k: round(v, 6) if v is not None else None for k, v in quantiles.items()}
+        }
+
+
+class SearchMetrics:
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._engines: Dict[Tuple[str, str], Histogram] = {}
+        self._requests: Dict[str, Histogram] = {}
+        self._counters: Dict[str, Dict[str, float]] = {
+            'cooldown_wait_seconds': {},
+            'cooldown_waits': {},
+            'deadline_cutoffs': {}
+        }
+        self._lock = threading.Lock()
+
+    def observe_engine(self, engine: str, outcome: str, seconds: float):
+        with self._lock:
+            histogram = self._engines.get((engine, outcome))
+            if histogram is None:
+                histogram = self._engines[(engine, outcome)] = Histogram(self.buckets)
+            histogram.observe(seconds)
+
+    def observe_request(self, source: str, seconds: float):
+        with self._lock:
+            histogram = self._requests.get(source)
+            if histogram is None:
+                histogram = self._requests[source] = Histogram(self.buckets)
+            histogram.observe(seconds)
+
+    def inc(self, counter: str, engine: str, value: float = 1):
+        with self._lock:
+            values = self._counters[counter]
+            values[engine] = values.get(engine, 0) + value
+
+    def reset(self):
+        with self._lock:
+            self._engines.clear()
+            self._requests.clear()
+            for values in self._counters.values():
+                values.clear()
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            engines: Dict[str, Dict] = {}
+            for (engine, outcome), histogram in sorted(self._engines.items()):
+                engines.setdefault(engine, {})[outcome] = histogram.snapshot()
+            return {
+                'engines': engines,
+                'requests': {source: h.snapshot() for source, h in sorted(self._requests.items())},
+                **{name: dict(values) for name, values in self._counters.items()}
+            }
+
+
+# ────────────────────────────────────────────────────────────────────
+# 📤 EXPORTACIÓN PROMETHEUS
+# ────────────────────────────────────────────────────────────────────
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(**labels) -> str:
+    body = ','.join(f'{k}="{_escape(v)}"' for k, v in labels.items())
+    return '{' + body + '}' if body else ''
+
+
+def _histogram_lines(name: str, snapshot: Dict, **labels) -> List[str]:
+    lines = [f"{name}_bucket{_labels(**labels, le=bound)} {count}" for bound, count in snapshot['buckets']]
+    lines.append(f"{name}_bucket{_labels(**labels, le='+Inf')} {snapshot['count']}")
+    lines.append(f"{name}_sum{_labels(**labels)} {snapshot['sum']}")
+    lines.append(f"{name}_count{_labels(**labels)} {snapshot['count']}")
+    return lines
+
+
+def render_prometheus(snapshot: Dict, prefix: str = 'nexa_search') -> str:
+    """Texto de exposición de Prometheus a partir de un snapshot de NexaSearchCore.get_metrics()"""
+    out: List[str] = []
+
+    def header(name: str, kind: str, help_text: str):
+        out.append(f"# HELP {name} {help_text}")
+        out.append(f"# TYPE {name} {kind}")
+
+    name = f"{prefix}_engine_latency_seconds"
+    header(name, 'histogram', "Latencia de cada llamada a un motor, por resultado")
+    for engine, outcomes in snapshot.get('engines', {}).items():
+        for outcome, histogram in outcomes.items():
+            out.extend(_histogram_lines(name, histogram, engine=engine, outcome=outcome))
+
+    name = f"{prefix}_request_seconds"
+    header(name, 'histogram', "Latencia total de buscar() por origen de la respuesta")
+    for source, histogram in snapshot.get('requests', {}).items():
+        out.extend(_histogram_lines(name, histogram, source=source))
+
+    counters = [
+        ('cooldown_wait_seconds', 'cooldown_wait_seconds_total', "Segundos esperando token del rate limiter"),
+        ('cooldown_waits', 'cooldown_waits_total', "Esperas por cooldown del rate limiter"),
+        ('deadline_cutoffs', 'deadline_cutoffs_total', "Llamadas abandonadas al vencer el deadline"),
+        ('bytes_received', 'engine_bytes_received_total', "Bytes de respuesta recibidos de cada motor")
+    ]
+    for key, suffix, help_text in counters:
+        name = f"{prefix}_{suffix}"
+        header(name, 'counter', help_text)
+        for engine, value in snapshot.get(key, {}).items():
+            out.append(f"{name}{_labels(engine=engine)} {value}")
+
+    name = f"{prefix}_cache_events_total"
+    header(name, 'counter', "Eventos de la cache de resultados")
+    for event, value in snapshot.get('cache', {}).items():
+        out.append(f"{name}{_labels(event=event)} {value}")
+
+    return '\n'.join(out) + '\n'
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+NEXA QUERY NORMALIZATION
+Limpieza de consultas antes de la cache y de los motores: quita las palabras de
+activación del agente ("busca", "rápido"...) y colapsa espacios. Solo la clave de cache
+ordena además los operadores (site:, filetype:, -exclusión) para que consultas
+equivalentes la compartan; los motores reciben el orden original
+"""
+
+import re
+import unicodedata
+from typing import List
+
+# Operadores reordenables: site:x, filetype:x, -palabra (un "-5" es un número, no exclusión)
+_OPERATOR_RE = re.compile(r'^(-[^\W\d_]\S*|[a-z_]+:\S+)$', re.IGNORECASE)
+_BOOLEAN_TOKENS = frozenset(('or', 'and', 'not', '|'))
+_SPACE_RE = re.compile(r'\s+')
+
+
+def fold_accents(text: str) -> str:
+    """'Rápido Ñandú' -> 'Rapido Nandu'"""
+    decomposed = unicodedata.normalize('NFKD', text)
+    return ''.join(ch for ch in decomposed if not unicodedata.combining(ch))
+
+
+# Verbos con los que el agente activa una búsqueda (comparados sin acentos)
+ACTION_WORDS = frozenset(fold_accents(w) for w in (
+    'busca', 'buscar', 'búscame', 'encuentra', 'encuéntrame'
+))
+# Modificadores que pueden seguir al verbo ("busca rápido X")
+MODIFIER_WORDS = frozenset(fold_accents(w) for w in ('rápido', 'rápidamente'))
+# Relleno que se quita detrás del verbo: "busca rápido sobre X" -> "X". Son frases completas:
+# "de" o "por" sueltos son contenido ("busca por qué...", "busca de Gaulle")
+FILLER_PHRASES = ('por favor', 'acerca de', 'sobre')
+_FILLER_TOKENS = tuple(tuple(fold_accents(p).split()) for p in FILLER_PHRASES)
+# Todas las palabras que clean_query puede quitar tras el verbo
+TRIGGER_WORDS = ACTION_WORDS | MODIFIER_WORDS | frozenset(w for p in _FILLER_TOKENS for w in p)
+
+
+def _tokens(query: str) -> List[str]:
+    return _SPACE_RE.sub(' ', query).strip().split(' ') if query.strip() else []
+
+
+def _strip_trigger(tokens: List[str]) -> List[str]:
+    """Quita el verbo inicial y los modificadores / frases de relleno que le siguen"""
+    folded = [fold_accents(t.lower()) for t in tokens]
+    if not folded or folded[0] not in ACTION_WORDS:
+        return tokens
+    i = 1
+    while i < len(tokens):
+        if folded[i] in MODIFIER_WORDS:
+            i += 1
+            continue
+        phrase = next((p for p in _FILLER_TOKENS if tuple(folded[i:i + len(p)]) == p), None)
+        if phrase is None:
+            break
+        i += len(phrase)
+    return tokens[i:]
+
+
+def clean_query(query: str) -> str:
+    """
+    Consulta que se envía a los motores: sin el verbo de activación inicial ni el relleno
+    que le sigue y con espacios colapsados. El resto queda en su orden (los operadores
+    booleanos como OR dependen de él) y conserva acentos y mayúsculas porque los motores
+    sí los aprovechan.
+    """
+    cleaned = ' '.join(_strip_trigger(_tokens(query)))
+    return cleaned or _SPACE_RE.sub(' ', query).strip()
+
+
+def normalize_query(query: str) -> str:
+    """
+    Clave de cache: clean_query() en minúsculas, sin acentos y con los operadores (site:,
+    filetype:, -exclusión) al final en orden estable, así "X site:a.com -y" y
+    "X -y site:a.com" comparten entrada. Con lógica booleana (OR, AND, |, paréntesis)
+    el orden importa y se respeta.
+    """
+    tokens = _tokens(fold_accents(clean_query(query)).lower())
+    if any(t in _BOOLEAN_TOKENS or t.startswith('(') or t.endswith(')') for t in tokens):
+        return ' '.join(tokens)
+    terms = [t for t in tokens if not _OPERATOR_RE.match(t)]
+    operators = sorted(t for t in tokens if _OPERATOR_RE.match(t))
+    return ' '.join(terms + operators)
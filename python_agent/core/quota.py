@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+NEXA QUOTA
+Contabilidad de cuota de los motores de pago, persistida en SQLite y compartida entre
+procesos. Cada periodo (día o mes UTC) tiene su propia fila, así el reset es implícito.
+"""
+
+import logging
+import os
+import sqlite3
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_QUOTA_PATH = os.path.join(os.path.expanduser('~'), '.nexa', 'search_quota.sqlite3')
+
+
+def _period(kind: str, now: datetime) -> str:
+    return now.strftime('%Y-%m-%d') if kind == 'daily' else now.strftime('%Y-%m')
+
+
+def _next_reset(kind: str, now: datetime) -> datetime:
+    start = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    if kind == 'daily':
+        return start + timedelta(days=1)
+    if start.month == 12:
+        return start.replace(year=start.year + 1, month=1, day=1)
+    return start.replace(month=start.month + 1, day=1)
+
+
+class QuotaManager:
+    def __init__(self, path: Optional[str] = None, margin: int = 0):
+        """
+        Args:
+            path: Archivo SQLite (default: NEXA_SEARCH_QUOTA o ~/.nexa/search_quota.sqlite3)
+            margin: Llamadas que se dejan sin usar por periodo como colchón de seguridad
+        """
+        self.path = path or os.getenv('NEXA_SEARCH_QUOTA') or DEFAULT_QUOTA_PATH
+        self.margin = margin
+        self._limits: Dict[str, tuple] = {}  # engine -> (tipo, límite)
+        self._lock = threading.Lock()
+        try:
+            if self.path != ':memory:':
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            self._conn = self._connect(self.path)
+        except (sqlite3.Error, OSError) as e:
+            # Sin disco utilizable la cuota se sigue aplicando, solo que no sobrevive al reinicio
+            logger.warning("Cuota sin persistencia (%s): %r", self.path, e)
+            self.path = ':memory:'
+            self._conn = self._connect(self.path)
+
+    @staticmethod
+    def _connect(path: str) -> sqlite3.Connection:
+        # Autocommit: cada sentencia es atómica también frente a otros procesos
+        conn = sqlite3.connect(path, timeout=5.0, isolation_level=None, check_same_thread=False)
+        if path != ':memory:':
+            conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute(
+            'CREATE TABLE IF NOT EXISTS quota_usage ('
+            ' engine TEXT NOT NULL,'
+            ' period TEXT NOT NULL,'
+            ' used INTEGER NOT NULL DEFAULT 0,'
+            ' PRIMARY KEY (engine, period))'
+        )
+        return conn
+
+    # ────────────────────────────────────────────────────────────────────
+    # 📊 API DE CUOTA
+    # ────────────────────────────────────────────────────────────────────
+
+    def register(self, engine: str, quota: Dict):
+        """Registra el dict 'quota' de un motor ({'daily': N} o {'monthly': N})"""
+        for kind in ('daily', 'monthly'):
+            if kind in quota:
+                self._limits[engine] = (kind, int(quota[kind]))
+                return
+
+    def has_quota(self, engine: str) -> bool:
+        return engine in self._limits
+
+    def reserve(self, engine: str) -> bool:
+        """
+        Consume una llamada antes de hacerla. Devuelve False (sin consumir) si el motor
+        ya agotó su cuota del periodo; el UPDATE condicional es atómico entre procesos.
+        Si SQLite falla (p.ej. "database is locked") también devuelve False: sin poder
+        contar no se gasta dinero, el motor de pago se salta en esta búsqueda.
+        """
+        if engine not in self._limits:
+            return True
+        kind, limit = self._limits[engine]
+        period = _period(kind, datetime.now(timezone.utc))
+        try:
+            with self._lock:
+                self._conn.execute('INSERT OR IGNORE INTO quota_usage (engine, period, used) VALUES (?, ?, 0)',
+                                   (engine, period))
+                cursor = self._conn.execute(
+                    'UPDATE quota_usage SET used = used + 1 WHERE engine = ? AND period = ? AND used < ?',
+                    (engine, period, limit - self.margin)
+                )
+        except sqlite3.Error as e:
+            logger.warning("Cuota de %s no disponible, se salta el motor: %r", engine, e)
+            return False
+        return cursor.rowcount == 1
+
+    def used(self, engine: str) -> int:
+        """Llamadas consumidas en el periodo actual; propaga sqlite3.Error"""
+        if engine not in self._limits:
+            return 0
+        kind, _ = self._limits[engine]
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT used FROM quota_usage WHERE engine = ? AND period = ?',
+                (engine, _period(kind, datetime.now(timezone.utc)))
+            ).fetchone()
+        return row[0] if row else 0
+
+    def remaining(self, engine: str) -> Optional[int]:
+        """Llamadas que quedan (None si el motor no tiene cuota; 0 si SQLite falla)"""
+        if engine not in self._limits:
+            return None
+        _, limit = self._limits[engine]
+        try:
+            used = self.used(engine)
+        except sqlite3.Error as e:
+            logger.warning("Cuota de %s no disponible, se trata como agotada: %r", engine, e)
+            return 0
+        return max(0, limit - self.margin - used)
+
+    def status(self, engine: str) -> Dict:
+        """Mismo formato que el dict 'quota' de la configuración, con 'used' y 'reset' reales"""
+        kind, limit = self._limits[engine]
+        status = {kind: limit, 'reset': _next_reset(kind, datetime.now(timezone.utc)).isoformat()}
+        try:
+            used = self.used(engine)
+        except sqlite3.Error as e:
+            return {**status, 'used': None, 'remaining': 0, 'error': repr(e)}
+        return {**status, 'used': used, 'remaining': max(0, limit - self.margin - used)}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
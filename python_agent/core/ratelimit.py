@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+NEXA RATE LIMIT
+Token bucket por motor con ráfaga y tasa de recarga configurables.
+try_acquire() nunca bloquea, así el router puede saltar a otro motor en vez de dormir;
+acquire() y acquire_async() esperan como mucho `timeout` segundos.
+"""
+
+import asyncio
+import threading
+import time
+from typing import Dict, Optional
+
+
+class TokenBucket:
+    def __init__(self, rate: float, burst: float = 1):
+        """
+        Args:
+            rate: Tokens recargados por segundo
+            burst: Capacidad máxima del bucket (peticiones seguidas permitidas)
+        """
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+        self.granted = 0
+        self.rejected = 0
+
+    def _refill(self, now: float):
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_acquire(self, tokens: float = 1) -> bool:
+        """Toma `tokens` si hay disponibles; nunca espera"""
+        with self._lock:
+            self._refill(time.monotonic())
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                self.granted += 1
+                return True
+            self.rejected += 1
+            return False
+
+    def wait_time(self, tokens: float = 1) -> float:
+        """Segundos hasta que haya `tokens` disponibles (0 si ya los hay)"""
+        with self._lock:
+            self._refill(time.monotonic())
+            missing = tokens - self._tokens
+            return max(0.0, missing / self.rate) if self.rate > 0 else float('inf')
+
+    def acquire(self, tokens: float = 1, timeout: Optional[float] = None) -> bool:
+        """Versión bloqueante para hilos; devuelve False si vence el timeout"""
+        limit = None if timeout is None else time.monotonic() + timeout
+        while not self.try_acquire(tokens):
+            wait = self.wait_time(tokens)
+            if limit is not None and time.monotonic() + wait > limit:
+                return False
+            time.sleep(wait)
+        return True
+
+    async def acquire_async(self, tokens: float = 1, timeout: Optional[float] = None) -> bool:
+        """Versión para tareas async: cede el event loop mientras espera"""
+        loop = asyncio.get_running_loop()
+        limit = None if timeout is None else loop.time() + timeout
+        while not self.try_acquire(tokens):
+            wait = self.wait_time(tokens)
+            if limit is not None and loop.time() + wait > limit:
+                return False
+            await asyncio.sleep(wait)
+        return True
+
+    def stats(self) -> Dict:
+        with self._lock:
+            self._refill(time.monotonic())
+            return {
+                'rate': self.rate,
+                'burst': self.burst,
+                'tokens': round(self._tokens, 3),
+                'granted': self.granted,
+                'rejected': self.rejected
+            }
+
+
+class RateLimiter:
+    """Un TokenBucket por motor; los motores sin límite siempre pasan"""
+
+    def __init__(self):
+        self._buckets: Dict[str, TokenBucket] = {}
+
+    def configure(self, engine: str, rate: Optional[float], burst: float = 1):
+        if rate:
+            self._buckets[engine] = TokenBucket(rate, burst)
+        else:
+            self._buckets.pop(engine, None)
+
+    def try_acquire(self, engine: str) -> bool:
+        bucket = self._buckets.get(engine)
+        return bucket is None or bucket.try_acquire()
+
+    def acquire(self, engine: str, timeout: Optional[float] = None) -> bool:
+        bucket = self._buckets.get(engine)
+        return bucket is None or bucket.acquire(timeout=timeout)
+
+    async def acquire_async(self, engine: str, timeout: Optional[float] = None) -> bool:
+        bucket = self._buckets.get(engine)
+        return bucket is None or await bucket.acquire_async(timeout=timeout)
+
+    def wait_time(self, engine: str) -> float:
+        bucket = self._buckets.get(engine)
+        return bucket.wait_time() if bucket else 0.0
+
+    def stats(self) -> Dict[str, Dict]:
+        return {engine: bucket.stats() for engine, bucket in self._buckets.items()}
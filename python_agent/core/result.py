@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+NEXA SEARCH RESULT
+Registro compacto de un resultado (__slots__, sin __dict__) que viaja sin copias desde el
+parser del motor hasta la cache y la UI. Se lee como un dict ('title', 'url', 'source',
+'snippet' y, si se extrajo la página, 'content') y se serializa como tal; la clave de URL
+y la firma MinHash del snippet que usa la deduplicación se calculan solo cuando hacen
+falta y quedan memorizadas.
+"""
+
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .dedup import normalize_url, snippet_signature
+
+SNIPPET_MAX = 250
+
+
+class SearchResult:
+    __slots__ = ('title', 'url', 'source', 'snippet', 'content', '_url_key', '_signature')
+
+    FIELDS = ('title', 'url', 'source', 'snippet')
+
+    def __init__(self, title: str, url: str, source: str, snippet: Optional[str] = '',
+                 content: Optional[str] = None):
+        self.title = title
+        self.url = url
+        self.source = source
+        self.snippet = (snippet or '')[:SNIPPET_MAX]
+        self.content = content  # Texto de la página (solo tras ContentFetcher)
+        self._url_key: Optional[str] = None
+        self._signature: Optional[Tuple[int, Optional[Tuple[int, ...]]]] = None
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'SearchResult':
+        if isinstance(data, cls):
+            return data
+        return cls(data.get('title', ''), data.get('url', ''), data.get('source', ''), data.get('snippet', ''),
+                   data.get('content'))
+
+    def to_dict(self) -> Dict[str, str]:
+        return {key: getattr(self, key) for key in self.keys()}
+
+    def with_content(self, content: Optional[str]) -> 'SearchResult':
+        """Copia con el texto de la página; el original (quizá cacheado) no se toca"""
+        return SearchResult(self.title, self.url, self.source, self.snippet, content)
+
+    # ────────────────────────────────────────────────────────────────────
+    # 🧬 DATOS DERIVADOS (perezosos)
+    # ────────────────────────────────────────────────────────────────────
+
+    @property
+    def url_key(self) -> str:
+        """URL normalizada (ver dedup.normalize_url)"""
+        if self._url_key is None:
+            self._url_key = normalize_url(self.url) if self.url else ''
+        return self._url_key
+
+    @property
+    def signature(self) -> Tuple[int, Optional[Tuple[int, ...]]]:
+        """(tokens del snippet, sketch MinHash) para detectar casi-duplicados"""
+        if self._signature is None:
+            self._signature = snippet_signature(self.snippet)
+        return self._signature
+
+    def compact(self):
+        """Libera los datos derivados antes de cachear (se recalculan si vuelven a hacer falta)"""
+        self._url_key = None
+        self._signature = None
+
+    # ────────────────────────────────────────────────────────────────────
+    # 📖 COMPATIBILIDAD CON DICT
+    # ────────────────────────────────────────────────────────────────────
+
+    def __getitem__(self, key: str) -> str:
+        if key not in self.keys():
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return getattr(self, key) if key in self.keys() else default
+
+    def __contains__(self, key: object) -> bool:
+        return key in self.keys()
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.keys())
+
+    def __len__(self) -> int:
+        return len(self.keys())
+
+    def keys(self):
+        return self.FIELDS if self.content is None else self.FIELDS + ('content',)
+
+    def values(self):
+        return tuple(getattr(self, key) for key in self.keys())
+
+    def items(self):
+        return tuple((key, getattr(self, key)) for key in self.keys())
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, SearchResult):
+            return self.values() == other.values()
+        if isinstance(other, dict):
+            return self.to_dict() == other
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"SearchResult({self.title!r}, {self.url!r}, source={self.source!r})"
+
+
+def as_results(items: Iterable) -> List[SearchResult]:
+    """Lista de SearchResult; la misma lista si ya lo era (motores de terceros pueden devolver dicts)"""
+    if isinstance(items, list) and all(isinstance(item, SearchResult) for item in items):
+        return items
+    return [SearchResult.from_dict(item) for item in items]
+
+
+def json_default(obj: Any) -> Any:
+    """Para json.dumps(default=...): SearchResult se serializa como dict"""
+    if isinstance(obj, SearchResult):
+        return obj.to_dict()
+    return str(obj)
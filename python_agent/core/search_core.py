@@ -6,267 +6,161 @@ Módulo de búsqueda multi-motor | Cyberpunk Edition
 ✅ DuckDuckGo | ✅ SearXNG | ✅ Brave | ✅ You.com | ✅ Google CSE | ✅ SerpAPI
 """
 
+import asyncio
+import logging
+import os
 import requests
+from requests.adapters import HTTPAdapter
+import threading
 import time
-import random
-from typing import List, Dict, Optional
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import AsyncIterator, Iterator, List, Dict, Optional, Tuple
 from datetime import datetime, timedelta
-from urllib.parse import urlparse, quote_plus
+from urllib.parse import quote_plus
+
+from .cache import SearchCache, SQLiteCacheBackend
+from .singleflight import SingleFlight
+from .health import HealthTracker
+from .ratelimit import RateLimiter
+from .quota import QuotaManager
+from .fusion import RankFusion
+from .normalize import clean_query, normalize_query
+from .engines import BUILTIN_ENGINES, EngineRegistry, SearchEngine
+from .metrics import SearchMetrics, render_prometheus
+from .result import SearchResult, as_results
+from .local_index import LocalIndex, LocalIndexEngine
+from .warmup import QueryLog, Warmer
+from .content import ContentFetcher
+
+logger = logging.getLogger(__name__)
 
 class NexaSearchCore:
-    def __init__(self):
+    def __init__(self, cache_max_entries: int = 1000, cache_max_bytes: int = 32 * 1024 * 1024,
+                 cache_ttl: float = 300, cache_path: Optional[str] = None, warm_cache: bool = True,
+                 quota_path: Optional[str] = None, cache_stale_ttl: float = 1800,
+                 index_path: Optional[str] = None, index_max_docs: int = 20000,
+                 query_log_path: Optional[str] = None, max_workers: int = 32):
+        """
+        Args:
+            cache_max_entries: Máximo de consultas en la cache en memoria
+            cache_max_bytes: Tamaño aproximado máximo de la cache en memoria
+            cache_ttl: Segundos que un resultado cacheado se sirve como fresco
+            cache_path: Archivo SQLite para compartir la cache entre procesos y reinicios
+                (default: variable de entorno NEXA_SEARCH_CACHE; sin ella, solo memoria)
+            warm_cache: Precargar en memoria las entradas vigentes del archivo al arrancar
+            quota_path: Archivo SQLite donde se contabiliza la cuota de los motores de pago
+                (default: NEXA_SEARCH_QUOTA o ~/.nexa/search_quota.sqlite3)
+            cache_stale_ttl: Edad máxima de un resultado servido mientras se revalida en
+                segundo plano (stale-while-revalidate); pasado este TTL duro se busca en línea
+            index_path: Archivo SQLite del índice local BM25 (default: NEXA_SEARCH_INDEX o
+                ~/.nexa/search_index.sqlite3; ':memory:' para no persistir)
+            index_max_docs: Máximo de documentos del índice local
+            query_log_path: Archivo SQLite con la frecuencia de cada consulta, del que se nutre
+                el precalentamiento (default: NEXA_SEARCH_QUERY_LOG o ~/.nexa/search_queries.sqlite3)
+            max_workers: Hilos del pool compartido del modo paralelo. Lo usan a la vez todas las
+                búsquedas en curso (buscar, buscar_stream, buscar_many, el servidor), así que debe
+                cubrir motores x búsquedas concurrentes; si se queda corto, las búsquedas hacen
+                cola detrás de otras y agotan su deadline
+        """
         self.session = requests.Session()
+        # Tantas conexiones reutilizables por host como hilos pueden pedirlas a la vez
+        adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
         self.session.headers.update({
             'User-Agent': 'NEXA-AI/1.0 (Cyberpunk Edition)',
             'Accept': 'application/json',
             'Accept-Language': 'es-ES,es;q=0.9'
         })
         
-        # Configuración de motores
-        self.engines = {
-            'duckduckgo': {
-                'enabled': True,
-                'type': 'official',
-                'url': 'https://api.duckduckgo.com',
-                'timeout': 3,
-                'cooldown': 0
-            },
-            'searxng': {
-                'enabled': True,
-                'type': 'public',
-                'instances': [
-                    'https://searx.be',
-                    'https://search.unlocked.link',
-                    'https://searxng.site',
-                    'https://searx.work',
-                    'https://northboot.xyz'
-                ],
-                'timeout': 5,
-                'cooldown': 1
-            },
-            'brave': {
-                'enabled': False,
-                'type': 'official',
-                'key': None,  # ← AGREGA TU KEY AQUÍ
-                'url': 'https://api.search.brave.com/res/v1/web/search',
-                'timeout': 4,
-                'quota': {'daily': 2000, 'used': 0, 'reset': None}
-            },
-            'you': {
-                'enabled': False,
-                'type': 'official',
-                'key': None,  # ← AGREGA TU KEY AQUÍ
-                'url': 'https://api.you.com/search/web',
-                'timeout': 4,
-                'quota': {'daily': 1000, 'used': 0, 'reset': None}
-            },
-            'google_cse': {
-                'enabled': False,
-                'type': 'official',
-                'key': None,  # ← AGREGA TU KEY AQUÍ
-                'cx': None,   # ← AGREGA TU CX ID AQUÍ
-                'url': 'https://www.googleapis.com/customsearch/v1',
-                'timeout': 4,
-                'quota': {'daily': 100, 'used': 0, 'reset': None}
-            },
-            'serpapi': {
-                'enabled': False,
-                'type': 'official',
-                'key': None,  # ← AGREGA TU KEY AQUÍ
-                'url': 'https://serpapi.com/search',
-                'timeout': 4,
-                'quota': {'monthly': 100, 'used': 0, 'reset': None}
-            }
-        }
-        
+        # Registro de motores: cada uno trae su configuración (coste, timeout, cuota...)
+        # y `engines` expone esos mismos dicts por nombre
+        self.registry = EngineRegistry()
+        self.engines: Dict[str, Dict] = {}
         # Prioridad de motores (del más rápido/alto rendimiento al más lento)
-        self.priority_order = ['duckduckgo', 'searxng', 'brave', 'you', 'google_cse', 'serpapi']
-        self.cache = {}
-        self.last_request = {engine: 0 for engine in self.engines}
+        self.priority_order = self.registry.order
+        cache_path = cache_path or os.getenv('NEXA_SEARCH_CACHE')
+        backend = SQLiteCacheBackend(cache_path) if cache_path else None
+        self.cache = SearchCache(max_entries=cache_max_entries, max_bytes=cache_max_bytes,
+                                 ttl=cache_ttl, backend=backend, stale_ttl=cache_stale_ttl,
+                                 decode=self._decode_cached)
+        if warm_cache:
+            self.cache.warm_load()
+        # Búsquedas idénticas concurrentes comparten una sola ejecución
+        self._inflight = SingleFlight()
+        # Token bucket por motor: 'cooldown' (o 'rate') fija la recarga y 'burst' la ráfaga
+        self.limiter = RateLimiter()
+        # Cuota persistida de los motores de pago (reset diario/mensual implícito)
+        self.quota = QuotaManager(quota_path)
+        # Salud en vivo por motor (EWMA de latencia/errores + circuit breaker)
+        self.health = HealthTracker([])
+        # Histogramas de latencia por motor/resultado y contadores (get_metrics / export_prometheus)
+        self.metrics = SearchMetrics()
+        # Motores que declaran 'max_concurrency': peticiones simultáneas permitidas
+        self._slots: Dict[str, threading.BoundedSemaphore] = {}
+        
+        # Pool compartido para el modo paralelo (se crea bajo demanda)
+        self.max_workers = max(1, max_workers)
+        self._pool: Optional[ThreadPoolExecutor] = None
+        # Revalidaciones en segundo plano de entradas stale (una por clave)
+        self._refresh_pool: Optional[ThreadPoolExecutor] = None
+        self._refreshing = set()
+        self._refresh_lock = threading.Lock()
+        
+        for engine_cls in BUILTIN_ENGINES:
+            self.register_engine(engine_cls(self.session))
+        
+        # Índice local BM25 alimentado con todo lo que devuelven los motores; responde
+        # primero y, si ya respondió esta misma consulta hace menos del TTL duro de la
+        # cache, ahorra las peticiones HTTP
+        self.local_index = LocalIndex(index_path, max_docs=index_max_docs)
+        self.register_engine(LocalIndexEngine(self.local_index, max_age=cache_stale_ttl), 0)
+        
+        # Frecuencia de consultas para el precalentamiento (start_warmup)
+        self.query_log = QueryLog(query_log_path)
+        self.warmer: Optional[Warmer] = None
+        self._content: Optional[ContentFetcher] = None  # Se crea en el primer enrich()
     
     # ────────────────────────────────────────────────────────────────────
-    # 🔍 MÉTODOS DE BÚSQUEDA POR MOTOR
+    # 🗂️ REGISTRO DE MOTORES
     # ────────────────────────────────────────────────────────────────────
     
-    def _search_duckduckgo(self, query: str, limit: int) -> List[Dict]:
-        params = {
-            'q': query,
-            'format': 'json',
-            'no_html': 1,
-            'skip_disambig': 1,
-            't': 'NEXA'
-        }
-        r = self.session.get(self.engines['duckduckgo']['url'], params=params, timeout=3)
-        r.raise_for_status()
-        data = r.json()
-        
-        results = []
-        # Resultados principales
-        if data.get('AbstractURL'):
-            results.append({
-                'title': data.get('Heading', query),
-                'url': data['AbstractURL'],
-                'source': 'duckduckgo',
-                'snippet': data.get('AbstractText', '')[:250]
-            })
-        
-        # Related Topics
-        for item in data.get('RelatedTopics', [])[:limit]:
-            if isinstance(item, dict) and 'FirstURL' in item:
-                results.append({
-                    'title': item.get('Text', query),
-                    'url': item['FirstURL'],
-                    'source': 'duckduckgo',
-                    'snippet': item.get('Text', '')[:250]
-                })
-            elif isinstance(item, dict) and 'Topics' in item:
-                for sub in item.get('Topics', [])[:2]:
-                    if 'FirstURL' in sub:
-                        results.append({
-                            'title': sub.get('Text', query),
-                            'url': sub['FirstURL'],
-                            'source': 'duckduckgo',
-                            'snippet': sub.get('Text', '')[:250]
-                        })
-        
-        return results[:limit]
-    
-    def _search_searxng(self, query: str, limit: int) -> List[Dict]:
-        instances = self.engines['searxng']['instances'][:]
-        random.shuffle(instances)  # Rotar instancias para balanceo
-        
-        for instance in instances[:3]:  # Probar hasta 3 instancias
-            try:
-                url = f"{instance.rstrip('/')}/search"
-                params = {
-                    'q': query,
-                    'format': 'json',
-                    'language': 'es',
-                    'safesearch': 0,
-                    'categories': 'general'
-                }
-                r = self.session.get(url, params=params, timeout=5)
-                r.raise_for_status()
-                data = r.json()
-                
-                results = []
-                for item in data.get('results', [])[:limit]:
-                    results.append({
-                        'title': item.get('title', 'Sin título'),
-                        'url': item.get('url', ''),
-                        'source': 'searxng',
-                        'snippet': item.get('content', '')[:250]
-                    })
-                if results:
-                    return results
-            except:
-                continue
-        return []
-    
-    def _search_brave(self, query: str, limit: int) -> List[Dict]:
-        if not self.engines['brave']['key']:
-            raise ValueError("Brave API key no configurada")
-        
-        headers = {
-            'X-Subscription-Token': self.engines['brave']['key'],
-            'Accept': 'application/json'
-        }
-        params = {
-            'q': query,
-            'count': limit,
-            'search_lang': 'es',
-            'country': 'es'
-        }
-        r = self.session.get(self.engines['brave']['url'], headers=headers, params=params, timeout=4)
-        r.raise_for_status()
-        data = r.json()
-        
-        results = []
-        for item in data.get('web', {}).get('results', [])[:limit]:
-            results.append({
-                'title': item.get('title', 'Sin título'),
-                'url': item.get('url', ''),
-                'source': 'brave',
-                'snippet': item.get('description', '')[:250]
-            })
-        return results
-    
-    def _search_you(self, query: str, limit: int) -> List[Dict]:
-        if not self.engines['you']['key']:
-            raise ValueError("You.com API key no configurada")
-        
-        headers = {'X-API-Key': self.engines['you']['key']}
-        params = {'query': query, 'num_web_results': limit}
-        r = self.session.get(self.engines['you']['url'], headers=headers, params=params, timeout=4)
-        r.raise_for_status()
-        data = r.json()
-        
-        results = []
-        for item in data.get('web', {}).get('results', [])[:limit]:
-            results.append({
-                'title': item.get('title', 'Sin título'),
-                'url': item.get('url', ''),
-                'source': 'you',
-                'snippet': item.get('snippet', '')[:250]
-            })
-        return results
-    
-    def _search_google_cse(self, query: str, limit: int) -> List[Dict]:
-        if not self.engines['google_cse']['key'] or not self.engines['google_cse']['cx']:
-            raise ValueError("Google CSE key o CX ID no configurados")
+    def register_engine(self, engine: SearchEngine, position: Optional[int] = None):
+        """
+        Registra (o reemplaza) un motor en tiempo de ejecución
         
-        params = {
-            'key': self.engines['google_cse']['key'],
-            'cx': self.engines['google_cse']['cx'],
-            'q': query,
-            'num': min(limit, 10),
-            'lr': 'lang_es'
-        }
-        r = self.session.get(self.engines['google_cse']['url'], params=params, timeout=4)
-        r.raise_for_status()
-        data = r.json()
-        
-        results = []
-        for item in data.get('items', [])[:limit]:
-            results.append({
-                'title': item.get('title', 'Sin título'),
-                'url': item.get('link', ''),
-                'source': 'google_cse',
-                'snippet': item.get('snippet', '')[:250]
-            })
-        return results
+        Args:
+            engine: Implementación de SearchEngine (p.ej. un índice local o un doble de test)
+            position: Posición en priority_order (default: al final)
+        """
+        self.registry.register(engine, position)
+        cfg = engine.config
+        self.engines[engine.name] = cfg
+        rate = cfg.get('rate') or (1 / cfg['cooldown'] if cfg.get('cooldown') else None)
+        self.limiter.configure(engine.name, rate, cfg.get('burst', 1))
+        if 'quota' in cfg:
+            self.quota.register(engine.name, cfg['quota'])
+        if cfg.get('max_concurrency'):
+            self._slots[engine.name] = threading.BoundedSemaphore(cfg['max_concurrency'])
+        else:
+            self._slots.pop(engine.name, None)
+        self.health.reset(engine.name)
     
-    def _search_serpapi(self, query: str, limit: int) -> List[Dict]:
-        if not self.engines['serpapi']['key']:
-            raise ValueError("SerpAPI key no configurada")
-        
-        params = {
-            'api_key': self.engines['serpapi']['key'],
-            'q': query,
-            'num': limit,
-            'engine': 'google',
-            'hl': 'es',
-            'gl': 'es'
-        }
-        r = self.session.get(self.engines['serpapi']['url'], params=params, timeout=4)
-        r.raise_for_status()
-        data = r.json()
-        
-        results = []
-        for item in data.get('organic_results', [])[:limit]:
-            results.append({
-                'title': item.get('title', 'Sin título'),
-                'url': item.get('link', ''),
-                'source': 'serpapi',
-                'snippet': item.get('snippet', '')[:250]
-            })
-        return results
+    def unregister_engine(self, name: str) -> Optional[SearchEngine]:
+        engine = self.registry.unregister(name)
+        if engine is not None:
+            self.engines.pop(name, None)
+            self.limiter.configure(name, None)
+            self._slots.pop(name, None)
+            engine.close()
+        return engine
     
     # ────────────────────────────────────────────────────────────────────
     # ⚙️ MOTOR PRINCIPAL
     # ────────────────────────────────────────────────────────────────────
     
-    def buscar(self, query: str, max_results: int = 10, fast_mode: bool = False) -> Dict:
+    def buscar(self, query: str, max_results: int = 10, fast_mode: bool = False,
+               parallel: bool = False, deadline: Optional[float] = None) -> Dict:
         """
         Ejecuta búsqueda multi-motor con fallback inteligente
         
@@ -274,99 +168,654 @@ class NexaSearchCore:
             query: Término de búsqueda
             max_results: Máximo de resultados únicos (default: 10)
             fast_mode: True = solo motores sin key (más rápido)
+            parallel: True = consulta todos los motores a la vez en el pool compartido
+            deadline: Presupuesto total en segundos para el modo paralelo; los motores
+                que no respondan a tiempo se ignoran (default: timeout del motor más lento)
+        """
+        started = time.perf_counter()
+        cache_key = self._cache_key(query)
+        self.query_log.record(cache_key, query, max_results)
+        
+        # Cache hit (5 min TTL por defecto); una entrada con más resultados sirve a una petición menor
+        cached = self._cache_lookup(cache_key, query, max_results)
+        if cached is not None:
+            self.metrics.observe_request('cache', time.perf_counter() - started)
+            return cached
+        
+        # Single-flight: si otra llamada ya busca esta clave, esperar y compartir su resultado
+        resultados, shared = self._inflight.do(
+            f"{cache_key}|{max_results}",
+            lambda: self._buscar_uncached(query, max_results, fast_mode, parallel, deadline, cache_key)
+        )
+        self.metrics.observe_request('coalesced' if shared else 'live', time.perf_counter() - started)
+        return self._for_request(resultados, query, max_results) if shared else resultados
+    
+    def _buscar_uncached(self, query: str, max_results: int, fast_mode: bool, parallel: bool,
+                         deadline: Optional[float], cache_key: str, use_local: bool = True) -> Dict:
+        """
+        use_local=False salta los motores locales: las revalidaciones y el precalentamiento
+        existen para traer datos nuevos de la red, no para re-sellar lo que ya está indexado
         """
         start_time = time.time()
-        cache_key = f"{query.lower().strip()}|{max_results}"
+        resultados = self._new_resultados(query, max_results, fast_mode)
+        local, free, paid, fusion, priority = self._plan(fast_mode, resultados)
+        if not use_local:
+            local = []
         
-        # Cache hit (5 min TTL)
-        if cache_key in self.cache:
-            cached = self.cache[cache_key]
-            if time.time() - cached['timestamp'] < 300:
-                return cached['data']
+        # Los motores reciben la consulta sin palabras de activación ni espacios extra
+        engine_query = clean_query(query)
+        covered = self._collect_local(engine_query, max_results, local, resultados, fusion, priority)
+        if covered:
+            pass  # El índice local cubrió la petición: ninguna llamada de red
+        elif parallel:
+            self._buscar_parallel(engine_query, max_results, free, paid, deadline, resultados, fusion, priority)
+        else:
+            self._buscar_sequential(engine_query, max_results, free + paid, resultados, fusion, priority)
         
-        resultados = {
+        return self._finish(resultados, fusion, max_results, start_time, cache_key, covered)
+    
+    @staticmethod
+    def _decode_cached(data: Dict) -> Dict:
+        # El backend guarda JSON plano: los resultados vuelven a ser SearchResult compactos
+        data['results'] = [SearchResult.from_dict(r) for r in data.get('results', [])]
+        return data
+    
+    def _cache_key(self, query: str) -> str:
+        # "busca rápido X", "busca X" y "x" comparten clave; max_results no forma parte de ella
+        return normalize_query(query)
+    
+    def _cache_lookup(self, cache_key: str, query: str, max_results: int) -> Optional[Dict]:
+        found = self.cache.lookup(cache_key, accept=lambda data: data.get('max_results', 0) >= max_results)
+        if found is None:
+            return None
+        cached, stale = found
+        if stale:
+            # Stale-while-revalidate: se sirve ya y se refresca fuera del camino caliente
+            self._schedule_refresh(cache_key, cached)
+        return self._for_request(cached, query, max_results)
+    
+    def _schedule_refresh(self, cache_key: str, cached: Dict):
+        with self._refresh_lock:
+            if cache_key in self._refreshing:
+                return
+            self._refreshing.add(cache_key)
+            if self._refresh_pool is None:
+                self._refresh_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix='nexa-refresh')
+        # Entradas guardadas antes de registrar 'fast_mode': ante la duda, sin motores de pago
+        self._refresh_pool.submit(self._refresh, cache_key, cached['query'], cached['max_results'],
+                                  cached.get('fast_mode', True))
+    
+    def _refresh(self, cache_key: str, query: str, max_results: int, fast_mode: bool):
+        try:
+            # Mismo single-flight que buscar(): quien llegue sin cache espera a este refresco.
+            # Mismo fast_mode que la búsqueda original: un "busca rápido" no gasta cuota al revalidarse
+            self._inflight.do(
+                f"{cache_key}|{max_results}",
+                lambda: self._buscar_uncached(query, max_results, fast_mode, False, None, cache_key,
+                                              use_local=False)
+            )
+        except Exception as e:
+            logger.debug("Revalidación de %r falló: %r", query, e)
+        finally:
+            with self._refresh_lock:
+                self._refreshing.discard(cache_key)
+    
+    def _for_request(self, resultados: Dict, query: str, max_results: int) -> Dict:
+        """Vista de un resultado compartido ajustada a la consulta y al tamaño pedidos"""
+        if resultados['query'] == query and resultados.get('max_results') == max_results:
+            return resultados
+        view = dict(resultados)
+        view['query'] = query
+        view['results'] = resultados['results'][:max_results]
+        view['total_results'] = len(view['results'])
+        view['max_results'] = max_results
+        return view
+    
+    def _new_resultados(self, query: str, max_results: int, fast_mode: bool) -> Dict:
+        return {
             'query': query,
+            'max_results': max_results,
+            'fast_mode': fast_mode,
             'timestamp': datetime.now().isoformat(),
             'execution_time': 0.0,
             'total_results': 0,
             'sources_used': [],
+            'timed_out': [],
+            'rate_limited': [],
+            'quota_exhausted': [],
             'results': []
         }
-        
-        # Modo rápido: solo motores sin key
+    
+    def _plan(self, fast_mode: bool, resultados: Dict):
+        """Motores a consultar (locales, gratis, de pago) y la fusión de rankings de esta búsqueda"""
+        # Modo rápido: solo motores gratis (sin key)
+        order = self.priority_order
         if fast_mode:
-            self.priority_order = ['duckduckgo', 'searxng']
+            order = [engine for engine in order if self.engines[engine].get('cost', 0) == 0]
+        local, free, paid = self._route(order, resultados)
         
-        # Ejecutar búsqueda por motor
-        for engine in self.priority_order:
-            if not self.engines[engine]['enabled']:
-                continue
-            
-            # Respetar cooldown
-            cooldown = self.engines[engine].get('cooldown', 0)
-            if time.time() - self.last_request[engine] < cooldown:
-                time.sleep(cooldown - (time.time() - self.last_request[engine]))
-            
+        # Dedup incremental + RRF: cada resultado se normaliza una sola vez al llegar y
+        # puntúa por su posición en cada motor que lo devuelve. Lo local solo rellena: sus
+        # aciertos pueden venir de otras consultas y no cuentan para dejar de preguntar a la red
+        fusion = RankFusion({engine: cfg.get('weight', 1.0) for engine, cfg in self.engines.items()},
+                            fallback=local)
+        priority = {engine: i for i, engine in enumerate(local + free + paid)}
+        return local, free, paid, fusion, priority
+    
+    def _finish(self, resultados: Dict, fusion: RankFusion, max_results: int, start_time: float,
+                cache_key: str, covered: Optional[str] = None) -> Dict:
+        """`covered` es el motor local que respondió sin red, si lo hubo"""
+        # Post-procesamiento
+        resultados['results'] = fusion.top(max_results)
+        resultados['total_results'] = len(resultados['results'])
+        for result in resultados['results']:
+            result.compact()
+        resultados['execution_time'] = round(time.time() - start_time, 3)
+        
+        # Guardar en cache; lo que respondió el índice se fecha cuando la red lo trajo,
+        # así sigue caducando al TTL duro en vez de rejuvenecer en cada consulta
+        timestamp = self.registry[covered].fetched_at(resultados['results']) if covered else None
+        self.cache.set(cache_key, resultados, timestamp)
+        
+        return resultados
+    
+    # ────────────────────────────────────────────────────────────────────
+    # 📦 BÚSQUEDA EN LOTE
+    # ────────────────────────────────────────────────────────────────────
+    
+    def buscar_many(self, queries: List[str], max_results: int = 10, concurrency: int = 8,
+                    deadline: Optional[float] = None, fast_mode: bool = False, parallel: bool = False,
+                    query_deadline: Optional[float] = None) -> List[Dict]:
+        """
+        Busca muchas consultas a la vez y devuelve un item por consulta en el orden de entrada
+        (ver buscar_many_stream para el formato y los argumentos)
+        """
+        items: List[Optional[Dict]] = [None] * len(queries)
+        for item in self.buscar_many_stream(queries, max_results, concurrency, deadline, fast_mode,
+                                            parallel, query_deadline):
+            items[item['index']] = item
+        return items
+    
+    def buscar_many_stream(self, queries: List[str], max_results: int = 10, concurrency: int = 8,
+                           deadline: Optional[float] = None, fast_mode: bool = False, parallel: bool = False,
+                           query_deadline: Optional[float] = None) -> Iterator[Dict]:
+        """
+        Como buscar_many, pero produce cada item en cuanto su consulta termina.
+        Las consultas repetidas (misma forma normalizada) se buscan una sola vez; el pool de
+        conexiones, los rate limits, las cuotas y la cache son los mismos que los de buscar().
+        
+        Cada item: {'index', 'query', 'status', 'error', 'resultados'}
+            status: 'ok' | 'empty' (terminó sin resultados; 'error' dice por qué) |
+                    'error' (excepción) | 'timeout' (no terminó antes del deadline del lote)
+        
+        Args:
+            queries: Consultas, en el orden en que se quieren los items
+            max_results: Máximo de resultados por consulta
+            concurrency: Consultas en vuelo a la vez
+            deadline: Segundos para todo el lote; lo pendiente al vencer sale como 'timeout'
+            fast_mode: True = solo motores sin key
+            parallel: True = además, los motores de cada consulta a la vez (más rápido, más cuota)
+            query_deadline: Presupuesto por consulta en modo parallel (ver buscar)
+        """
+        queries = list(queries)
+        if not queries:
+            return
+        limit = time.time() + deadline if deadline is not None else None
+        # Una sola búsqueda por consulta normalizada; los índices repetidos comparten resultado
+        indices: Dict[str, List[int]] = {}
+        for i, query in enumerate(queries):
+            indices.setdefault(self._cache_key(query), []).append(i)
+        
+        pool = ThreadPoolExecutor(max_workers=max(1, min(concurrency, len(indices))),
+                                  thread_name_prefix='nexa-search-batch')
+        futures = {
+            pool.submit(self.buscar, queries[positions[0]], max_results, fast_mode, parallel, query_deadline): positions
+            for positions in indices.values()
+        }
+        pending = set(futures)
+        try:
+            while pending:
+                remaining = limit - time.time() if limit is not None else None
+                if remaining is not None and remaining <= 0:
+                    break
+                done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+                for future in done:
+                    for i in futures[future]:
+                        yield self._batch_item(i, queries[i], future)
+            for future in pending:
+                for i in futures[future]:
+                    yield {'index': i, 'query': queries[i], 'status': 'timeout',
+                           'error': f"deadline del lote ({deadline}s) vencido", 'resultados': None}
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+    
+    def _batch_item(self, index: int, query: str, future) -> Dict:
+        try:
+            # Una consulta repetida con otra forma (mayúsculas, espacios) recibe su propia vista
+            resultados = self._for_request(future.result(), query, future.result()['max_results'])
+        except Exception as e:
+            return {'index': index, 'query': query, 'status': 'error', 'error': repr(e), 'resultados': None}
+        if resultados['results']:
+            return {'index': index, 'query': query, 'status': 'ok', 'error': None, 'resultados': resultados}
+        # Sin resultados: decir qué motores no llegaron a responder en vez de devolver un vacío mudo
+        reasons = [f"{label}: {', '.join(resultados[key])}"
+                   for key, label in (('timed_out', 'timeout'), ('rate_limited', 'rate limit'),
+                                      ('quota_exhausted', 'sin cuota'))
+                   if resultados.get(key)]
+        return {'index': index, 'query': query, 'status': 'empty',
+                'error': '; '.join(reasons) or "ningún motor devolvió resultados", 'resultados': resultados}
+    
+    # ────────────────────────────────────────────────────────────────────
+    # 📡 STREAMING
+    # ────────────────────────────────────────────────────────────────────
+    
+    def buscar_stream(self, query: str, max_results: int = 10, fast_mode: bool = False,
+                      deadline: Optional[float] = None) -> Iterator[Dict]:
+        """
+        Igual que buscar(parallel=True) pero produce eventos según responde cada motor:
+        
+            {'type': 'start', 'query', 'engines'}
+            {'type': 'results', 'engine', 'results', 'elapsed'}  → solo resultados únicos nuevos
+            {'type': 'progress', 'engine', 'status', 'new_results', 'elapsed'}
+            {'type': 'done', 'summary', 'timings'}  → summary con el mismo formato que buscar()
+        
+        status es 'ok', 'empty' o 'error'. Los streams no se coalescen con single-flight,
+        pero leen y llenan la misma cache.
+        """
+        cache_key = self._cache_key(query)
+        self.query_log.record(cache_key, query, max_results)
+        cached = self._cache_lookup(cache_key, query, max_results)
+        if cached is not None:
+            self.metrics.observe_request('cache', 0.0)
+            yield from self._cached_events(cached)
+            return
+        
+        start_time = time.time()
+        resultados = self._new_resultados(query, max_results, fast_mode)
+        engine_query = clean_query(query)
+        local, free, paid, fusion, priority = self._plan(fast_mode, resultados)
+        if deadline is None and (free or paid):
+            deadline = max(self.engines[engine]['timeout'] for engine in free + paid)
+        limit = start_time + (deadline or 0)
+        timings = {}
+        yield {'type': 'start', 'query': query, 'engines': local + free + paid}
+        
+        # El índice local responde en línea (en memoria, sin red) antes de lanzar el resto
+        covered: List[str] = []
+        for event in self._local_events(engine_query, max_results, local, start_time, fusion, priority,
+                                        resultados, timings, covered):
+            yield event
+        phases = [] if covered else [free] + [[engine] for engine in paid]
+        
+        # Gratis todos a la vez; de pago de uno en uno mientras falten resultados únicos
+        for phase in phases:
+            if phase is not free and fusion.confirmed() >= max_results:
+                break
+            allowed = self._admit_all(phase, resultados)
+            for engine, results, error, _ in self._iter_completions(engine_query, max_results, allowed,
+                                                                     limit, resultados):
+                yield from self._stream_events(engine, results, error, time.time() - start_time,
+                                               fusion, priority, resultados, timings)
+        
+        summary = self._finish(resultados, fusion, max_results, start_time, cache_key,
+                               covered[0] if covered else None)
+        self.metrics.observe_request('live', time.time() - start_time)
+        yield {'type': 'done', 'summary': summary, 'timings': timings}
+    
+    async def abuscar_stream(self, query: str, max_results: int = 10, fast_mode: bool = False,
+                             deadline: Optional[float] = None) -> AsyncIterator[Dict]:
+        """
+        Versión async de buscar_stream: motores async en el loop, los síncronos en el pool.
+        Lo que puede bloquear (cache L2 y cuota en SQLite, índice local) también va al
+        pool, así el event loop solo espera
+        """
+        loop = asyncio.get_running_loop()
+        pool = self._get_pool()
+        cache_key = self._cache_key(query)
+        self.query_log.record(cache_key, query, max_results)  # Solo memoria
+        cached = await loop.run_in_executor(pool, self._cache_lookup, cache_key, query, max_results)
+        if cached is not None:
+            self.metrics.observe_request('cache', 0.0)
+            for event in self._cached_events(cached):
+                yield event
+            return
+        
+        start_time = time.time()
+        resultados = self._new_resultados(query, max_results, fast_mode)
+        engine_query = clean_query(query)
+        local, free, paid, fusion, priority = await loop.run_in_executor(pool, self._plan, fast_mode, resultados)
+        if deadline is None and (free or paid):
+            deadline = max(self.engines[engine]['timeout'] for engine in free + paid)
+        limit = start_time + (deadline or 0)
+        timings = {}
+        yield {'type': 'start', 'query': query, 'engines': local + free + paid}
+        
+        # El índice local responde antes de lanzar el resto (en el pool: busca en memoria
+        # pero con CPU y bajo lock)
+        covered: List[str] = []
+        events = await loop.run_in_executor(pool, lambda: list(self._local_events(
+            engine_query, max_results, local, start_time, fusion, priority, resultados, timings, covered)))
+        for event in events:
+            yield event
+        phases = [] if covered else [free] + [[engine] for engine in paid]
+        
+        for phase in phases:
+            if phase is not free and fusion.confirmed() >= max_results:
+                break
+            allowed = await loop.run_in_executor(pool, self._admit_all, phase, resultados)
+            tasks = {
+                asyncio.ensure_future(self._arun_engine(engine, engine_query, max_results)): engine
+                for engine in allowed
+            }
+            pending = set(tasks)
             try:
-                self.last_request[engine] = time.time()
-                
-                if engine == 'duckduckgo':
-                    results = self._search_duckduckgo(query, max_results)
-                elif engine == 'searxng':
-                    results = self._search_searxng(query, max_results)
-                elif engine == 'brave':
-                    results = self._search_brave(query, max_results)
-                elif engine == 'you':
-                    results = self._search_you(query, max_results)
-                elif engine == 'google_cse':
-                    results = self._search_google_cse(query, max_results)
-                elif engine == 'serpapi':
-                    results = self._search_serpapi(query, max_results)
-                else:
-                    continue
-                
-                if results:
-                    resultados['sources_used'].append(engine)
-                    resultados['results'].extend(results)
-                    
-                    # Early exit si ya tenemos suficientes resultados únicos
-                    if len(self._remove_duplicates(resultados['results'])) >= max_results:
+                while pending:
+                    remaining = limit - time.time()
+                    if remaining <= 0:
+                        resultados['timed_out'].extend(tasks[t] for t in pending)
+                        for task in pending:
+                            self.metrics.inc('deadline_cutoffs', tasks[task])
                         break
-                        
+                    done, pending = await asyncio.wait(pending, timeout=remaining,
+                                                       return_when=asyncio.FIRST_COMPLETED)
+                    for task in done:
+                        error = task.exception()
+                        for event in self._stream_events(tasks[task], None if error else task.result(), error,
+                                                         time.time() - start_time, fusion, priority,
+                                                         resultados, timings):
+                            yield event
+            finally:
+                for task in pending:
+                    task.cancel()
+        
+        summary = await loop.run_in_executor(pool, self._finish, resultados, fusion, max_results, start_time,
+                                             cache_key, covered[0] if covered else None)
+        self.metrics.observe_request('live', time.time() - start_time)
+        yield {'type': 'done', 'summary': summary, 'timings': timings}
+    
+    def _stream_events(self, engine: str, results: Optional[List[Dict]], error: Optional[BaseException],
+                       elapsed: float, fusion: RankFusion, priority: Dict[str, int], resultados: Dict,
+                       timings: Dict) -> Iterator[Dict]:
+        elapsed = round(elapsed, 3)
+        timings[engine] = elapsed
+        if error is not None:
+            logger.debug("Motor %s falló: %r", engine, error)
+            yield {'type': 'progress', 'engine': engine, 'status': 'error',
+                   'error': type(error).__name__, 'new_results': 0, 'elapsed': elapsed}
+            return
+        new = fusion.add(engine, results, priority[engine]) if results else []
+        if results:
+            resultados['sources_used'].append(engine)
+        if new:
+            yield {'type': 'results', 'engine': engine, 'results': new, 'elapsed': elapsed}
+        yield {'type': 'progress', 'engine': engine, 'status': 'ok' if results else 'empty',
+               'new_results': len(new), 'elapsed': elapsed}
+    
+    def _local_events(self, query: str, max_results: int, local: List[str], start_time: float,
+                      fusion: RankFusion, priority: Dict[str, int], resultados: Dict,
+                      timings: Dict, covered: List[str]) -> Iterator[Dict]:
+        """Eventos de los motores locales; los que cubren la petición se añaden a `covered`"""
+        for engine in self._admit_all(local, resultados):
+            try:
+                results, error = self._run_engine(engine, query, max_results), None
             except Exception as e:
-                # Silencioso en producción (solo loggearía en modo debug)
+                results, error = None, e
+            yield from self._stream_events(engine, results, error, time.time() - start_time,
+                                           fusion, priority, resultados, timings)
+            if results and self._local_covers(engine, query, results, max_results, fusion):
+                covered.append(engine)
+                return
+    
+    def _cached_events(self, cached: Dict) -> Iterator[Dict]:
+        yield {'type': 'start', 'query': cached['query'], 'engines': []}
+        if cached['results']:
+            yield {'type': 'results', 'engine': 'cache', 'results': cached['results'], 'elapsed': 0.0}
+        yield {'type': 'done', 'summary': cached, 'timings': {'cache': 0.0}}
+    
+    def _route(self, order: List[str], resultados: Dict):
+        """
+        Separa los motores en locales (sin red), gratis y de pago (éstos del más barato al
+        más caro) y aplica el routing adaptativo por salud dentro de cada grupo; descarta
+        los sin cuota
+        """
+        local, free, paid = [], [], []
+        for engine in order:
+            if engine not in self.engines or not self.engines[engine]['enabled']:
+                continue
+            if self.engines[engine].get('local'):
+                local.append(engine)
                 continue
+            if self.quota.remaining(engine) == 0:
+                resultados['quota_exhausted'].append(engine)
+                continue
+            (paid if self.engines[engine].get('cost', 0) > 0 else free).append(engine)
+        paid.sort(key=lambda engine: self.engines[engine]['cost'])
         
-        # Post-procesamiento
-        resultados['results'] = self._remove_duplicates(resultados['results'])[:max_results]
-        resultados['total_results'] = len(resultados['results'])
-        resultados['execution_time'] = round(time.time() - start_time, 3)
+        # Routing adaptativo: sin circuitos abiertos y con los motores degradados al final
+        timeouts = {engine: self.engines[engine]['timeout'] for engine in free + paid}
+        return local, self.health.route(free, timeouts), self.health.route(paid, timeouts)
+    
+    def _admit(self, engine: str, resultados: Dict) -> bool:
+        """Toma un token del rate limiter y reserva cuota; False si el motor no puede salir ya"""
+        if not self.limiter.try_acquire(engine):
+            return False
+        if not self.quota.reserve(engine):
+            resultados['quota_exhausted'].append(engine)
+            return False
+        return True
+    
+    def _wait_cooldown(self, engine: str) -> bool:
+        """Espera un token (acotado por el timeout del motor) y contabiliza la espera"""
+        started = time.perf_counter()
+        acquired = self.limiter.acquire(engine, timeout=self.engines[engine]['timeout'])
+        self.metrics.inc('cooldown_waits', engine)
+        self.metrics.inc('cooldown_wait_seconds', engine, time.perf_counter() - started)
+        return acquired
+    
+    def _buscar_sequential(self, query: str, max_results: int, order: List[str], resultados: Dict,
+                           fusion: RankFusion, priority: Dict[str, int]):
+        """
+        Recorre los motores uno a uno (los gratis primero) y sale en cuanto hay
+        suficientes resultados, así los de pago solo se usan cuando hacen falta
+        """
+        deferred = []
+        for engine in order:
+            # Sin token disponible: pasar al siguiente motor en vez de dormir
+            if not self._admit(engine, resultados):
+                if engine not in resultados['quota_exhausted']:
+                    deferred.append(engine)
+                continue
+            if self._collect_engine(engine, query, max_results, resultados, fusion, priority[engine]):
+                return
         
-        # Guardar en cache
-        self.cache[cache_key] = {
-            'timestamp': time.time(),
-            'data': resultados
-        }
+        # Solo si nadie respondió se espera (acotado por el timeout del motor) a los limitados
+        for engine in deferred:
+            if not fusion.confirmed() and self._wait_cooldown(engine):
+                if self.quota.reserve(engine):
+                    self._collect_engine(engine, query, max_results, resultados, fusion, priority[engine])
+                else:
+                    resultados['quota_exhausted'].append(engine)
+            else:
+                resultados['rate_limited'].append(engine)
+    
+    def _collect_local(self, query: str, max_results: int, local: List[str], resultados: Dict,
+                       fusion: RankFusion, priority: Dict[str, int]) -> Optional[str]:
+        """Consulta los motores locales en línea; devuelve el que ya cubre la petición, si alguno"""
+        for engine in self._admit_all(local, resultados):
+            try:
+                results = self._run_engine(engine, query, max_results)
+            except Exception as e:
+                logger.debug("Motor %s falló: %r", engine, e)
+                continue
+            if results:
+                resultados['sources_used'].append(engine)
+                fusion.add(engine, results, priority[engine])
+                if self._local_covers(engine, query, results, max_results, fusion):
+                    return engine
+        return None
+    
+    def _local_covers(self, engine: str, query: str, results: List[Dict], max_results: int,
+                      fusion: RankFusion) -> bool:
+        """Sin red solo si hay resultados suficientes y el motor los da por respuesta a esta consulta"""
+        return len(fusion) >= max_results and self.registry[engine].covers(query, results, max_results)
+    
+    def _collect_engine(self, engine: str, query: str, max_results: int, resultados: Dict,
+                        fusion: RankFusion, priority: int) -> bool:
+        """Ejecuta un motor y acumula sus resultados; True si ya hay suficientes únicos"""
+        try:
+            results = self._run_engine(engine, query, max_results)
+        except Exception as e:
+            logger.debug("Motor %s falló: %r", engine, e)
+            return False
         
-        return resultados
+        if results:
+            resultados['sources_used'].append(engine)
+            fusion.add(engine, results, priority)
+            
+            # Early exit si ya tenemos suficientes resultados únicos (de la red)
+            return fusion.confirmed() >= max_results
+        return False
+    
+    def _buscar_parallel(self, query: str, max_results: int, free: List[str], paid: List[str],
+                         deadline: Optional[float], resultados: Dict, fusion: RankFusion,
+                         priority: Dict[str, int]):
+        """
+        Lanza todos los motores gratis a la vez y recoge lo que llegue antes del deadline;
+        los de pago salen de uno en uno, con el tiempo restante, mientras falten resultados únicos
+        """
+        if deadline is None and (free or paid):
+            deadline = max(self.engines[engine]['timeout'] for engine in free + paid)
+        limit = time.time() + (deadline or 0)
+        
+        self._fan_out(query, max_results, free, limit, resultados, fusion, priority)
+        for engine in paid:
+            if fusion.confirmed() >= max_results:
+                break
+            self._fan_out(query, max_results, [engine], limit, resultados, fusion, priority)
+    
+    def _fan_out(self, query: str, max_results: int, order: List[str], limit: float, resultados: Dict,
+                 fusion: RankFusion, priority: Dict[str, int]):
+        allowed = self._admit_all(order, resultados)
+        answered = set()
+        pending = set(allowed)
+        completions = self._iter_completions(query, max_results, allowed, limit, resultados)
+        for engine, results, error, _ in completions:
+            pending.discard(engine)
+            if error is not None:
+                logger.debug("Motor %s falló: %r", engine, error)
+            elif results:
+                answered.add(engine)
+                fusion.add(engine, results, priority[engine])
+            
+            # Si los pendientes ya no pueden cambiar el top-k, no vale la pena esperarlos
+            if pending and fusion.is_stable(max_results, pending):
+                completions.close()
+                break
+        
+        resultados['sources_used'].extend(engine for engine in allowed if engine in answered)
+    
+    def _admit_all(self, order: List[str], resultados: Dict) -> List[str]:
+        allowed = []
+        for engine in order:
+            if self._admit(engine, resultados):
+                allowed.append(engine)
+            elif engine not in resultados['quota_exhausted']:
+                resultados['rate_limited'].append(engine)
+        return allowed
+    
+    def _iter_completions(self, query: str, max_results: int, engines: List[str], limit: float,
+                          resultados: Dict) -> Iterator[Tuple[str, Optional[List[Dict]], Optional[Exception], float]]:
+        """
+        Lanza los motores en el pool compartido y produce (motor, resultados, error, segundos)
+        según van terminando. Al vencer el deadline los pendientes van a 'timed_out';
+        si el consumidor cierra el generador antes, simplemente se cancelan.
+        """
+        if not engines or time.time() >= limit:
+            return
+        started = time.time()
+        pool = self._get_pool()
+        futures = {pool.submit(self._run_engine, engine, query, max_results): engine for engine in engines}
+        pending = set(futures)
+        try:
+            while pending:
+                remaining = limit - time.time()
+                if remaining <= 0:
+                    resultados['timed_out'].extend(futures[f] for f in pending)
+                    for future in pending:
+                        self.metrics.inc('deadline_cutoffs', futures[future])
+                    break
+                done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+                for future in done:
+                    elapsed = time.time() - started
+                    try:
+                        yield futures[future], future.result(), None, elapsed
+                    except Exception as e:
+                        yield futures[future], None, e, elapsed
+        finally:
+            # Los rezagados se cancelan si aún no arrancaron; si ya corren, se ignoran
+            for future in pending:
+                future.cancel()
+    
+    def _run_engine(self, engine: str, query: str, max_results: int) -> List[Dict]:
+        """Llama al motor y registra su salud (el token ya se tomó en el router)"""
+        impl = self.registry[engine]
+        slot = self._slots.get(engine)
+        if slot is not None and not slot.acquire(timeout=impl.config['timeout']):
+            raise TimeoutError(f"{engine}: sin hueco de concurrencia")
+        started = time.time()
+        try:
+            results = as_results(impl.search(query, max_results))
+        except Exception as e:
+            self._record_failure(engine, time.time() - started, e)
+            raise
+        finally:
+            if slot is not None:
+                slot.release()
+        self._record_success(engine, query, time.time() - started, results)
+        return results
+    
+    async def _arun_engine(self, engine: str, query: str, max_results: int) -> List[Dict]:
+        """Motores async se esperan en el event loop; los síncronos van al pool compartido"""
+        impl = self.registry[engine]
+        if not impl.is_async:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_pool(), self._run_engine, engine, query, max_results)
+        started = time.time()
+        try:
+            results = as_results(await asyncio.wait_for(impl.asearch(query, max_results),
+                                                        impl.config['timeout']))
+        except Exception as e:
+            self._record_failure(engine, time.time() - started, e)
+            raise
+        self._record_success(engine, query, time.time() - started, results)
+        return results
+    
+    def _record_success(self, engine: str, query: str, elapsed: float, results: List[Dict]):
+        self.health.record_success(engine, elapsed)
+        self.metrics.observe_engine(engine, 'success' if results else 'empty', elapsed)
+        # Todo lo que trae la red alimenta el índice local (que no se realimenta a sí mismo)
+        if results and not self.engines.get(engine, {}).get('local'):
+            self.local_index.add(engine, results, query)
+    
+    def _record_failure(self, engine: str, elapsed: float, error: Exception):
+        self.health.record_failure(engine, elapsed, type(error).__name__)
+        timeout = isinstance(error, (requests.Timeout, TimeoutError, asyncio.TimeoutError))
+        self.metrics.observe_engine(engine, 'timeout' if timeout else 'error', elapsed)
+    
+    def _get_pool(self) -> ThreadPoolExecutor:
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=self.max_workers,
+                                            thread_name_prefix='nexa-search')
+        return self._pool
     
     # ────────────────────────────────────────────────────────────────────
     # 🧹 UTILIDADES
     # ────────────────────────────────────────────────────────────────────
     
-    def _remove_duplicates(self, results: List[Dict]) -> List[Dict]:
-        seen = set()
-        unique = []
-        for r in results:
-            domain = urlparse(r.get('url', '')).netloc.replace('www.', '')
-            if domain and domain not in seen:
-                seen.add(domain)
-                unique.append(r)
-        return unique
-    
     def enable(self, engine: str):
         if engine in self.engines:
             self.engines[engine]['enabled'] = True
+            self.health.reset(engine)
     
     def disable(self, engine: str):
         if engine in self.engines:
@@ -378,16 +827,127 @@ class NexaSearchCore:
             if cx and 'cx' in self.engines[engine]:
                 self.engines[engine]['cx'] = cx
             self.engines[engine]['enabled'] = True
+            self.health.reset(engine)
+    
+    def set_rate_limit(self, engine: str, rate: Optional[float], burst: float = 1):
+        """Cambia la tasa (peticiones/s) y la ráfaga de un motor; rate=None lo deja sin límite"""
+        if engine in self.engines:
+            self.limiter.configure(engine, rate, burst)
+    
+    # ────────────────────────────────────────────────────────────────────
+    # 🔥 PRECALENTAMIENTO
+    # ────────────────────────────────────────────────────────────────────
+    
+    def prefetch(self, query: str, max_results: int = 10, fast_mode: bool = True) -> Dict:
+        """
+        Busca ignorando la cache y el índice local y guarda el resultado (no cuenta en el
+        registro de consultas). Comparte single-flight con buscar(), así un usuario que llegue
+        a la vez no duplica la búsqueda.
+        """
+        cache_key = self._cache_key(query)
+        resultados, _ = self._inflight.do(
+            f"{cache_key}|{max_results}",
+            lambda: self._buscar_uncached(query, max_results, fast_mode, False, None, cache_key,
+                                          use_local=False)
+        )
+        return resultados
+    
+    def start_warmup(self, top_n: int = 50, rate: float = 0.5, refresh_interval: float = 900,
+                     fast_mode: bool = True) -> Warmer:
+        """
+        Precalienta en segundo plano las top_n consultas más frecuentes y las refresca cada
+        refresh_interval segundos; el informe queda en get_stats()['warmup']
+        
+        Args:
+            top_n: Consultas populares a mantener calientes
+            rate: Consultas por segundo como máximo (además de los rate limits de cada motor)
+            refresh_interval: Segundos entre rondas (0 = solo la ronda inicial)
+            fast_mode: True = solo motores gratis (no consume cuota de pago)
+        """
+        if self.warmer is None:
+            self.warmer = Warmer(self, top_n=top_n, rate=rate, refresh_interval=refresh_interval,
+                                 fast_mode=fast_mode).start()
+        return self.warmer
+    
+    # ────────────────────────────────────────────────────────────────────
+    # 📄 CONTENIDO DE PÁGINAS
+    # ────────────────────────────────────────────────────────────────────
+    
+    @property
+    def content_fetcher(self) -> ContentFetcher:
+        if self._content is None:
+            self._content = ContentFetcher()
+        return self._content
+    
+    def enrich(self, resultados: Dict, top_k: int = 3, deadline: Optional[float] = None) -> Dict:
+        """
+        Etapa opcional tras buscar(): descarga en paralelo las top_k páginas y añade su
+        texto principal como 'content' (estilo Tavily). Devuelve una copia; la cache no cambia.
+        
+        Args:
+            resultados: Lo que devolvió buscar()
+            top_k: Cuántos resultados leer
+            deadline: Segundos máximos para toda la etapa (default: 2x el timeout por página)
+        """
+        return self.content_fetcher.enrich(resultados, top_k, deadline)
     
     def get_stats(self) -> Dict:
+        """
+        Un dict por motor, por su nombre (como siempre), y junto a ellos las secciones
+        'rate_limits', 'cache', 'inflight', 'warmup' y 'content'
+        """
+        health = self.health.snapshot()
         return {
-            engine: {
-                'enabled': cfg['enabled'],
-                'type': cfg['type'],
-                'quota': cfg.get('quota', 'N/A')
-            }
-            for engine, cfg in self.engines.items()
+            **{
+                engine: {
+                    'enabled': cfg['enabled'],
+                    'type': cfg['type'],
+                    'cost': cfg.get('cost', 0),
+                    'quota': self.quota.status(engine) if self.quota.has_quota(engine) else 'N/A',
+                    'health': health.get(engine),
+                    **self.registry[engine].stats()
+                }
+                for engine, cfg in self.engines.items()
+            },
+            'rate_limits': self.limiter.stats(),
+            'cache': self.cache.stats(),
+            'inflight': self._inflight.stats(),
+            'warmup': self.warmer.report() if self.warmer else None,
+            'content': self._content.stats() if self._content else None
         }
     
     def clear_cache(self):
         self.cache.clear()
+    
+    def get_metrics(self) -> Dict:
+        """Snapshot JSON: histogramas por motor/resultado y por origen, contadores y cache"""
+        snapshot = self.metrics.snapshot()
+        cache = self.cache.stats()
+        snapshot['cache'] = {
+            event: cache[event]
+            for event in ('hits', 'stale_hits', 'misses', 'evictions', 'expirations',
+                          'backend_hits', 'backend_errors')
+        }
+        snapshot['bytes_received'] = {engine.name: engine.bytes_received for engine in self.registry}
+        return snapshot
+    
+    def export_prometheus(self) -> str:
+        """Métricas en formato de texto de Prometheus (para un endpoint /metrics)"""
+        return render_prometheus(self.get_metrics())
+    
+    def close(self):
+        """Libera el pool de hilos, la purga de cache y la sesión HTTP"""
+        if self.warmer is not None:
+            self.warmer.stop()
+        self.query_log.close()
+        if self._content is not None:
+            self._content.close()
+        self.cache.close()
+        self.quota.close()
+        for pool in (self._pool, self._refresh_pool):
+            if pool is not None:
+                pool.shutdown(wait=False, cancel_futures=True)
+        self._pool = self._refresh_pool = None
+        for engine in self.registry:
+            engine.close()
+        self.session.close()
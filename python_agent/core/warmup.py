@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+NEXA WARM-UP
+Registro de frecuencia de consultas (lo escribe el propio core en cada búsqueda) y
+precalentamiento en segundo plano: al arrancar y luego cada cierto tiempo se vuelven a
+buscar las consultas más populares, a ritmo controlado y sin saltarse los rate limits
+ni las cuotas de los motores.
+"""
+
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional
+
+from .ratelimit import TokenBucket
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_QUERY_LOG_PATH = os.path.join(os.path.expanduser('~'), '.nexa', 'search_queries.sqlite3')
+
+
+class QueryLog:
+    def __init__(self, path: Optional[str] = None, window: float = 7 * 86400, flush_interval: float = 30):
+        """
+        Args:
+            path: Archivo SQLite (default: NEXA_SEARCH_QUERY_LOG o ~/.nexa/search_queries.sqlite3;
+                ':memory:' para no persistir)
+            window: Solo cuentan las consultas vistas en esta ventana (segundos)
+            flush_interval: Cada cuántos segundos se vuelcan los contadores a disco
+        """
+        self.path = path or os.getenv('NEXA_SEARCH_QUERY_LOG') or DEFAULT_QUERY_LOG_PATH
+        self.window = window
+        # Contadores pendientes de volcar: clave -> [consulta, max_results, hits, última vez]
+        self._pending: Dict[str, list] = {}
+        self._lock = threading.Lock()
+        try:
+            if self.path != ':memory:':
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            self._conn = self._connect(self.path)
+        except (sqlite3.Error, OSError) as e:
+            logger.warning("Registro de consultas sin persistencia (%s): %r", self.path, e)
+            self.path = ':memory:'
+            self._conn = self._connect(self.path)
+
+        self._stop = threading.Event()
+        if flush_interval > 0:
+            threading.Thread(target=self._flush_loop, args=(flush_interval,),
+                             name='nexa-querylog-flush', daemon=True).start()
+
+    @staticmethod
+    def _connect(path: str) -> sqlite3.Connection:
+        conn = sqlite3.connect(path, timeout=5.0, check_same_thread=False)
+        if path != ':memory:':
+            conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute(
+            'CREATE TABLE IF NOT EXISTS query_log ('
+            ' key TEXT PRIMARY KEY,'
+            ' query TEXT NOT NULL,'
+            ' max_results INTEGER NOT NULL,'
+            ' hits INTEGER NOT NULL DEFAULT 0,'
+            ' last_seen REAL NOT NULL)'
+        )
+        conn.commit()
+        return conn
+
+    def record(self, key: str, query: str, max_results: int):
+        """Cuenta una búsqueda (solo en memoria; el volcado a disco va aparte)"""
+        with self._lock:
+            entry = self._pending.get(key)
+            if entry is None:
+                self._pending[key] = [query, max_results, 1, time.time()]
+            else:
+                entry[0] = query
+                entry[1] = max(entry[1], max_results)
+                entry[2] += 1
+                entry[3] = time.time()
+
+    def top(self, n: int) -> List[Dict]:
+        """Las n consultas más buscadas dentro de la ventana"""
+        self.flush()
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT key, query, max_results, hits FROM query_log WHERE last_seen >= ?'
+                ' ORDER BY hits DESC, last_seen DESC LIMIT ?', (time.time() - self.window, n)
+            ).fetchall()
+        return [{'key': key, 'query': query, 'max_results': max_results, 'hits': hits}
+                for key, query, max_results, hits in rows]
+
+    def flush(self):
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            if not pending:
+                return
+            try:
+                with self._conn:
+                    self._conn.executemany(
+                        'INSERT INTO query_log (key, query, max_results, hits, last_seen) VALUES (?, ?, ?, ?, ?)'
+                        ' ON CONFLICT(key) DO UPDATE SET query = excluded.query,'
+                        ' max_results = MAX(max_results, excluded.max_results),'
+                        ' hits = hits + excluded.hits, last_seen = excluded.last_seen',
+                        [(key, *entry) for key, entry in pending.items()]
+                    )
+                    # Lo que salió de la ventana ya no es popular: el registro no crece sin límite
+                    self._conn.execute('DELETE FROM query_log WHERE last_seen < ?', (time.time() - self.window,))
+            except sqlite3.Error as e:
+                logger.warning("No se pudo guardar el registro de consultas: %r", e)
+
+    def close(self):
+        self._stop.set()
+        self.flush()
+        with self._lock:
+            self._conn.close()
+
+    def _flush_loop(self, interval: float):
+        while not self._stop.wait(interval):
+            self.flush()
+
+
+class Warmer:
+    def __init__(self, core, top_n: int = 50, rate: float = 0.5, refresh_interval: float = 900,
+                 fast_mode: bool = True, refresh_at: float = 0.5):
+        """
+        Args:
+            core: NexaSearchCore a calentar
+            top_n: Tamaño del conjunto caliente (consultas más populares del registro)
+            rate: Consultas por segundo que puede lanzar el precalentamiento
+            refresh_interval: Segundos entre rondas de refresco (0 = una sola ronda)
+            fast_mode: True = solo motores gratis, así el precalentamiento no gasta cuota de pago
+            refresh_at: Fracción del TTL de la cache a partir de la cual una entrada se refresca
+        """
+        self.core = core
+        self.top_n = top_n
+        self.refresh_interval = refresh_interval
+        self.fast_mode = fast_mode
+        self.refresh_at = refresh_at
+        self._bucket = TokenBucket(rate, burst=1)
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.rounds = 0
+        self.last_report: Optional[Dict] = None
+
+    def start(self) -> 'Warmer':
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='nexa-warmup', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.warm_once()
+            except Exception as e:
+                logger.warning("Precalentamiento falló: %r", e)
+            if not self.refresh_interval or self._stop.wait(self.refresh_interval):
+                break
+
+    def warm_once(self) -> Dict:
+        """
+        Una ronda: busca las consultas populares cuya entrada de cache falta o está a
+        punto de caducar. Devuelve (y guarda en last_report) cuánto del conjunto quedó caliente.
+        'warmed' cuenta solo lo que respondió algún motor de red; lo que solo trajo el índice
+        local va a 'index_served' y no cuenta como caliente (no se refrescó nada).
+        """
+        started = time.time()
+        hot = self.core.query_log.top(self.top_n)
+        report = {'hot_set': len(hot), 'already_warm': 0, 'warmed': 0, 'index_served': 0, 'failed': 0,
+                  'skipped': 0}
+        for i, entry in enumerate(hot):
+            age = self.core.cache.age(entry['key'])
+            if age is not None and age < self.core.cache.ttl * self.refresh_at:
+                report['already_warm'] += 1
+                continue
+            if not self._wait_turn():
+                report['skipped'] += len(hot) - i
+                break
+            try:
+                result = self.core.prefetch(entry['query'], entry['max_results'], fast_mode=self.fast_mode)
+            except Exception as e:
+                logger.debug("Precalentar %r falló: %r", entry['query'], e)
+                report['failed'] += 1
+                continue
+            network = [engine for engine in result['sources_used']
+                       if not self.core.engines.get(engine, {}).get('local')]
+            if network:
+                report['warmed'] += 1
+            else:
+                report['index_served' if result['results'] else 'failed'] += 1
+
+        warm = report['already_warm'] + report['warmed']
+        report['coverage'] = round(warm / len(hot), 4) if hot else 1.0
+        report['elapsed'] = round(time.time() - started, 3)
+        report['finished_at'] = time.time()
+        self.rounds += 1
+        self.last_report = report
+        logger.info("Precalentamiento: %d/%d consultas calientes (%d de la red, %d solo del índice, "
+                    "%d fallidas)", warm, len(hot), report['warmed'], report['index_served'], report['failed'])
+        return report
+
+    def _wait_turn(self) -> bool:
+        """Espera al ritmo propio y a que algún motor de red tenga token; False si se detuvo"""
+        while not self._stop.is_set():
+            if self._bucket.try_acquire():
+                break
+            self._stop.wait(self._bucket.wait_time())
+        engines = [engine for engine, cfg in self.core.engines.items()
+                   if cfg['enabled'] and not cfg.get('local')
+                   and (not self.fast_mode or cfg.get('cost', 0) == 0)]
+        # Se deja pasar primero el tráfico interactivo: sin token libre en ningún motor, esperar
+        while engines and not self._stop.is_set():
+            wait = min(self.core.limiter.wait_time(engine) for engine in engines)
+            if wait <= 0:
+                break
+            self._stop.wait(wait)
+        return not self._stop.is_set()
+
+    def report(self) -> Dict:
+        return {
+            'running': self._thread is not None and self._thread.is_alive(),
+            'rounds': self.rounds,
+            'last': self.last_report
+        }
@@ -6,27 +6,32 @@ def main():
     print("🤖 NEXA Agent Online (Cyberpunk Edition)")
     print("   Comandos: 'busca <termino>' o 'busca rápido <termino>'")
     
-    while True:
-        try:
-            user_input = input("\nYou: ")
-            if user_input.lower() in ['exit', 'quit']:
-                break
+    # close() vuelca a disco el registro de consultas y el índice local (que si no solo se
+    # guardan cada 30 s) y detiene el precalentamiento: hay que llamarlo al salir siempre
+    try:
+        while True:
+            try:
+                user_input = input("\nYou: ")
+                if user_input.lower() in ['exit', 'quit']:
+                    break
             
-            response = agent.process_query(user_input)
+                response = agent.process_query(user_input)
             
-            # Si es resultado de búsqueda, muestra en formato especial
-            if response.get("type") == "search_results":
-                print("\n[NEXA] 🔍 Resultados encontrados:")
-                for i, r in enumerate(response["results"], 1):
-                    print(f"\n{i}. {r['title']}")
-                    print(f"   → {r['url']}")
-                    print(f"   💡 {r['snippet']}")
-                    print(f"   [FUENTE: {r['source']}]")
-            else:
-                print(f"\nNexa: {response.get('content', response)}")
+                # Si es resultado de búsqueda, muestra en formato especial
+                if response.get("type") == "search_results":
+                    print("\n[NEXA] 🔍 Resultados encontrados:")
+                    for i, r in enumerate(response["results"], 1):
+                        print(f"\n{i}. {r['title']}")
+                        print(f"   → {r['url']}")
+                        print(f"   💡 {r['snippet']}")
+                        print(f"   [FUENTE: {r['source'].upper()}]")
+                else:
+                    print(f"\nNexa: {response.get('content', response)}")
                 
-        except KeyboardInterrupt:
-            break
+            except (KeyboardInterrupt, EOFError):
+                break
+    finally:
+        agent.close()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+NEXA SEARCH BATCH
+Búsqueda en lote desde la línea de comandos: lee consultas de un archivo (una por línea,
+'#' para comentarios, '-' = stdin) y escribe un JSON por consulta (JSONL) con el estado,
+el error si lo hubo y los resultados. Usa NexaSearchCore.buscar_many_stream, así que las
+consultas repetidas se buscan una vez y la cache, los rate limits y las cuotas son los de siempre.
+
+Uso (desde python_agent/):
+    python search_batch.py consultas.txt -o resultados.jsonl --concurrency 16
+    python search_batch.py consultas.txt --deadline 600 --fast --ordered > resultados.jsonl
+    cat consultas.txt | python search_batch.py - --parallel --query-deadline 4
+"""
+
+import argparse
+import json
+import sys
+import time
+from typing import Dict, Iterator, List, Optional, TextIO
+
+from core.result import json_default
+from core.search_core import NexaSearchCore
+
+
+def read_queries(stream: TextIO) -> List[str]:
+    """Una consulta por línea; se ignoran las vacías y las que empiezan por '#'"""
+    return [line.strip() for line in stream if line.strip() and not line.lstrip().startswith('#')]
+
+
+def to_line(item: Dict) -> Dict:
+    """Item de buscar_many -> objeto JSONL (los resultados van aplanados, sin el dict completo)"""
+    resultados = item['resultados'] or {}
+    return {
+        'index': item['index'],
+        'query': item['query'],
+        'status': item['status'],
+        'error': item['error'],
+        'results': resultados.get('results', []),
+        'sources_used': resultados.get('sources_used', []),
+        'execution_time': resultados.get('execution_time')
+    }
+
+
+def run_batch(core: NexaSearchCore, queries: List[str], out: TextIO, ordered: bool = False,
+              progress: Optional[TextIO] = sys.stderr, **options) -> Dict:
+    """Escribe un JSON por línea en `out` y devuelve el resumen del lote"""
+    started = time.time()
+    counts = {'ok': 0, 'empty': 0, 'error': 0, 'timeout': 0}
+    items: Iterator[Dict] = (iter(core.buscar_many(queries, **options)) if ordered
+                             else core.buscar_many_stream(queries, **options))
+    for done, item in enumerate(items, 1):
+        counts[item['status']] += 1
+        out.write(json.dumps(to_line(item), ensure_ascii=False, default=json_default) + '\n')
+        if progress is not None and (done % 25 == 0 or done == len(queries)):
+            print(f"  {done}/{len(queries)} consultas ({time.time() - started:.1f}s)", file=progress)
+    out.flush()
+    return {'queries': len(queries), 'distinct': len({core._cache_key(q) for q in queries}),
+            **counts, 'elapsed': round(time.time() - started, 3)}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Búsqueda en lote con NexaSearchCore (salida JSONL)")
+    parser.add_argument('input', help="Archivo con una consulta por línea ('-' = stdin)")
+    parser.add_argument('-o', '--output', help="Archivo JSONL de salida (default: stdout)")
+    parser.add_argument('--concurrency', type=int, default=8, help="Consultas en vuelo a la vez")
+    parser.add_argument('--deadline', type=float, default=None, help="Segundos para todo el lote")
+    parser.add_argument('--max-results', type=int, default=10)
+    parser.add_argument('--fast', action='store_true', help="Solo motores sin key")
+    parser.add_argument('--parallel', action='store_true', help="Motores de cada consulta a la vez")
+    parser.add_argument('--query-deadline', type=float, default=None, help="Segundos por consulta (con --parallel)")
+    parser.add_argument('--ordered', action='store_true', help="Escribir en el orden de entrada (al final)")
+    parser.add_argument('--quiet', action='store_true', help="Sin progreso por stderr")
+    args = parser.parse_args(argv)
+
+    if args.input == '-':
+        queries = read_queries(sys.stdin)
+    else:
+        with open(args.input, encoding='utf-8') as f:
+            queries = read_queries(f)
+    if not queries:
+        print("❌ No hay consultas en la entrada", file=sys.stderr)
+        return 2
+
+    core = NexaSearchCore()
+    out = open(args.output, 'w', encoding='utf-8') if args.output else sys.stdout
+    try:
+        summary = run_batch(core, queries, out, ordered=args.ordered,
+                            progress=None if args.quiet else sys.stderr,
+                            max_results=args.max_results, concurrency=args.concurrency,
+                            deadline=args.deadline, fast_mode=args.fast, parallel=args.parallel,
+                            query_deadline=args.query_deadline)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+        core.close()
+
+    print(f"✅ {summary['ok']} con resultados | {summary['empty']} vacías | {summary['error']} errores | "
+          f"{summary['timeout']} sin terminar | {summary['distinct']} distintas de {summary['queries']} "
+          f"en {summary['elapsed']}s", file=sys.stderr)
+    # Exit 1 si algo falló de verdad (errores o deadline); las vacías no cuentan
+    return 1 if summary['error'] or summary['timeout'] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,622 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+NEXA AGENT SERVER
+Servidor asyncio (solo biblioteca estándar) que expone un único NexaAgent a muchas sesiones
+a la vez: HTTP/1.1 con keep-alive y WebSocket. Las llamadas al agente (bloqueantes: HTTP a
+los motores, SQLite) corren en un pool de hilos, nunca en el event loop; cada sesión tiene
+un límite de peticiones en vuelo y una cola corta, y cada petición un timeout.
+
+Endpoints:
+    POST /query     {"query": "...", "session": "opcional"} -> respuesta del agente (JSON)
+    GET  /stream    Server-sent events: la respuesta según se produce (?query=... o POST con JSON)
+    GET  /ws        WebSocket; cada mensaje es una consulta (texto o {"query", "id", "stream"})
+    GET  /health    Estado del servidor, sesiones y motores
+    GET  /metrics   Métricas del core de búsqueda en formato Prometheus
+
+Uso (desde python_agent/):
+    python server.py --port 8765 --workers 32
+    curl -s localhost:8765/query -d '{"query": "busca rápido python asyncio"}'
+"""
+
+import argparse
+import asyncio
+import base64
+import hashlib
+import json
+import logging
+import os
+import struct
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from core.agent import NexaAgent
+from core.result import json_default
+
+logger = logging.getLogger('nexa.server')
+
+MAX_HEADER_BYTES = 16 * 1024
+MAX_BODY_BYTES = 64 * 1024
+WS_GUID = '258EAFA5-E914-47DA-95CA-C5AB0DC85B11'
+WS_TEXT, WS_BINARY, WS_CLOSE, WS_PING, WS_PONG = 0x1, 0x2, 0x8, 0x9, 0xA
+
+REASONS = {
+    200: 'OK', 101: 'Switching Protocols', 400: 'Bad Request', 404: 'Not Found',
+    405: 'Method Not Allowed', 408: 'Request Timeout', 413: 'Payload Too Large',
+    429: 'Too Many Requests', 431: 'Request Header Fields Too Large', 500: 'Internal Server Error',
+    503: 'Service Unavailable', 504: 'Gateway Timeout'
+}
+
+
+class HttpError(Exception):
+    def __init__(self, status: int, message: str, headers: Optional[Dict[str, str]] = None):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+        self.headers = headers or {}
+
+
+class Request:
+    __slots__ = ('method', 'path', 'params', 'headers', 'body')
+
+    def __init__(self, method: str, target: str, headers: Dict[str, str], body: bytes):
+        parts = urlsplit(target)
+        self.method = method
+        self.path = parts.path
+        self.params = {k: v[-1] for k, v in parse_qs(parts.query).items()}
+        self.headers = headers
+        self.body = body
+
+    @property
+    def keep_alive(self) -> bool:
+        return self.headers.get('connection', '').lower() != 'close'
+
+    def json(self) -> Dict:
+        try:
+            data = json.loads(self.body or b'{}')
+        except ValueError:
+            raise HttpError(400, "JSON inválido")
+        if not isinstance(data, dict):
+            raise HttpError(400, "Se esperaba un objeto JSON")
+        return data
+
+
+class Session:
+    """Estado por sesión: peticiones en vuelo (ejecutándose o en cola) y último uso"""
+    __slots__ = ('id', 'slots', 'inflight', 'last_seen', 'served')
+
+    def __init__(self, session_id: str, per_session: int):
+        self.id = session_id
+        self.slots = asyncio.Semaphore(per_session)
+        self.inflight = 0
+        self.last_seen = time.monotonic()
+        self.served = 0
+
+
+# ────────────────────────────────────────────────────────────────────
+# 🔌 PROTOCOLO (HTTP/1.1 + WebSocket)
+# ────────────────────────────────────────────────────────────────────
+
+async def read_request(reader: asyncio.StreamReader, timeout: float) -> Optional[Request]:
+    """Lee una petición; None si el cliente cerró (o no mandó nada en `timeout` segundos)"""
+    try:
+        head = await asyncio.wait_for(reader.readuntil(b'\r\n\r\n'), timeout)
+    except (asyncio.IncompleteReadError, asyncio.TimeoutError, ConnectionError):
+        return None
+    except asyncio.LimitOverrunError:
+        raise HttpError(431, "Cabeceras demasiado grandes")
+
+    lines = head.decode('latin-1').split('\r\n')
+    try:
+        method, target, _ = lines[0].split(' ', 2)
+    except ValueError:
+        raise HttpError(400, "Línea de petición inválida")
+    headers = {}
+    for line in lines[1:]:
+        if ':' in line:
+            name, value = line.split(':', 1)
+            headers[name.strip().lower()] = value.strip()
+
+    try:
+        length = int(headers.get('content-length') or 0)
+    except ValueError:
+        raise HttpError(400, "Content-Length inválido")
+    if length > MAX_BODY_BYTES:
+        raise HttpError(413, f"Cuerpo de más de {MAX_BODY_BYTES} bytes")
+    try:
+        body = await asyncio.wait_for(reader.readexactly(length), timeout) if length else b''
+    except (asyncio.IncompleteReadError, asyncio.TimeoutError):
+        raise HttpError(408, "Cuerpo incompleto")
+    return Request(method.upper(), target, headers, body)
+
+
+def http_response(status: int, body: bytes, content_type: str = 'application/json; charset=utf-8',
+                  headers: Optional[Dict[str, str]] = None, keep_alive: bool = True) -> bytes:
+    lines = [f"HTTP/1.1 {status} {REASONS.get(status, '')}",
+             f"Content-Type: {content_type}",
+             f"Content-Length: {len(body)}",
+             f"Connection: {'keep-alive' if keep_alive else 'close'}"]
+    lines.extend(f"{name}: {value}" for name, value in (headers or {}).items())
+    return ('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1') + body
+
+
+def json_body(payload) -> bytes:
+    return json.dumps(payload, ensure_ascii=False, default=json_default).encode('utf-8')
+
+
+def sse_event(event: Dict) -> bytes:
+    return f"event: {event.get('type', 'message')}\ndata: ".encode('utf-8') + json_body(event) + b'\n\n'
+
+
+def ws_accept(key: str) -> str:
+    return base64.b64encode(hashlib.sha1((key + WS_GUID).encode('ascii')).digest()).decode('ascii')
+
+
+def ws_frame(opcode: int, payload: bytes = b'') -> bytes:
+    """Frame del servidor (sin máscara, siempre completo)"""
+    n = len(payload)
+    if n < 126:
+        header = struct.pack('!BB', 0x80 | opcode, n)
+    elif n < 1 << 16:
+        header = struct.pack('!BBH', 0x80 | opcode, 126, n)
+    else:
+        header = struct.pack('!BBQ', 0x80 | opcode, 127, n)
+    return header + payload
+
+
+async def ws_read(reader: asyncio.StreamReader, max_size: int) -> Tuple[int, bytes]:
+    """Siguiente mensaje (junta fragmentos); los frames de control se devuelven aparte"""
+    opcode, message = None, b''
+    while True:
+        first, second = await reader.readexactly(2)
+        fin, frame_op = first & 0x80, first & 0x0F
+        masked, length = second & 0x80, second & 0x7F
+        if length == 126:
+            length = struct.unpack('!H', await reader.readexactly(2))[0]
+        elif length == 127:
+            length = struct.unpack('!Q', await reader.readexactly(8))[0]
+        if length + len(message) > max_size:
+            raise HttpError(413, "Mensaje WebSocket demasiado grande")
+        mask = await reader.readexactly(4) if masked else None
+        payload = await reader.readexactly(length)
+        if mask:
+            payload = bytes(b ^ mask[i % 4] for i, b in enumerate(payload))
+        if frame_op >= WS_CLOSE:
+            return frame_op, payload  # Control: puede llegar entre fragmentos
+        if frame_op:
+            opcode = frame_op
+        message += payload
+        if fin:
+            return opcode or WS_TEXT, message
+
+
+# ────────────────────────────────────────────────────────────────────
+# 🌐 SERVIDOR
+# ────────────────────────────────────────────────────────────────────
+
+class NexaServer:
+    def __init__(self, agent: Optional[NexaAgent] = None, host: str = '127.0.0.1', port: int = 8765,
+                 workers: int = 32, request_timeout: float = 30, per_session: int = 2,
+                 session_queue: int = 8, max_pending: int = 1024, idle_timeout: float = 60,
+                 session_ttl: float = 900, max_orphaned: Optional[int] = None):
+        """
+        Args:
+            agent: Agente compartido por todas las sesiones (default: uno nuevo)
+            host, port: Dónde escuchar (port=0 = uno libre; ver .port tras start())
+            workers: Hilos para las llamadas bloqueantes al agente
+            request_timeout: Segundos máximos por consulta (504 / error en el WebSocket)
+            per_session: Consultas de una sesión ejecutándose a la vez
+            session_queue: Consultas de una sesión esperando turno; más allá, 429
+            max_pending: Consultas en vuelo en todo el servidor; más allá, 503
+            idle_timeout: Segundos que una conexión keep-alive puede estar callada
+            session_ttl: Segundos sin actividad tras los que se olvida una sesión
+            max_orphaned: Hilos del pool que siguen ocupados con consultas cuya petición ya
+                venció (o cuyo cliente se fue); más allá, 503 porque lo nuevo solo haría
+                cola detrás de ellos (default: workers)
+        """
+        self.agent = agent or NexaAgent()
+        self.host = host
+        self.port = port
+        self.request_timeout = request_timeout
+        self.per_session = per_session
+        self.session_queue = session_queue
+        self.max_pending = max_pending
+        self.idle_timeout = idle_timeout
+        self.session_ttl = session_ttl
+        self.max_ws_message = MAX_BODY_BYTES
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='nexa-agent')
+        self.workers = workers
+        self.max_orphaned = max_orphaned or workers
+        self._sessions: Dict[str, Session] = {}
+        self._pending = 0
+        # Trabajos cuya petición ya terminó pero cuyo hilo sigue (un timeout no para el hilo)
+        self._orphaned = 0
+        self._orphaned_lock = threading.Lock()
+        self._connections = 0
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._janitor: Optional[asyncio.Task] = None
+        self._started = time.monotonic()
+        self.counters = {'served': 0, 'errors': 0, 'timeouts': 0, 'rejected_session': 0, 'rejected_server': 0}
+
+    async def start(self) -> 'NexaServer':
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self.port,
+                                                  limit=MAX_HEADER_BYTES)
+        self.port = self._server.sockets[0].getsockname()[1]
+        self._janitor = asyncio.create_task(self._expire_sessions())
+        self._started = time.monotonic()
+        logger.info("NEXA server escuchando en http://%s:%d", self.host, self.port)
+        return self
+
+    async def serve_forever(self):
+        if self._server is None:
+            await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self):
+        if self._janitor is not None:
+            self._janitor.cancel()
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        await asyncio.get_running_loop().run_in_executor(None, self.agent.close)
+
+    # ────────────────────────────────────────────────────────────────────
+    # 📨 CONEXIONES
+    # ────────────────────────────────────────────────────────────────────
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self._connections += 1
+        try:
+            while True:
+                keep_alive = False
+                try:
+                    request = await read_request(reader, self.idle_timeout)
+                    if request is None:
+                        break
+                    keep_alive = request.keep_alive
+                    if request.path == '/ws' and request.headers.get('upgrade', '').lower() == 'websocket':
+                        await self._handle_websocket(request, reader, writer)
+                        break
+                    if request.path == '/stream':
+                        await self._handle_sse(request, writer)
+                        break
+                    status, body, content_type, headers = await self._route(request)
+                except HttpError as e:
+                    status, body, content_type, headers = e.status, json_body({'error': e.message}), \
+                        'application/json; charset=utf-8', e.headers
+                    keep_alive = keep_alive and e.status < 500 and e.status not in (408, 413, 431)
+                writer.write(http_response(status, body, content_type, headers, keep_alive))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except Exception:
+            logger.exception("Error en la conexión")
+        finally:
+            self._connections -= 1
+            writer.close()
+
+    async def _route(self, request: Request) -> Tuple[int, bytes, str, Dict[str, str]]:
+        if request.path == '/query':
+            if request.method != 'POST':
+                raise HttpError(405, "Usa POST", {'Allow': 'POST'})
+            session, query = self._query_request(request, request.json())
+            response = await self.ask(session, query)
+            return 200, json_body(response), 'application/json; charset=utf-8', {'X-Session-Id': session.id}
+        if request.path == '/health':
+            return 200, json_body(self.health()), 'application/json; charset=utf-8', {}
+        if request.path == '/metrics':
+            text = await asyncio.get_running_loop().run_in_executor(self._executor, self.agent.search.export_prometheus)
+            return 200, text.encode('utf-8'), 'text/plain; version=0.0.4; charset=utf-8', {}
+        raise HttpError(404, f"No existe {request.path}")
+
+    def _query_request(self, request: Request, data: Dict) -> Tuple[Session, str]:
+        query = str(data.get('query', '')).strip()
+        if not query:
+            raise HttpError(400, "Falta 'query'")
+        session_id = data.get('session') or request.headers.get('x-session-id')
+        # Sin id: sesión de un solo uso (no se guarda); el cliente puede reutilizar la que se le devuelve
+        session = self._session(str(session_id)) if session_id else Session(uuid.uuid4().hex, self.per_session)
+        return session, query
+
+    async def _handle_sse(self, request: Request, writer: asyncio.StreamWriter):
+        """
+        Server-sent events: GET /stream?query=...&session=... (EventSource) o POST /stream con
+        JSON. Cada evento del agente va como 'event: <type>' + 'data: <json>'; el último es 'done'.
+        """
+        if request.method not in ('GET', 'POST'):
+            raise HttpError(405, "Usa GET o POST", {'Allow': 'GET, POST'})
+        session, query = self._query_request(request, request.json() if request.method == 'POST' else request.params)
+        events = self.stream(session, query)
+        try:
+            first = await events.__anext__()  # Admisión: un 429/503 sale como respuesta HTTP normal
+            writer.write((f"HTTP/1.1 200 OK\r\nContent-Type: text/event-stream; charset=utf-8\r\n"
+                          f"Cache-Control: no-cache\r\nConnection: close\r\nX-Accel-Buffering: no\r\n"
+                          f"X-Session-Id: {session.id}\r\n\r\n").encode('latin-1') + sse_event(first))
+            await writer.drain()
+            async for event in events:
+                writer.write(sse_event(event))
+                await writer.drain()  # Cliente lento: el hilo productor sigue, pero no se acumula en el socket
+        finally:
+            await events.aclose()
+
+    async def _handle_websocket(self, request: Request, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        key = request.headers.get('sec-websocket-key')
+        if not key:
+            raise HttpError(400, "Falta Sec-WebSocket-Key")
+        writer.write((f"HTTP/1.1 101 {REASONS[101]}\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+                      f"Sec-WebSocket-Accept: {ws_accept(key)}\r\n\r\n").encode('latin-1'))
+        await writer.drain()
+
+        session = self._session(request.params.get('session') or uuid.uuid4().hex)
+        write_lock = asyncio.Lock()
+        tasks = set()
+
+        async def send(opcode: int, payload: bytes):
+            async with write_lock:
+                writer.write(ws_frame(opcode, payload))
+                await writer.drain()
+
+        async def answer(message_id, query: str, streaming: bool):
+            try:
+                if streaming:
+                    async for event in self.stream(session, query, admit=False):
+                        await send(WS_TEXT, json_body({'id': message_id, **event}))
+                    return
+                response = await self.ask(session, query, admit=False)
+                payload = {'id': message_id, **response}
+            except HttpError as e:
+                payload = {'id': message_id, 'type': 'error', 'status': e.status, 'error': e.message}
+            await send(WS_TEXT, json_body(payload))
+
+        await send(WS_TEXT, json_body({'type': 'session', 'session': session.id}))
+        try:
+            while True:
+                # Backpressure: con per_session consultas en vuelo no se lee más del socket,
+                # así el cliente rápido se frena en su propio buffer TCP
+                await session.slots.acquire()
+                session.slots.release()
+                opcode, payload = await ws_read(reader, self.max_ws_message)
+                if opcode == WS_CLOSE:
+                    await send(WS_CLOSE, payload[:2])
+                    break
+                if opcode == WS_PING:
+                    await send(WS_PONG, payload)
+                    continue
+                if opcode != WS_TEXT:
+                    continue
+                message_id, query, streaming = self._parse_ws_message(payload)
+                if not query:
+                    await send(WS_TEXT, json_body({'id': message_id, 'type': 'error', 'status': 400,
+                                                   'error': "Falta 'query'"}))
+                    continue
+                task = asyncio.create_task(answer(message_id, query, streaming))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+                await asyncio.sleep(0)  # Deja que la tarea tome su turno antes de leer el siguiente
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        except HttpError as e:
+            await send(WS_CLOSE, struct.pack('!H', 1009) + e.message.encode('utf-8')[:100])
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    @staticmethod
+    def _parse_ws_message(payload: bytes) -> Tuple[Optional[str], str, bool]:
+        text = payload.decode('utf-8', errors='replace').strip()
+        if text.startswith('{'):
+            try:
+                data = json.loads(text)
+                return data.get('id'), str(data.get('query', '')).strip(), bool(data.get('stream'))
+            except ValueError:
+                pass
+        return None, text, False
+
+    # ────────────────────────────────────────────────────────────────────
+    # 🤖 LLAMADAS AL AGENTE
+    # ────────────────────────────────────────────────────────────────────
+
+    async def ask(self, session: Session, query: str, admit: bool = True) -> Dict:
+        """
+        Ejecuta agent.process_query en el pool de hilos con admisión y timeout:
+        429 si la sesión ya tiene per_session + session_queue consultas, 503 si el servidor
+        está lleno o el pool atascado con hilos huérfanos, 504 si el agente no respondió a
+        tiempo (la espera por turno en la sesión cuenta). admit=False omite el límite de la
+        sesión (el WebSocket ya frena la lectura del socket).
+        """
+        self._admit(session, admit)
+        job: List[Future] = []
+        try:
+            # El hilo no se puede interrumpir: al vencer el timeout se responde 504 y el
+            # hilo termina por su cuenta (cuenta como huérfano hasta entonces)
+            response = await asyncio.wait_for(self._ask_in_slot(session, query, job), self.request_timeout)
+            self.counters['served'] += 1
+            session.served += 1
+            return response
+        except asyncio.TimeoutError:
+            self.counters['timeouts'] += 1
+            raise HttpError(504, f"El agente no respondió en {self.request_timeout}s")
+        except HttpError:
+            raise
+        except Exception as e:
+            self.counters['errors'] += 1
+            logger.exception("process_query falló")
+            raise HttpError(500, f"Error del agente: {e!r}")
+        finally:
+            if job:
+                self._orphan(job[0])
+            self._release(session)
+
+    async def _ask_in_slot(self, session: Session, query: str, job: List[Future]) -> Dict:
+        async with session.slots:
+            job.append(self._executor.submit(self.agent.process_query, query))
+            return await asyncio.wrap_future(job[0])
+
+    async def stream(self, session: Session, query: str, admit: bool = True) -> AsyncIterator[Dict]:
+        """
+        Eventos de agent.process_query_stream según se producen. El generador del agente
+        corre en un hilo del pool y entrega cada evento al loop. La admisión es la de ask()
+        y falla en el primer evento, antes de enviar nada al cliente; si vence request_timeout
+        se produce {'type': 'error', 'status': 504} y el stream termina.
+        """
+        self._admit(session, admit)
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+        stop = threading.Event()
+        limit = loop.time() + self.request_timeout
+        acquired = False
+        job: Optional[Future] = None
+        try:
+            try:
+                # La espera por turno en la sesión también cuenta para el timeout
+                await asyncio.wait_for(session.slots.acquire(), self.request_timeout)
+                acquired = True
+                job = self._executor.submit(self._produce, query, loop, queue, stop)
+                while True:
+                    event = await asyncio.wait_for(queue.get(), limit - loop.time())
+                    if event is None:
+                        break
+                    if event['type'] == 'error':
+                        self.counters['errors'] += 1
+                    yield event
+            except asyncio.TimeoutError:
+                self.counters['timeouts'] += 1
+                yield {'type': 'error', 'status': 504,
+                       'error': f"El agente no terminó en {self.request_timeout}s"}
+                return
+            self.counters['served'] += 1
+            session.served += 1
+        finally:
+            if acquired:
+                session.slots.release()
+            stop.set()  # El cliente se fue o venció el timeout: el hilo deja de producir
+            if job is not None:
+                self._orphan(job)
+            self._release(session)
+
+    def _produce(self, query: str, loop: asyncio.AbstractEventLoop, queue: asyncio.Queue, stop: threading.Event):
+        """(En un hilo del pool) recorre el stream del agente y pasa cada evento al loop; None = fin"""
+        def put(item):
+            try:
+                loop.call_soon_threadsafe(queue.put_nowait, item)
+            except RuntimeError:
+                stop.set()  # Loop cerrado
+
+        events = self.agent.process_query_stream(query)
+        try:
+            for event in events:
+                if stop.is_set():
+                    break
+                put(event)
+        except Exception as e:
+            logger.exception("process_query_stream falló")
+            put({'type': 'error', 'status': 500, 'error': f"Error del agente: {e!r}"})
+        finally:
+            events.close()  # Cancela los motores que aún no respondieron
+            put(None)
+
+    def _admit(self, session: Session, admit: bool):
+        if admit and session.inflight >= self.per_session + self.session_queue:
+            self.counters['rejected_session'] += 1
+            raise HttpError(429, "Demasiadas consultas en curso para esta sesión", {'Retry-After': '1'})
+        if self._pending >= self.max_pending or self._orphaned >= self.max_orphaned:
+            self.counters['rejected_server'] += 1
+            raise HttpError(503, "Servidor saturado", {'Retry-After': '2'})
+        session.inflight += 1
+        self._pending += 1
+        session.last_seen = time.monotonic()
+
+    def _orphan(self, future: Future):
+        """
+        La petición terminó (respuesta, timeout o cliente ido): si su hilo sigue corriendo
+        cuenta como huérfano hasta que acabe. Un trabajo aún en cola se cancela sin más
+        """
+        if future.cancel() or future.done():
+            return
+        with self._orphaned_lock:
+            self._orphaned += 1
+        future.add_done_callback(self._orphan_done)
+
+    def _orphan_done(self, future: Future):
+        with self._orphaned_lock:
+            self._orphaned -= 1
+
+    def _release(self, session: Session):
+        session.inflight -= 1
+        self._pending -= 1
+        session.last_seen = time.monotonic()
+
+    def _session(self, session_id: str) -> Session:
+        session = self._sessions.get(session_id)
+        if session is None:
+            session = self._sessions[session_id] = Session(session_id, self.per_session)
+        return session
+
+    async def _expire_sessions(self):
+        while True:
+            await asyncio.sleep(min(60, self.session_ttl))
+            cutoff = time.monotonic() - self.session_ttl
+            for session_id, session in list(self._sessions.items()):
+                if not session.inflight and session.last_seen < cutoff:
+                    del self._sessions[session_id]
+
+    def health(self) -> Dict:
+        engines = self.agent.search.health.snapshot()
+        enabled = [name for name, cfg in self.agent.search.engines.items() if cfg['enabled']]
+        available = [name for name in enabled if engines.get(name, {}).get('state') != 'open']
+        return {
+            'status': 'ok' if available else 'degraded',
+            'uptime': round(time.monotonic() - self._started, 1),
+            'connections': self._connections,
+            'sessions': len(self._sessions),
+            'pending': self._pending,
+            'orphaned': self._orphaned,
+            'workers': self.workers,
+            **self.counters,
+            'engines': {name: engines.get(name, {}).get('state', 'unknown') for name in enabled}
+        }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Servidor HTTP/WebSocket de NexaAgent")
+    parser.add_argument('--host', default=os.getenv('NEXA_SERVER_HOST', '127.0.0.1'))
+    parser.add_argument('--port', type=int, default=int(os.getenv('NEXA_SERVER_PORT', '8765')))
+    parser.add_argument('--workers', type=int, default=32, help="Hilos para las llamadas al agente")
+    parser.add_argument('--timeout', type=float, default=30, help="Segundos máximos por consulta")
+    parser.add_argument('--per-session', type=int, default=2, help="Consultas a la vez por sesión")
+    parser.add_argument('--session-queue', type=int, default=8, help="Consultas en cola por sesión")
+    parser.add_argument('--max-pending', type=int, default=1024, help="Consultas en vuelo en total")
+    parser.add_argument('--max-orphaned', type=int, default=None,
+                        help="Hilos ocupados por consultas ya vencidas antes de rechazar (default: workers)")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(name)s: %(message)s')
+
+    async def run():
+        server = NexaServer(host=args.host, port=args.port, workers=args.workers, request_timeout=args.timeout,
+                            per_session=args.per_session, session_queue=args.session_queue,
+                            max_pending=args.max_pending, max_orphaned=args.max_orphaned)
+        await server.start()
+        print(f"🤖 NEXA Agent Server en http://{args.host}:{server.port} (WebSocket: /ws, salud: /health)")
+        try:
+            await server.serve_forever()
+        finally:
+            await server.close()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
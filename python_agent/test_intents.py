@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Casos del router de intents con la configuración de NexaAgent.
+
+Uso (desde python_agent/):
+    python -m unittest test_intents
+"""
+
+import unittest
+
+from core.intents import IntentRouter
+from core.normalize import ACTION_WORDS, FILLER_PHRASES, MODIFIER_WORDS
+
+
+def agent_router() -> IntentRouter:
+    router = IntentRouter(fillers=FILLER_PHRASES)
+    router.add('search', sorted(ACTION_WORDS), lambda match: match.payload)
+    router.flag('fast', MODIFIER_WORDS)
+    return router
+
+
+# (consulta, intent esperado o None, payload, flags)
+CASES = [
+    ("busca gatos", 'search', "gatos", set()),
+    ("Búscame rápido sobre gatos", 'search', "gatos", {'fast'}),
+    ("encuentra por favor la receta de paella", 'search', "la receta de paella", set()),
+    ("busca acerca de los volcanes", 'search', "los volcanes", set()),
+    ("busca el libro Rápido y furioso", 'search', "el libro Rápido y furioso", set()),
+    ("busca por qué el cielo es azul", 'search', "por qué el cielo es azul", set()),
+    ("busca de Gaulle", 'search', "de Gaulle", set()),
+    ("qué tal, busca rápidamente vuelos a Lima", 'search', "qué tal, vuelos a Lima", {'fast'}),
+    ("se reencuentra con su padre", None, None, set()),
+    ("hola, ¿qué tal?", None, None, set()),
+]
+
+
+class IntentRouterTest(unittest.TestCase):
+    def test_agent_cases(self):
+        router = agent_router()
+        for query, intent, payload, flags in CASES:
+            with self.subTest(query=query):
+                match = router.match(query)
+                if intent is None:
+                    self.assertIsNone(match)
+                    continue
+                self.assertEqual(match.name, intent)
+                self.assertEqual(match.payload, payload)
+                self.assertEqual(set(match.flags), flags)
+
+    def test_priority_and_phrases(self):
+        router = agent_router()
+        router.add('hora', ['qué hora es'], lambda match: 'hora', priority=5)
+        match = router.match("busca qué hora es en Tokio")
+        self.assertEqual((match.name, match.payload, match.trigger), ('hora', "en Tokio", "qué hora es"))
+        # A igual prioridad gana el primero en aparecer
+        router.add('clima', ['clima'], lambda match: 'clima')
+        self.assertEqual(router.match("clima y busca noticias").name, 'clima')
+
+    def test_dispatch_default(self):
+        router = agent_router()
+        self.assertEqual(router.dispatch("busca gatos", lambda query: None), "gatos")
+        self.assertEqual(router.dispatch("hola", lambda query: ('default', query)), ('default', "hola"))
+
+
+if __name__ == "__main__":
+    unittest.main()
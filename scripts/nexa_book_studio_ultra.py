@@ -13,22 +13,27 @@ import sys
 import json
 import time
 import random
-import re
 import base64
 import textwrap
+import threading
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from datetime import datetime
 from typing import List, Dict, Optional
 from io import BytesIO
+from urllib.parse import urlsplit
 
 # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 # ⚙️ DEPENDENCIAS AUTOMÁTICAS (instala si no existen)
 # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 try:
     import requests
+    import requests.adapters
 except ImportError:
     print("📦 Instalando dependencias básicas...")
     os.system(f"{sys.executable} -m pip install requests -q")
     import requests
+    import requests.adapters
 
 try:
     from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Image as RLImage
@@ -80,9 +85,24 @@ PORTADA_ASCII = r"""
 # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 # 🔍 NEXA SEARCH CORE (5 motores - 2 sin key, 3 con key opcional)
 # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+# Dentro del repo se reutiliza el core de python_agent (motores en paralelo, cache en disco,
+# health y rate limits compartidos con el agente). Si este archivo se copió suelto, se usan
+# los motores propios de abajo, también en paralelo y con deadline.
+_PYTHON_AGENT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'python_agent')
+try:
+    if os.path.isdir(os.path.join(_PYTHON_AGENT, 'core')) and _PYTHON_AGENT not in sys.path:
+        sys.path.insert(0, _PYTHON_AGENT)
+    from core.search_core import NexaSearchCore as SharedSearchCore
+except ImportError:
+    SharedSearchCore = None
+
 class NexaSearchCore:
-    def __init__(self):
+    # Presupuesto total por búsqueda (segundos): lo que no llegue a tiempo se ignora
+    DEADLINES = {'rapido': 4.0, 'profundo': 6.0}
+    
+    def __init__(self, cache_ttl: float = 600, cache_size: int = 200, usar_core_compartido: bool = True):
         self.session = requests.Session()
+        self.session.mount('https://', requests.adapters.HTTPAdapter(pool_connections=8, pool_maxsize=8))
         self.session.headers.update({'User-Agent': 'NEXA-BOOK/3.0 (Cyberpunk Edition)'})
         self.engines = {
             'duckduckgo': {'url': 'https://api.duckduckgo.com', 'enabled': True, 'key': None},
@@ -98,6 +118,13 @@ class NexaSearchCore:
             'google_cse': {'url': 'https://www.googleapis.com/customsearch/v1', 'enabled': False, 'key': None, 'cx': None}
         }
         self.stats = {e: 0 for e in self.engines}
+        self.shared = SharedSearchCore() if usar_core_compartido and SharedSearchCore else None
+        self._pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix='nexa-book-search')
+        # (consulta, modo, max_results) -> (timestamp, resultados); el diálogo repite mucho la misma búsqueda
+        self._cache: 'OrderedDict[tuple, tuple]' = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self.cache_ttl = cache_ttl
+        self.cache_size = cache_size
     
     def set_key(self, engine: str, key: str, cx: Optional[str] = None):
         if engine in self.engines:
@@ -105,93 +132,149 @@ class NexaSearchCore:
             self.engines[engine]['enabled'] = True
             if cx and 'cx' in self.engines[engine]:
                 self.engines[engine]['cx'] = cx
+            if self.shared:
+                self.shared.set_key(engine, key, cx)
+            self.limpiar_cache()  # Con un motor nuevo los resultados guardados ya no son los mejores
     
     def buscar(self, query: str, modo: str = "rapido", max_results: int = 10) -> List[Dict]:
         """modo: 'rapido' (DDG) | 'profundo' (DDG + SearXNG + Brave si disponible)"""
-        resultados = []
-        query_academica = f"{query} site:.edu OR site:.gov OR author: OR 'journal of'"
+        clave = (' '.join(query.lower().split()), modo, max_results)
+        with self._cache_lock:
+            guardado = self._cache.get(clave)
+            if guardado and time.time() - guardado[0] < self.cache_ttl:
+                self._cache.move_to_end(clave)
+                return list(guardado[1])
         
-        # Motor 1: DuckDuckGo (siempre activo)
-        try:
-            params = {'q': query_academica if modo == "profundo" else query, 'format': 'json', 'no_html': 1}
-            r = self.session.get(self.engines['duckduckgo']['url'], params=params, timeout=3)
-            data = r.json()
-            
-            if data.get('AbstractURL'):
-                resultados.append({
-                    'title': data.get('Heading', query),
-                    'url': data['AbstractURL'],
-                    'source': 'duckduckgo',
-                    'snippet': data.get('AbstractText', '')[:280]
-                })
-            
-            for item in data.get('RelatedTopics', [])[:max_results]:
-                if isinstance(item, dict) and 'FirstURL' in item:
-                    resultados.append({
-                        'title': item.get('Text', query),
-                        'url': item['FirstURL'],
-                        'source': 'duckduckgo',
-                        'snippet': item.get('Text', '')[:280]
-                    })
-            self.stats['duckduckgo'] += 1
-        except: pass
+        query_academica = f"{query} site:.edu OR site:.gov OR author: OR 'journal of'"
+        consulta = query_academica if modo == "profundo" else query
+        deadline = self.DEADLINES.get(modo, self.DEADLINES['rapido'])
+        if self.shared and modo == "profundo":
+            # Se piden de más: el filtro por dominio de abajo descarta varios. La consulta
+            # académica llega tal cual a los motores (el OR depende del orden de los términos)
+            data = self.shared.buscar(consulta, max_results=max_results * 2, fast_mode=False,
+                                      parallel=True, deadline=deadline)
+            resultados = data['results']
+            for engine in data.get('sources_used', []):
+                self.stats[engine] = self.stats.get(engine, 0) + 1
+        else:
+            # 'rapido' se queda en DuckDuckGo solo (fast_mode del core compartido sumaría SearXNG)
+            resultados = self._buscar_paralelo(consulta, modo, max_results, deadline)
         
-        # Motor 2: SearXNG (modo profundo)
+        unicos = self._un_resultado_por_dominio(resultados)[:max_results]
+        with self._cache_lock:
+            self._cache[clave] = (time.time(), unicos)
+            self._cache.move_to_end(clave)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return list(unicos)
+    
+    def _buscar_paralelo(self, consulta: str, modo: str, max_results: int, deadline: float) -> List[Dict]:
+        """
+        Motores propios a la vez; se devuelven en orden de prioridad, no de llegada.
+        Las instancias de SearXNG corren como tareas hermanas en el mismo pool (gana la primera
+        con resultados): ninguna tarea del pool se queda bloqueada esperando a otras
+        """
+        limite_tiempo = time.time() + deadline
+        tareas = [('duckduckgo', self._pool.submit(self._duckduckgo, consulta, max_results))]
+        espejos = []
         if modo == "profundo" and self.engines['searxng']['enabled']:
-            for instance in random.sample(self.engines['searxng']['instances'], min(3, len(self.engines['searxng']['instances']))):
-                try:
-                    url = f"{instance.rstrip('/')}/search"
-                    params = {
-                        'q': query_academica,
-                        'format': 'json',
-                        'language': 'es',
-                        'safesearch': 0
-                    }
-                    r = self.session.get(url, params=params, timeout=5)
-                    data = r.json()
-                    for item in data.get('results', [])[:3]:
-                        resultados.append({
-                            'title': item.get('title', 'Sin título'),
-                            'url': item.get('url', ''),
-                            'source': 'searxng',
-                            'snippet': item.get('content', '')[:280]
-                        })
-                    self.stats['searxng'] += 1
-                    break  # Salir al primer éxito
-                except: continue
-        
-        # Motor 3: Brave (si tiene key)
+            instancias = self.engines['searxng']['instances']
+            espejos = [self._pool.submit(self._searxng_instancia, instance, consulta, 3)
+                       for instance in random.sample(instancias, min(3, len(instancias)))]
         if modo == "profundo" and self.engines['brave']['enabled'] and self.engines['brave']['key']:
-            try:
-                headers = {'X-Subscription-Token': self.engines['brave']['key'], 'Accept': 'application/json'}
-                params = {'q': query_academica, 'count': 5, 'search_lang': 'es'}
-                r = self.session.get(self.engines['brave']['url'], headers=headers, params=params, timeout=4)
-                data = r.json()
-                for item in data.get('web', {}).get('results', [])[:3]:
-                    resultados.append({
-                        'title': item.get('title', 'Sin título'),
-                        'url': item.get('url', ''),
-                        'source': 'brave',
-                        'snippet': item.get('description', '')[:280]
-                    })
-                self.stats['brave'] += 1
-            except: pass
+            tareas.append(('brave', self._pool.submit(self._brave, consulta, 3)))
+        
+        searxng = []
+        pendientes = {f for _, f in tareas} | set(espejos)
+        while pendientes:
+            restante = limite_tiempo - time.time()
+            if restante <= 0:
+                break
+            hechos, pendientes = wait(pendientes, timeout=restante, return_when=FIRST_COMPLETED)
+            for future in hechos:
+                if future in espejos and not searxng and not future.exception() and future.result():
+                    searxng = future.result()
+                    pendientes -= set(espejos)  # Ya hay ganadora: las demás instancias sobran
+        for future in pendientes | set(espejos):
+            future.cancel()
         
-        # Eliminar duplicados por dominio
+        porciones = {'searxng': searxng} if searxng else {}
+        for engine, future in tareas:
+            if future.done() and not future.cancelled() and not future.exception():
+                porciones[engine] = future.result()
+        resultados = []
+        for engine in ('duckduckgo', 'searxng', 'brave'):
+            if engine in porciones:
+                resultados.extend(porciones[engine])
+                self.stats[engine] += 1
+        return resultados
+    
+    def _duckduckgo(self, consulta: str, limite: int) -> List[Dict]:
+        params = {'q': consulta, 'format': 'json', 'no_html': 1}
+        data = self.session.get(self.engines['duckduckgo']['url'], params=params, timeout=3).json()
+        resultados = []
+        if data.get('AbstractURL'):
+            resultados.append({
+                'title': data.get('Heading', consulta),
+                'url': data['AbstractURL'],
+                'source': 'duckduckgo',
+                'snippet': data.get('AbstractText', '')[:280]
+            })
+        for item in data.get('RelatedTopics', [])[:limite]:
+            if isinstance(item, dict) and 'FirstURL' in item:
+                resultados.append({
+                    'title': item.get('Text', consulta),
+                    'url': item['FirstURL'],
+                    'source': 'duckduckgo',
+                    'snippet': item.get('Text', '')[:280]
+                })
+        return resultados
+    
+    def _searxng_instancia(self, instance: str, consulta: str, limite: int) -> List[Dict]:
+        params = {'q': consulta, 'format': 'json', 'language': 'es', 'safesearch': 0}
+        data = self.session.get(f"{instance.rstrip('/')}/search", params=params, timeout=5).json()
+        return [{
+            'title': item.get('title', 'Sin título'),
+            'url': item.get('url', ''),
+            'source': 'searxng',
+            'snippet': item.get('content', '')[:280]
+        } for item in data.get('results', [])[:limite]]
+    
+    def _brave(self, consulta: str, limite: int) -> List[Dict]:
+        headers = {'X-Subscription-Token': self.engines['brave']['key'], 'Accept': 'application/json'}
+        params = {'q': consulta, 'count': 5, 'search_lang': 'es'}
+        data = self.session.get(self.engines['brave']['url'], headers=headers, params=params, timeout=4).json()
+        return [{
+            'title': item.get('title', 'Sin título'),
+            'url': item.get('url', ''),
+            'source': 'brave',
+            'snippet': item.get('description', '')[:280]
+        } for item in data.get('web', {}).get('results', [])[:limite]]
+    
+    @staticmethod
+    def _un_resultado_por_dominio(resultados: List[Dict]) -> List[Dict]:
         seen_domains = set()
         unicos = []
         for r in resultados:
-            try:
-                domain = re.search(r'https?://([^/]+)', r['url']).group(1).replace('www.', '')
-                if domain not in seen_domains:
-                    seen_domains.add(domain)
-                    unicos.append(r)
-            except: continue
-        
-        return unicos[:max_results]
+            domain = urlsplit(r['url']).netloc.lower()
+            domain = domain[4:] if domain.startswith('www.') else domain
+            if domain and domain not in seen_domains:
+                seen_domains.add(domain)
+                unicos.append(r)
+        return unicos
+    
+    def limpiar_cache(self):
+        with self._cache_lock:
+            self._cache.clear()
     
     def get_stats(self) -> Dict:
         return self.stats
+    
+    def close(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
+        if self.shared:
+            self.shared.close()
+        self.session.close()
 
 # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 # 🎨 GENERADOR DE PORTADAS (ASCII art + placeholder para APIs reales)
@@ -1029,6 +1112,7 @@ class NexaBookStudioUltra:
                 elif cmd in ["salir", "exit", "q", "quit"]:
                     print(c("\n✨ NEXA BOOK STUDIO ULTRA finalizado.", Colors.PURPLE))
                     print(c("   Tu historia continúa más allá de estas líneas...", Colors.GRAY))
+                    self.search.close()
                     break
                 else:
                     print(c(f"\n❌ Comando desconocido. Usa: 1,2,3,4,5,C,M,U,H o 'salir'", Colors.RED))
@@ -1037,6 +1121,7 @@ class NexaBookStudioUltra:
                 print(c("\n\n⚠️  Interrumpido por usuario", Colors.YELLOW))
                 if input(c("¿Salir definitivamente? [s/n]: ", Colors.CYAN)).strip().lower() == "s":
                     print(c("\n✨ Que tus palabras iluminen el mundo.", Colors.PURPLE))
+                    self.search.close()
                     break
             except Exception as e:
                 print(c(f"\n❌ Error inesperado: {str(e)}", Colors.RED))